@@ -0,0 +1,142 @@
+"""
+Индексы Appointment (Meta.indexes): планы запросов и время без них и с ними.
+
+Запуск из корня проекта (база создаётся во временном файле):
+
+    python -m benchmarks.appointment_indexes --rows 500000
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+from benchmarks.common import setup_django
+
+
+def seed(rows, masters_count=50, services_count=100, years=5):
+    from salon.models import Service, Master, Appointment
+    from salon.availability import OPENING_TIME, CLOSING_TIME, SLOT_STEP, from_minutes, to_minutes
+
+    random.seed(42)
+    services = Service.objects.bulk_create([
+        Service(
+            name=f'Услуга {i}',
+            price=Decimal(500 + i * 10),
+            duration=random.choice([30, 60, 90, 120]),
+            category=random.choice(Service.CATEGORY_CHOICES)[0]
+        )
+        for i in range(services_count)
+    ])
+    masters = Master.objects.bulk_create([
+        Master(name=f'Мастер {i}', specialization='Специалист')
+        for i in range(masters_count)
+    ])
+
+    slots = [from_minutes(m) for m in range(to_minutes(OPENING_TIME), to_minutes(CLOSING_TIME), SLOT_STEP)]
+    statuses = ['completed'] * 6 + ['cancelled'] * 2 + ['confirmed', 'new']
+    first_day = date.today() - timedelta(days=365 * years)
+    total_days = 365 * years + 60
+
+    batch = []
+    for _ in range(rows):
+        batch.append(Appointment(
+            client_name='Клиент',
+            client_phone='+79001234567',
+            master=random.choice(masters),
+            service=random.choice(services),
+            date=first_day + timedelta(days=random.randrange(total_days)),
+            time=random.choice(slots),
+            status=random.choice(statuses)
+        ))
+        if len(batch) == 10000:
+            Appointment.objects.bulk_create(batch)
+            batch = []
+    Appointment.objects.bulk_create(batch)
+    return masters[0].id
+
+
+def workloads(master_id):
+    from salon.models import Appointment
+
+    day = date.today() + timedelta(days=7)
+    changelist = Appointment.objects.select_related('master', 'service').order_by('-date', '-time', '-pk')
+
+    return [
+        ('admin: changelist, первая страница', changelist[:100]),
+        ('admin: фильтр status=new', changelist.filter(status='new')[:100]),
+        ('admin: фильтр по мастеру', changelist.filter(master_id=master_id)[:100]),
+        ('admin: date_hierarchy, годы', Appointment.objects.dates('date', 'year')),
+        ('admin: date_hierarchy, месяц', changelist.filter(date__year=day.year, date__month=day.month)[:100]),
+        ('admin: новые по created_at', Appointment.objects.order_by('-created_at')[:50]),
+        ('день мастера', Appointment.objects.filter(master_id=master_id, date=day).order_by('time')),
+        # Тот же запрос, что строит availability.build_index
+        ('свободные слоты, неделя', Appointment.objects.filter(
+            master_id=master_id,
+            date__range=(day, day + timedelta(days=6))
+        ).exclude(status='cancelled').values_list('date', 'time', 'service__duration')),
+    ]
+
+
+def measure(master_id, repeat):
+    results = {}
+    for title, queryset in workloads(master_id):
+        list(queryset.all())
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            list(queryset.all())
+            timings.append((time.perf_counter() - started) * 1000)
+        results[title] = (statistics.median(timings), queryset.explain())
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=500_000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        setup_django(os.path.join(tmp, 'bench.sqlite3'))
+
+        from django.core.management import call_command
+        from django.db import connection
+        from salon.models import Appointment
+
+        call_command('migrate', verbosity=0)
+        indexes = Appointment._meta.indexes
+        with connection.schema_editor() as editor:
+            for index in indexes:
+                editor.remove_index(Appointment, index)
+
+        started = time.perf_counter()
+        master_id = seed(args.rows)
+        print(f'Создано записей: {args.rows} за {time.perf_counter() - started:.1f} с')
+
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+        before = measure(master_id, args.repeat)
+
+        started = time.perf_counter()
+        with connection.schema_editor() as editor:
+            for index in indexes:
+                editor.add_index(Appointment, index)
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+        print(f'Построение индексов: {time.perf_counter() - started:.1f} с\n')
+        after = measure(master_id, args.repeat)
+
+    for title in before:
+        (before_ms, before_plan), (after_ms, after_plan) = before[title], after[title]
+        print(f'== {title}: {before_ms:.2f} мс -> {after_ms:.2f} мс (x{before_ms / max(after_ms, 1e-6):.1f})')
+        print('   до:    ' + before_plan.replace('\n', '\n          '))
+        print('   после: ' + after_plan.replace('\n', '\n          '))
+        print()
+
+
+if __name__ == '__main__':
+    main()
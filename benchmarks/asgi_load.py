@@ -0,0 +1,206 @@
+"""
+Нагрузка: синхронный API под gunicorn (WSGI) против /api/async/ под uvicorn (ASGI).
+
+Поднимает оба сервера на временной базе и держит --concurrency одновременных
+клиентов на каждом сценарии; печатает запр./с, p50/p99 и ошибки:
+
+    python -m benchmarks.asgi_load --concurrency 1000 --duration 20
+
+Нужны gunicorn, uvicorn и aiohttp.
+"""
+import argparse
+import asyncio
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from datetime import date, timedelta
+from decimal import Decimal
+from pathlib import Path
+
+from benchmarks.common import setup_django
+
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+SETTINGS_TEMPLATE = """\
+from spa_site.settings import *  # noqa
+
+DATABASES['default']['NAME'] = {database_path!r}
+BOOKING_THROTTLE_IP = BOOKING_THROTTLE_PHONE = ''
+"""
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def seed():
+    from salon.models import Service, Master
+
+    services = [
+        Service.objects.create(name=f'Услуга {i}', price=Decimal(1000 + i * 100), duration=30 * (i % 3 + 1))
+        for i in range(20)
+    ]
+    masters = []
+    for i in range(10):
+        master = Master.objects.create(name=f'Мастер {i}', specialization='Специалист', experience=i)
+        master.services.set(services[i % 4::2])
+        masters.append(master)
+    return [m.id for m in masters], [s.id for s in services]
+
+
+def start_server(kind, port, workers, env):
+    if kind == 'wsgi':
+        command = [
+            sys.executable, '-m', 'gunicorn', 'spa_site.wsgi:application',
+            '--bind', f'127.0.0.1:{port}', '--workers', str(workers),
+            '--backlog', '4096', '--log-level', 'warning',
+        ]
+    else:
+        command = [
+            sys.executable, '-m', 'uvicorn', 'spa_site.asgi:application',
+            '--host', '127.0.0.1', '--port', str(port), '--workers', str(workers),
+            '--backlog', '4096', '--log-level', 'warning', '--no-access-log',
+        ]
+    process = subprocess.Popen(command, cwd=PROJECT_DIR, env=env)
+
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=0.5).close()
+            return process
+        except OSError:
+            time.sleep(0.2)
+    process.kill()
+    raise SystemExit(f'{kind}: сервер не поднялся на порту {port}')
+
+
+def scenarios(master_ids, service_ids):
+    """(название, путь без префикса API, генератор тела POST или None)."""
+    first_day = date.today() + timedelta(days=1)
+    counter = iter(range(10 ** 9))
+
+    def booking():
+        i = next(counter)
+        return {
+            'client_name': f'Клиент {i}',
+            'client_phone': '+79001234567',
+            'master': random.choice(master_ids),
+            'service': random.choice(service_ids),
+            'date': (first_day + timedelta(days=random.randrange(60))).isoformat(),
+            'time': f'{random.randrange(9, 18):02d}:{random.choice((0, 30)):02d}',
+        }
+
+    return [
+        ('список услуг', 'services/', None),
+        ('мастера услуги', f'services/{service_ids[0]}/masters/', None),
+        ('создание записи', 'appointments/', booking),
+    ]
+
+
+async def run_load(base_url, path, make_body, concurrency, duration):
+    import aiohttp
+
+    latencies = []
+    codes = Counter()
+    deadline = time.monotonic() + duration
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    timeout = aiohttp.ClientTimeout(total=60)
+
+    async with aiohttp.ClientSession(base_url, connector=connector, timeout=timeout) as session:
+        async def client():
+            while time.monotonic() < deadline:
+                started = time.perf_counter()
+                try:
+                    if make_body is None:
+                        request = session.get(path)
+                    else:
+                        request = session.post(path, json=make_body())
+                    async with request as response:
+                        await response.read()
+                        codes[response.status] += 1
+                except (aiohttp.ClientError, asyncio.TimeoutError) as error:
+                    codes[type(error).__name__] += 1
+                    continue
+                latencies.append((time.perf_counter() - started) * 1000)
+
+        started = time.monotonic()
+        await asyncio.gather(*(client() for _ in range(concurrency)))
+        elapsed = time.monotonic() - started
+
+    return elapsed, latencies, codes
+
+
+def report(title, elapsed, latencies, codes):
+    ok = sum(count for code, count in codes.items() if code in (200, 201, 400))
+    errors = sum(codes.values()) - ok
+    if latencies:
+        percentiles = statistics.quantiles(latencies, n=100)
+        p50, p99 = percentiles[49], percentiles[98]
+    else:
+        p50 = p99 = float('nan')
+    print(f'   {title:6} {len(latencies) / elapsed:8.0f} запр./с   p50 {p50:8.1f} мс   '
+          f'p99 {p99:8.1f} мс   ошибок {errors}   {dict(codes)}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--concurrency', type=int, default=1000)
+    parser.add_argument('--duration', type=float, default=20)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 2)
+    args = parser.parse_args()
+
+    for module in ('gunicorn', 'uvicorn', 'aiohttp'):
+        try:
+            __import__(module)
+        except ImportError:
+            raise SystemExit(f'Не установлен {module}: pip install gunicorn uvicorn aiohttp')
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database_path = os.path.join(tmp, 'load.sqlite3')
+        Path(tmp, 'load_settings.py').write_text(SETTINGS_TEMPLATE.format(database_path=database_path))
+        setup_django(database_path)
+
+        from django.core.management import call_command
+        from django.db import connection
+
+        call_command('migrate', verbosity=0)
+        master_ids, service_ids = seed()
+        connection.close()
+
+        env = dict(
+            os.environ,
+            PYTHONPATH=os.pathsep.join([tmp, str(PROJECT_DIR), os.environ.get('PYTHONPATH', '')]),
+            DJANGO_SETTINGS_MODULE='load_settings',
+        )
+        servers = {
+            'wsgi': ('/api/', free_port()),
+            'asgi': ('/api/async/', free_port()),
+        }
+        processes = [start_server(kind, port, args.workers, env) for kind, (_, port) in servers.items()]
+        try:
+            print(f'Клиентов: {args.concurrency}, воркеров: {args.workers}, {args.duration:.0f} с на сценарий\n')
+            for title, path, make_body in scenarios(master_ids, service_ids):
+                print(f'== {title}')
+                for kind, (prefix, port) in servers.items():
+                    result = asyncio.run(run_load(
+                        f'http://127.0.0.1:{port}', prefix + path, make_body, args.concurrency, args.duration
+                    ))
+                    report(kind, *result)
+                print()
+        finally:
+            for process in processes:
+                process.terminate()
+            for process in processes:
+                process.wait()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,132 @@
+"""
+Стресс-тест записи: параллельные процессы шлют пересекающиеся POST /api/appointments/.
+
+После прогона проверяет, что у одного мастера нет пересекающихся записей:
+
+    python -m benchmarks.booking_stress --workers 8 --requests 4000
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import tempfile
+import time
+from collections import Counter, defaultdict
+from datetime import date, timedelta
+from decimal import Decimal
+
+from benchmarks.common import setup_django
+
+
+SLOT_GRID = 15  # мин.: сетка мельче длительностей услуг, чтобы запросы пересекались
+_client = None
+
+
+def init_worker(database_path):
+    global _client
+    setup_django(database_path)
+
+    from django.test import Client
+    _client = Client(raise_request_exception=False, HTTP_HOST='localhost')
+
+
+def post_booking(payload):
+    response = _client.post('/api/appointments/', payload, content_type='application/json')
+    return response.status_code
+
+
+def seed(masters_count):
+    from salon.models import Service, Master
+
+    services = [
+        Service.objects.create(name=f'Услуга {duration}', price=Decimal('1000'), duration=duration)
+        for duration in (30, 60, 90)
+    ]
+    masters = []
+    for i in range(masters_count):
+        master = Master.objects.create(name=f'Мастер {i}', specialization='Специалист')
+        master.services.set(services)
+        masters.append(master)
+    return [m.id for m in masters], [s.id for s in services]
+
+
+def payloads(count, master_ids, service_ids, days):
+    from salon.availability import OPENING_TIME, CLOSING_TIME, to_minutes, from_minutes
+
+    random.seed(7)
+    first_day = date.today() + timedelta(days=1)
+    starts = range(to_minutes(OPENING_TIME), to_minutes(CLOSING_TIME) - 90, SLOT_GRID)
+    for i in range(count):
+        yield {
+            'client_name': f'Клиент {i}',
+            'client_phone': '+79001234567',
+            'master': random.choice(master_ids),
+            'service': random.choice(service_ids),
+            'date': (first_day + timedelta(days=random.randrange(days))).isoformat(),
+            'time': from_minutes(random.choice(starts)).strftime('%H:%M'),
+        }
+
+
+def find_overlaps():
+    from salon.models import Appointment
+    from salon.availability import to_minutes
+
+    by_day = defaultdict(list)
+    rows = Appointment.objects.exclude(status='cancelled').values_list(
+        'master_id', 'date', 'time', 'service__duration'
+    )
+    for master_id, day, start_time, duration in rows:
+        start = to_minutes(start_time)
+        by_day[master_id, day].append((start, start + duration))
+
+    overlaps = []
+    for key, intervals in by_day.items():
+        intervals.sort()
+        for previous, current in zip(intervals, intervals[1:]):
+            if current[0] < previous[1]:
+                overlaps.append((key, previous, current))
+    return overlaps
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--requests', type=int, default=4000)
+    parser.add_argument('--masters', type=int, default=3)
+    parser.add_argument('--days', type=int, default=2)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database_path = os.path.join(tmp, 'stress.sqlite3')
+        setup_django(database_path)
+
+        from django.core.management import call_command
+        from django.db import connection
+        from salon.models import Appointment
+
+        call_command('migrate', verbosity=0)
+        master_ids, service_ids = seed(args.masters)
+        jobs = list(payloads(args.requests, master_ids, service_ids, args.days))
+        connection.close()
+
+        started = time.perf_counter()
+        context = multiprocessing.get_context('spawn')
+        with context.Pool(args.workers, initializer=init_worker, initargs=(database_path,)) as pool:
+            codes = Counter(pool.imap_unordered(post_booking, jobs, chunksize=16))
+        elapsed = time.perf_counter() - started
+
+        overlaps = find_overlaps()
+        print(f'Запросов: {args.requests}, процессов: {args.workers}, {elapsed:.1f} с '
+              f'({args.requests / elapsed:.0f} запр./с)')
+        print(f'Ответы: {dict(sorted(codes.items()))}')
+        print(f'Создано записей: {Appointment.objects.count()}')
+        print(f'Пересечений: {len(overlaps)}')
+        for overlap in overlaps[:10]:
+            print('  ', overlap)
+
+    if overlaps or codes.get(201, 0) == 0:
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
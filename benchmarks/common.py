@@ -0,0 +1,18 @@
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'spa_site.settings')
+os.environ.setdefault('SECRET_KEY', 'benchmark')
+
+
+def setup_django(database_path):
+    """Настраивает Django на отдельный файл SQLite, чтобы не трогать db.sqlite3, и снимает лимиты записи."""
+    import django
+    from django.conf import settings
+
+    settings.DATABASES['default']['NAME'] = database_path
+    # Нагрузка идёт с одного адреса и повторяющихся телефонов — лимиты записи мешали бы замерам
+    settings.BOOKING_THROTTLE_IP = settings.BOOKING_THROTTLE_PHONE = ''
+    django.setup()
@@ -0,0 +1,241 @@
+"""
+Бенчмарк эндпоинтов: задержка, пропускная способность и число SQL-запросов.
+
+Заполняет временную базу синтетическими данными (--scale умножает размеры),
+прогоняет запросы через тестовый клиент Django и пишет JSON-отчёт. Если число
+запросов превышает бюджет эндпоинта (N+1) или ответ не тот, код выхода 1:
+
+    python -m benchmarks.endpoints --scale 10 --output bench.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from pathlib import Path
+
+from benchmarks.common import setup_django
+
+
+# Бюджеты SQL-запросов на один запрос с холодным кэшем. Они не зависят от
+# объёма данных: рост числа запросов с размером выборки — это N+1.
+QUERY_BUDGETS = {
+    'index': 8,
+    'services': 2,
+    'masters': 4,
+    'service_masters': 1,
+    'appointment_create': 10,
+}
+
+BASE_SIZES = {'services': 30, 'masters': 10, 'services_per_master': 8, 'appointments': 2000}
+
+
+def seed(services_count, masters_count, services_per_master, appointments_count):
+    from salon.availability import OPENING_TIME, CLOSING_TIME, SLOT_STEP, from_minutes, to_minutes
+    from salon.models import Service, Master, Appointment, Contact, SalonInfo
+
+    random.seed(42)
+    categories = [code for code, _ in Service.CATEGORY_CHOICES]
+    SalonInfo.objects.create(name='Салон', tagline='Слоган', about_text='О салоне ' * 20)
+    Contact.objects.create(address='Адрес', phone='+79001234567', email='salon@example.com', working_hours='9-21')
+    services = Service.objects.bulk_create([
+        Service(
+            name=f'Услуга {i}',
+            description='Описание услуги ' * 5,
+            price=Decimal(random.randrange(500, 10000)),
+            duration=random.choice([30, 60, 90]),
+            category=random.choice(categories),
+        )
+        for i in range(services_count)
+    ])
+    masters = Master.objects.bulk_create([
+        Master(name=f'Мастер {i}', specialization='Специалист', bio='Биография ' * 10, photo=f'masters/{i}.jpg')
+        for i in range(masters_count)
+    ])
+    Through = Master.services.through
+    Through.objects.bulk_create([
+        Through(master_id=master.id, service_id=service.id)
+        for master in masters
+        for service in random.sample(services, min(services_per_master, len(services)))
+    ], batch_size=5000)
+
+    # История записей: прошлые даты, будущие слоты остаются свободными для POST
+    slots = [from_minutes(m) for m in range(to_minutes(OPENING_TIME), to_minutes(CLOSING_TIME) - 90, SLOT_STEP)]
+    Appointment.objects.bulk_create([
+        Appointment(
+            client_name=f'Клиент {i}',
+            client_phone='+79001234567',
+            master=random.choice(masters),
+            service=random.choice(services),
+            date=date.today() - timedelta(days=random.randrange(1, 730)),
+            time=random.choice(slots),
+            status='completed',
+        )
+        for i in range(appointments_count)
+    ], batch_size=5000)
+
+    service = Service.objects.filter(masters__isnull=False).order_by('id').first()
+    return service, list(service.masters.order_by('id'))
+
+
+def bookings(service, masters):
+    """Бесконечный поток непересекающихся записей: мастер × день × слот."""
+    from salon.availability import OPENING_TIME, CLOSING_TIME, from_minutes, to_minutes
+
+    step = max(service.duration, 30)
+    starts = range(to_minutes(OPENING_TIME), to_minutes(CLOSING_TIME) - service.duration + 1, step)
+    day = date.today() + timedelta(days=1)
+    i = 0
+    while True:
+        for master in masters:
+            for start in starts:
+                i += 1
+                yield {
+                    'client_name': f'Клиент {i}',
+                    'client_phone': '+79001234567',
+                    'client_email': 'client@example.com',
+                    'master': master.id,
+                    'service': service.id,
+                    'date': day.isoformat(),
+                    'time': from_minutes(start).strftime('%H:%M'),
+                }
+        day += timedelta(days=1)
+
+
+def endpoints(service, masters):
+    payloads = bookings(service, masters)
+    return [
+        ('index', 'GET', '/', None, 200),
+        ('services', 'GET', '/api/services/', None, 200),
+        ('masters', 'GET', '/api/masters/', None, 200),
+        ('service_masters', 'GET', f'/api/services/{service.id}/masters/', None, 200),
+        ('appointment_create', 'POST', '/api/appointments/', lambda: next(payloads), 201),
+    ]
+
+
+def call(client, method, path, make_body):
+    if method == 'GET':
+        return client.get(path, HTTP_ACCEPT='application/json')
+    return client.post(path, make_body(), content_type='application/json')
+
+
+def measure(client, name, method, path, make_body, expected_status, repeat):
+    from django.core.cache import cache
+    from django.db import connection, reset_queries
+    from django.test.utils import CaptureQueriesContext
+
+    from salon.cache import _local
+
+    # Холодный запрос: пустой кэш — здесь считаем SQL-запросы
+    cache.clear()
+    _local.clear()
+    # request_started очищает журнал запросов: начинаем с пустого, чтобы срез был верным
+    reset_queries()
+    with CaptureQueriesContext(connection) as queries:
+        started = time.perf_counter()
+        response = call(client, method, path, make_body)
+        cold_ms = (time.perf_counter() - started) * 1000
+    # captured_queries читается из журнала соединения: фиксируем до следующих запросов
+    query_count = len(queries)
+
+    statuses = {response.status_code}
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        response = call(client, method, path, make_body)
+        timings.append((time.perf_counter() - started) * 1000)
+        statuses.add(response.status_code)
+
+    budget = QUERY_BUDGETS[name]
+    return {
+        'name': name,
+        'method': method,
+        'path': path,
+        'bytes': len(response.content),
+        'statuses': sorted(statuses),
+        'queries': query_count,
+        'query_budget': budget,
+        'cold_ms': round(cold_ms, 3),
+        'p50_ms': round(statistics.median(timings), 3),
+        'p95_ms': round(statistics.quantiles(timings, n=20)[18], 3) if len(timings) > 1 else round(timings[0], 3),
+        'rps': round(len(timings) / (sum(timings) / 1000), 1),
+        'ok': query_count <= budget and statuses == {expected_status},
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=Path(__file__).resolve().parent, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--scale', type=int, default=1, help='Множитель размеров данных')
+    parser.add_argument('--repeat', type=int, default=200, help='Запросов на эндпоинт с тёплым кэшем')
+    parser.add_argument('--output', help='Файл для JSON-отчёта (по умолчанию stdout)')
+    args = parser.parse_args()
+
+    sizes = {key: value * args.scale for key, value in BASE_SIZES.items()}
+    sizes['services_per_master'] = BASE_SIZES['services_per_master']
+
+    with tempfile.TemporaryDirectory() as tmp:
+        setup_django(os.path.join(tmp, 'bench.sqlite3'))
+
+        import django
+        from django.conf import settings
+        from django.core.management import call_command
+        from django.test import Client
+
+        settings.ALLOWED_HOSTS = ['*']
+        call_command('migrate', verbosity=0)
+        service, masters = seed(
+            sizes['services'], sizes['masters'], sizes['services_per_master'], sizes['appointments']
+        )
+
+        client = Client()
+        results = [
+            measure(client, *endpoint, repeat=args.repeat)
+            for endpoint in endpoints(service, masters)
+        ]
+
+    report = {
+        'created_at': datetime.now(dt_timezone.utc).isoformat(timespec='seconds'),
+        'revision': git_revision(),
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'database': 'sqlite',
+        'scale': args.scale,
+        'dataset': sizes,
+        'repeat': args.repeat,
+        'endpoints': results,
+        'ok': all(result['ok'] for result in results),
+    }
+
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + '\n', encoding='utf-8')
+    else:
+        print(text)
+
+    for result in results:
+        if not result['ok']:
+            print(f'{result["name"]}: запросов {result["queries"]} при бюджете {result["query_budget"]}, '
+                  f'ответы {result["statuses"]}', file=sys.stderr)
+    if not report['ok']:
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
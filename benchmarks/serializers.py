@@ -0,0 +1,98 @@
+"""
+Микробенчмарк сериализации каталога: ModelSerializer против represent_* из values().
+
+    python -m benchmarks.serializers --services 10000 --masters 1000
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from decimal import Decimal
+
+from benchmarks.common import setup_django
+
+
+def seed(services_count, masters_count, services_per_master):
+    from salon.models import Service, Master
+
+    random.seed(42)
+    categories = [code for code, _ in Service.CATEGORY_CHOICES]
+    services = Service.objects.bulk_create([
+        Service(
+            name=f'Услуга {i}',
+            description='Описание услуги ' * 5,
+            price=Decimal(random.randrange(500, 10000)),
+            duration=random.choice([30, 60, 90]),
+            category=random.choice(categories),
+            image=f'services/{i}.jpg' if i % 2 else ''
+        )
+        for i in range(services_count)
+    ])
+    masters = Master.objects.bulk_create([
+        Master(name=f'Мастер {i}', specialization='Специалист', bio='Биография ' * 10, photo=f'masters/{i}.jpg')
+        for i in range(masters_count)
+    ])
+    Through = Master.services.through
+    Through.objects.bulk_create([
+        Through(master_id=master.id, service_id=service.id)
+        for master in masters
+        for service in random.sample(services, services_per_master)
+    ], batch_size=5000)
+
+
+def timed(run, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        body = run()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings), body
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--services', type=int, default=10_000)
+    parser.add_argument('--masters', type=int, default=1_000)
+    parser.add_argument('--services-per-master', type=int, default=10)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        setup_django(os.path.join(tmp, 'bench.sqlite3'))
+
+        from django.core.management import call_command
+        from django.test import RequestFactory
+        from rest_framework.renderers import JSONRenderer
+        from salon.models import Service, Master
+        from salon.serializers import ServiceSerializer, MasterSerializer, represent_services, represent_masters
+
+        call_command('migrate', verbosity=0)
+        seed(args.services, args.masters, args.services_per_master)
+
+        request = RequestFactory().get('/api/', HTTP_HOST='localhost')
+        render = JSONRenderer().render
+        services = Service.objects.filter(is_active=True)
+        masters = Master.objects.filter(is_active=True).prefetch_related('services')
+        cases = [
+            ('/api/services/',
+             lambda: render(ServiceSerializer(services.all(), many=True, context={'request': request}).data),
+             lambda: render(represent_services(services.all(), request))),
+            ('/api/masters/',
+             lambda: render(MasterSerializer(masters.all(), many=True, context={'request': request}).data),
+             lambda: render(represent_masters(masters.all(), request))),
+        ]
+
+        print(f'Услуг: {args.services}, мастеров: {args.masters}, '
+              f'услуг у мастера: {args.services_per_master}\n')
+        for title, reference, fast in cases:
+            reference_ms, reference_body = timed(reference, args.repeat)
+            fast_ms, fast_body = timed(fast, args.repeat)
+            same = 'совпадает' if reference_body == fast_body else 'ОТЛИЧАЕТСЯ'
+            print(f'{title}: ModelSerializer {reference_ms:.1f} мс, values() {fast_ms:.1f} мс '
+                  f'(x{reference_ms / fast_ms:.1f}), {len(fast_body)} байт, JSON {same}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+"""
+Конкурентная запись в SQLite: настройки по умолчанию против WAL и PRAGMA из settings.
+
+Процессы параллельно создают записи через POST /api/appointments/ на отдельных
+базах для каждого режима; печатает записей в секунду и ошибки:
+
+    python -m benchmarks.sqlite_concurrency --workers 8 --requests 3000
+"""
+import argparse
+import multiprocessing
+import os
+import tempfile
+import time
+from collections import Counter
+
+from benchmarks.booking_stress import seed, payloads
+from benchmarks.common import setup_django
+
+
+# Поведение Django по умолчанию: журнал DELETE, synchronous=FULL, ожидание блокировки 5 с,
+# новое соединение на каждый запрос
+MODES = {
+    'default': {
+        'pragmas': {'journal_mode': 'DELETE', 'synchronous': 'FULL'},
+        'options': {'timeout': 5},
+        'conn_max_age': 0,
+    },
+    'tuned': {
+        'pragmas': None,  # SQLITE_PRAGMAS из settings
+        'options': None,
+        'conn_max_age': 60,
+    },
+}
+
+_client = None
+
+
+def configure(database_path, mode):
+    setup_django(database_path)
+
+    from django.conf import settings
+    from django.db import connections
+
+    database = settings.DATABASES['default']
+    if mode['pragmas'] is not None:
+        settings.SQLITE_PRAGMAS = mode['pragmas']
+    if mode['options'] is not None:
+        database['OPTIONS'] = mode['options']
+    database['CONN_MAX_AGE'] = mode['conn_max_age']
+    connections['default'].settings_dict.update(database)
+
+
+def init_worker(database_path, mode):
+    global _client
+    configure(database_path, mode)
+
+    from django.test import Client
+    _client = Client(raise_request_exception=False, HTTP_HOST='localhost')
+
+
+def post_booking(payload):
+    from django.db import close_old_connections
+
+    # Как на границе запроса в настоящем сервере: соединение закрывается или переиспользуется по CONN_MAX_AGE
+    close_old_connections()
+    response = _client.post('/api/appointments/', payload, content_type='application/json')
+    return response.status_code
+
+
+def run_mode(tmp, name, args):
+    database_path = os.path.join(tmp, f'{name}.sqlite3')
+    context = multiprocessing.get_context('spawn')
+
+    # Схема и данные — в отдельном процессе, чтобы родитель не держал соединение
+    with context.Pool(1, initializer=configure, initargs=(database_path, MODES[name])) as pool:
+        jobs = pool.apply(prepare, (args.requests, args.masters, args.days))
+
+    started = time.perf_counter()
+    with context.Pool(args.workers, initializer=init_worker, initargs=(database_path, MODES[name])) as pool:
+        codes = Counter(pool.imap_unordered(post_booking, jobs, chunksize=8))
+    return time.perf_counter() - started, codes
+
+
+def prepare(requests, masters, days):
+    from django.core.management import call_command
+
+    call_command('migrate', verbosity=0)
+    master_ids, service_ids = seed(masters)
+    return list(payloads(requests, master_ids, service_ids, days))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--requests', type=int, default=3000)
+    parser.add_argument('--masters', type=int, default=20)
+    parser.add_argument('--days', type=int, default=14)
+    args = parser.parse_args()
+
+    print(f'Запросов: {args.requests}, процессов: {args.workers}\n')
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in MODES:
+            elapsed, codes = run_mode(tmp, name, args)
+            handled = codes.get(201, 0) + codes.get(400, 0)
+            errors = sum(codes.values()) - handled
+            print(f'{name:8} {elapsed:6.1f} с  {handled / elapsed:7.0f} запр./с  '
+                  f'создано {codes.get(201, 0)}, ошибок {errors}  {dict(sorted(codes.items()))}')
+
+
+if __name__ == '__main__':
+    main()
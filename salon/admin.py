@@ -1,12 +1,45 @@
+from django import forms
 from django.contrib import admin
-from .models import Service, Master, Appointment, Contact, SalonInfo
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.html import format_html
+from .models import (
+    Service,
+    Master,
+    Appointment,
+    AppointmentStatusChange,
+    AppointmentArchive,
+    Contact,
+    SalonInfo,
+    OutboxMessage
+)
+from .availability import FREEING_STATUS, is_slot_free
+from .booking import lock_master_day
+from .export import export_response
+from .filters import filter_period
+from .ics import calendar_url, invalidate_calendars
+from .pagination import EstimatedCountPaginator
+from .reports import SummaryDelta, appointment_facts
+from .search import KINDS as SEARCH_KINDS, search
+from .transitions import TransitionError, check_transition, record_change, transition
+
+class FullTextSearchMixin:
+    """Поиск в списке по индексу salon.search; по названию — ещё и подстрокой."""
+    search_fields = ['name']
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term.strip():
+            return queryset, False
+        ids = search(search_term, SEARCH_KINDS[self.model])
+        return queryset.filter(Q(pk__in=ids) | Q(name__icontains=search_term)), False
+
 
 @admin.register(Service)
-class ServiceAdmin(admin.ModelAdmin):
+class ServiceAdmin(FullTextSearchMixin, admin.ModelAdmin):
 
     list_display = ['name', 'category', 'price', 'duration', 'is_active']
     list_filter = ['category', 'is_active']
-    search_fields = ['name', 'description']
     list_editable = ['price', 'is_active']
     fieldsets = [
         ('Основная информация', {
@@ -25,11 +58,10 @@ class ServiceAdmin(admin.ModelAdmin):
     ]
 
 @admin.register(Master)
-class MasterAdmin(admin.ModelAdmin):
+class MasterAdmin(FullTextSearchMixin, admin.ModelAdmin):
 
     list_display = ['name', 'specialization', 'experience', 'is_active']
     list_filter = ['is_active', 'specialization']
-    search_fields = ['name', 'specialization', 'bio']
     filter_horizontal = ['services']
 
     fieldsets = [
@@ -50,10 +82,92 @@ class MasterAdmin(admin.ModelAdmin):
         ('Статус', {
             'fields': ['is_active']
         }),
+        ('Календарь', {
+            'fields': ['calendar_link'],
+            'description': 'Ссылка для подписки на записи мастера в календаре телефона'
+        }),
     ]
+    readonly_fields = ['calendar_link']
+
+    @admin.display(description='ICS-лента')
+    def calendar_link(self, obj):
+        if obj.pk is None:
+            return 'Появится после сохранения'
+        url = calendar_url(obj.pk)
+        return format_html('<a href="{}">{}</a>', url, url)
+
+class AppointmentDateFilter(admin.SimpleListFilter):
+    """Диапазоны дат по индексу (date, time) вместо date_hierarchy, которой нужен DISTINCT по всей таблице."""
+    title = 'Дата'
+    parameter_name = 'period'
+
+    def lookups(self, request, model_admin):
+        return [
+            ('today', 'Сегодня'),
+            ('tomorrow', 'Завтра'),
+            ('week', 'Ближайшие 7 дней'),
+            ('month', 'Ближайшие 30 дней'),
+            ('past_week', 'Прошедшие 7 дней'),
+            ('past_month', 'Прошедшие 30 дней'),
+            ('past', 'Все прошедшие'),
+        ]
+
+    def queryset(self, request, queryset):
+        return filter_period(queryset, self.value())
+
+
+class AppointmentAdminForm(forms.ModelForm):
+    # Статус слот не занимает заново: из отменённой запись не вернуть (ALLOWED_TRANSITIONS)
+    SLOT_FIELDS = {'master', 'service', 'date', 'time'}
+
+    def clean(self):
+        """
+        Пересечение с другими записями мастера, как при записи через API.
+
+        changeform_view админки проверяет форму и сохраняет запись в одной транзакции,
+        поэтому блокировка дня мастера держится до сохранения.
+        """
+        cleaned_data = super().clean()
+        if not self.SLOT_FIELDS <= set(self.fields) or not self.SLOT_FIELDS & set(self.changed_data):
+            return cleaned_data
+        master, service, day, start = (cleaned_data.get(name) for name in ('master', 'service', 'date', 'time'))
+        if None in (master, service, day, start) or cleaned_data.get('status') == FREEING_STATUS:
+            return cleaned_data
+
+        lock_master_day(master.id, day)
+        if not is_slot_free(master.id, day, start, service.duration, exclude_id=self.instance.pk):
+            raise forms.ValidationError(f'У мастера {master.name} это время уже занято')
+        return cleaned_data
+
+    def clean_status(self):
+        status = self.cleaned_data['status']
+        old_status = self.instance.status if self.instance.pk else None
+        if old_status is not None and status != old_status:
+            try:
+                check_transition(old_status, status)
+            except TransitionError as error:
+                raise forms.ValidationError(str(error))
+        return status
+
+
+class AppointmentStatusChangeInline(admin.TabularInline):
+    model = AppointmentStatusChange
+    fields = ['changed_at', 'old_status', 'new_status', 'changed_by', 'source']
+    readonly_fields = fields
+    extra = 0
+    can_delete = False
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
 
 @admin.register(Appointment)
 class AppointmentAdmin(admin.ModelAdmin):
+    form = AppointmentAdminForm
+    inlines = [AppointmentStatusChangeInline]
     list_display = [
         'client_name',
         'client_phone',
@@ -65,12 +179,19 @@ class AppointmentAdmin(admin.ModelAdmin):
         'created_at'
     ]
 
-    list_filter = ['status', 'date', 'master', 'service']
+    # Каждый фильтр опирается на индекс: status — salon_appt_status_idx,
+    # дата — salon_appt_date_time_idx, мастер — salon_appt_master_slot_idx, услуга — индекс FK
+    list_filter = ['status', AppointmentDateFilter, 'master', 'service']
+    list_select_related = ['master', 'service']
     search_fields = ['client_name', 'client_phone', 'client_email']
     list_editable = ['status']
     ordering = ['-date', '-time']
     readonly_fields = ['created_at']
-    date_hierarchy = 'date'
+    autocomplete_fields = ['master', 'service']
+
+    # COUNT(*) ограничен сверху, полный подсчёт без фильтров не выполняется
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
     fieldsets = [
         ('Клиент', {
@@ -88,23 +209,102 @@ class AppointmentAdmin(admin.ModelAdmin):
         }),
     ]
 
-    actions = ['mark_confirmed', 'mark_completed', 'mark_cancelled']
+    actions = ['mark_confirmed', 'mark_completed', 'mark_cancelled', 'export_csv', 'export_xlsx']
+
+    def get_changelist_form(self, request, **kwargs):
+        # list_editable: та же проверка переходов, что и в форме записи
+        return super().get_changelist_form(request, form=AppointmentAdminForm, **kwargs)
+
+    def save_model(self, request, obj, form, change):
+        old_status = form.initial.get('status') if change else None
+        with transaction.atomic():
+            delta = SummaryDelta()
+            masters = set()
+            # Форма может поменять и дату, мастера, услугу: старый вклад снимается целиком
+            for facts in appointment_facts(Appointment.objects.filter(pk=obj.pk)) if change else ():
+                delta.remove(*facts)
+                masters.add(facts[1])
+            super().save_model(request, obj, form, change)
+            delta.add_appointment(obj).apply()
+            invalidate_calendars(masters | {obj.master_id})
+            if old_status is not None and obj.status != old_status:
+                record_change(obj, old_status, user=request.user, source='admin')
+
+    def delete_model(self, request, obj):
+        self.delete_queryset(request, Appointment.objects.filter(pk=obj.pk))
+
+    def delete_queryset(self, request, queryset):
+        with transaction.atomic():
+            delta = SummaryDelta()
+            masters = set()
+            for facts in appointment_facts(queryset):
+                delta.remove(*facts)
+                masters.add(facts[1])
+            super().delete_queryset(request, queryset)
+            delta.apply()
+            invalidate_calendars(masters)
+
+    def apply_transition(self, request, queryset, status, verb):
+        changed, skipped = transition(queryset, status, user=request.user, source='admin')
+        message = f'{verb} записей: {changed}'
+        if skipped:
+            message += f', пропущено (недопустимый переход): {skipped}'
+        self.message_user(request, message)
 
     @admin.action(description='Подтвердить выбранные записи')
     def mark_confirmed(self, request, queryset):
-        updated = queryset.update(status='confirmed')
-        self.message_user(request, f'Подтверждено записей: {updated}')
+        self.apply_transition(request, queryset, 'confirmed', 'Подтверждено')
 
     @admin.action(description='Отметить как выполненные')
     def mark_completed(self, request, queryset):
-        updated = queryset.update(status='completed')
-        self.message_user(request, f'Выполнено записей: {updated}')
+        self.apply_transition(request, queryset, 'completed', 'Выполнено')
 
     @admin.action(description='Отменить выбранные записи')
     def mark_cancelled(self, request, queryset):
-        updated = queryset.update(status='cancelled')
-        self.message_user(request, f'Отменено записей: {updated}')
+        self.apply_transition(request, queryset, 'cancelled', 'Отменено')
+
+    # С «выбрать все» queryset — весь отфильтрованный список; строки отдаются потоком
+    @admin.action(description='Выгрузить в CSV')
+    def export_csv(self, request, queryset):
+        return export_response(queryset, 'csv')
+
+    @admin.action(description='Выгрузить в Excel (XLSX)')
+    def export_xlsx(self, request, queryset):
+        return export_response(queryset, 'xlsx')
+
+
+@admin.register(AppointmentArchive)
+class AppointmentArchiveAdmin(admin.ModelAdmin):
+    list_display = ['client_name', 'client_phone', 'master', 'service', 'date', 'time', 'status', 'archived_at']
+    list_filter = ['status']
+    list_select_related = ['master', 'service']
+    search_fields = ['client_phone']
+    ordering = ['-date', '-time']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    # Архив только для чтения: записи попадают сюда командой archive_appointments
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(OutboxMessage)
+class OutboxMessageAdmin(admin.ModelAdmin):
+    list_display = ['recipient', 'subject', 'status', 'attempts', 'available_at', 'sent_at']
+    list_filter = ['status']
+    search_fields = ['recipient']
+    readonly_fields = ['created_at', 'sent_at', 'last_error']
+    actions = ['retry_now']
 
+    @admin.action(description='Отправить повторно')
+    def retry_now(self, request, queryset):
+        updated = queryset.exclude(status='sent').update(
+            status='pending', attempts=0, available_at=timezone.now()
+        )
+        self.message_user(request, f'Поставлено в очередь: {updated}')
 
 
 @admin.register(Contact)
@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class SalonConfig(AppConfig):
     name = 'salon'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,72 @@
+"""
+Перенос старых записей из Appointment в AppointmentArchive.
+
+Каждая пачка — короткая транзакция: выборка записей по id, bulk_create
+в архив вместе с историей статусов и удаление из рабочей таблицы. Прерванный
+перенос можно просто запустить снова: уже перенесённые записи в рабочей
+таблице не остаются, а повторная вставка в архив игнорируется.
+"""
+from collections import defaultdict
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .ics import invalidate_calendars
+from .models import Appointment, AppointmentArchive, AppointmentStatusChange
+
+
+CHUNK_SIZE = 500
+ARCHIVE_STATUSES = ('completed', 'cancelled')
+
+FIELDS = [field.attname for field in Appointment._meta.concrete_fields]
+
+
+def archive_candidates(before, statuses=ARCHIVE_STATUSES):
+    return Appointment.objects.filter(date__lt=before, status__in=statuses)
+
+
+def history_by_appointment(ids):
+    history = defaultdict(list)
+    changes = AppointmentStatusChange.objects.filter(appointment_id__in=ids).order_by('changed_at', 'id').values_list(
+        'appointment_id', 'old_status', 'new_status', 'changed_at', 'changed_by_id', 'source'
+    )
+    for appointment_id, old_status, new_status, changed_at, changed_by, source in changes:
+        history[appointment_id].append({
+            'old_status': old_status,
+            'new_status': new_status,
+            'changed_at': changed_at.isoformat(),
+            'changed_by': changed_by,
+            'source': source,
+        })
+    return history
+
+
+def archive_appointments(before, statuses=ARCHIVE_STATUSES, chunk_size=CHUNK_SIZE):
+    """
+    Переносит записи с датой раньше before и статусом из statuses;
+    выдаёт число перенесённых записей после каждой пачки.
+    """
+    candidates = archive_candidates(before, statuses).order_by('pk').values_list('pk', flat=True)
+    last_id = 0
+
+    while True:
+        with transaction.atomic():
+            rows = archive_candidates(before, statuses).filter(pk__in=candidates.filter(pk__gt=last_id)[:chunk_size])
+            if connection.features.has_select_for_update:
+                rows = rows.select_for_update()
+            rows = list(rows.order_by('pk').values(*FIELDS))
+            if not rows:
+                break
+
+            ids = [row['id'] for row in rows]
+            history = history_by_appointment(ids)
+            now = timezone.now()
+            AppointmentArchive.objects.bulk_create([
+                AppointmentArchive(**row, status_history=history.get(row['id'], []), archived_at=now)
+                for row in rows
+            ], ignore_conflicts=True)
+            # История статусов удаляется каскадом тем же DELETE ... WHERE appointment_id IN (...)
+            Appointment.objects.filter(pk__in=ids).delete()
+            invalidate_calendars(row['master_id'] for row in rows)
+        last_id = ids[-1]
+        yield len(ids)
@@ -0,0 +1,12 @@
+from django.urls import path
+
+from . import async_views
+
+urlpatterns = [
+    path('services/', async_views.service_list, name='async-service-list'),
+    path('services/<int:pk>/', async_views.service_detail, name='async-service-detail'),
+    path('services/<int:service_id>/masters/', async_views.masters_for_service, name='async-service-masters'),
+    path('masters/', async_views.master_list, name='async-master-list'),
+    path('masters/<int:pk>/', async_views.master_detail, name='async-master-detail'),
+    path('appointments/', async_views.appointment_create, name='async-appointment-create'),
+]
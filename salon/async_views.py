@@ -0,0 +1,101 @@
+"""
+Асинхронные версии каталога и записи для ASGI (uvicorn, daphne).
+
+Чтение идёт через асинхронный ORM; проверка и создание записи работают
+в транзакции, а транзакции Django синхронные, поэтому они выполняются
+через sync_to_async и не держат цикл событий.
+"""
+import json
+
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse
+from rest_framework.exceptions import ValidationError, NotFound, MethodNotAllowed
+
+from .models import Service, Master
+from .cache import get_service_masters
+from .serializers import AppointmentCreateSerializer, arepresent_services, arepresent_masters
+from .views import booking_confirmation
+from .throttling import BookingThrottle, booking_phone, booking_throttled, check_booking
+
+
+def json_response(data, status=200):
+    # Тот же JSON, что отдаёт JSONRenderer DRF: UTF-8 без экранирования и пробелов
+    return JsonResponse(data, status=status, safe=False, json_dumps_params={
+        'ensure_ascii': False,
+        'separators': (',', ':')
+    })
+
+
+def not_found():
+    return json_response({'detail': str(NotFound.default_detail)}, status=404)
+
+
+def method_not_allowed(request):
+    return json_response({'detail': str(MethodNotAllowed.default_detail).format(method=request.method)}, status=405)
+
+
+async def service_list(request):
+    if request.method != 'GET':
+        return method_not_allowed(request)
+    return json_response(await arepresent_services(Service.objects.filter(is_active=True), request))
+
+
+async def service_detail(request, pk):
+    if request.method != 'GET':
+        return method_not_allowed(request)
+    rows = await arepresent_services(Service.objects.filter(is_active=True, pk=pk), request)
+    return json_response(rows[0]) if rows else not_found()
+
+
+async def master_list(request):
+    if request.method != 'GET':
+        return method_not_allowed(request)
+    return json_response(await arepresent_masters(Master.objects.filter(is_active=True), request))
+
+
+async def master_detail(request, pk):
+    if request.method != 'GET':
+        return method_not_allowed(request)
+    rows = await arepresent_masters(Master.objects.filter(is_active=True, pk=pk), request)
+    return json_response(rows[0]) if rows else not_found()
+
+
+async def masters_for_service(request, service_id):
+    if request.method != 'GET':
+        return method_not_allowed(request)
+    return json_response(await sync_to_async(get_service_masters)(service_id))
+
+
+def create_booking(data):
+    serializer = AppointmentCreateSerializer(data=data)
+    serializer.is_valid(raise_exception=True)
+    appointment = serializer.save()
+    return booking_confirmation(appointment)
+
+
+async def appointment_create(request):
+    if request.method != 'POST':
+        return method_not_allowed(request)
+
+    try:
+        data = json.loads(request.body)
+    except ValueError:
+        return json_response({'success': False, 'errors': {'body': 'Ожидался JSON'}}, status=400)
+
+    wait = await sync_to_async(check_booking)(BookingThrottle().get_ident(request), booking_phone(data))
+    if wait is not None:
+        throttled = booking_throttled(wait)
+        response = json_response({'detail': str(throttled.detail)}, status=429)
+        response['Retry-After'] = str(throttled.wait)
+        return response
+
+    try:
+        confirmation = await sync_to_async(create_booking)(data)
+    except ValidationError as error:
+        return json_response({'success': False, 'errors': error.detail}, status=400)
+    return json_response(confirmation, status=201)
+
+
+# Как и у APIView DRF: анонимная запись без CSRF-токена.
+# csrf_exempt в Django 4.2 превращает корутину в синхронную функцию, поэтому флаг ставится напрямую.
+appointment_create.csrf_exempt = True
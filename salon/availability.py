@@ -0,0 +1,128 @@
+import math
+from bisect import bisect_left
+from collections import defaultdict
+from datetime import time, timedelta
+
+from django.utils import timezone
+
+from .models import Appointment
+
+
+OPENING_TIME = time(9, 0)    # 9:00
+CLOSING_TIME = time(21, 0)   # 21:00
+SLOT_STEP = 30               # шаг сетки свободных слотов, мин.
+MAX_DAYS = 31                # максимальная глубина запроса, дней
+
+# Отменённые записи время мастера не занимают
+FREEING_STATUS = 'cancelled'
+
+
+def to_minutes(value):
+    return value.hour * 60 + value.minute
+
+
+def from_minutes(value):
+    return time(value // 60, value % 60)
+
+
+class IntervalIndex:
+    """
+    Занятые интервалы [start, end) в минутах, отсортированные и слитые.
+
+    Ключ — день (индекс одного мастера) или пара (мастер, день).
+    """
+
+    def __init__(self):
+        self._days = defaultdict(list)
+
+    def add(self, key, start, end):
+        self._days[key].append((start, end))
+
+    def build(self):
+        for key, intervals in self._days.items():
+            intervals.sort()
+            merged = []
+            for start, end in intervals:
+                if merged and start <= merged[-1][1]:
+                    if end > merged[-1][1]:
+                        merged[-1] = (merged[-1][0], end)
+                else:
+                    merged.append((start, end))
+            self._days[key] = merged
+        return self
+
+    def insert(self, key, start, end):
+        """Добавляет интервал в уже построенный индекс, сливая его с соседями."""
+        intervals = self._days[key]
+        i = bisect_left(intervals, (start, start))
+        if i > 0 and intervals[i - 1][1] >= start:
+            i -= 1
+            start, end = intervals[i][0], max(end, intervals[i][1])
+            del intervals[i]
+        while i < len(intervals) and intervals[i][0] <= end:
+            end = max(end, intervals[i][1])
+            del intervals[i]
+        intervals.insert(i, (start, end))
+
+    def is_free(self, key, start, end):
+        intervals = self._days.get(key)
+        if not intervals:
+            return True
+        # intervals[i] — первый интервал, начинающийся не раньше кандидата
+        i = bisect_left(intervals, (start, start))
+        if i > 0 and intervals[i - 1][1] > start:
+            return False
+        return i == len(intervals) or intervals[i][0] >= end
+
+
+def build_index(master_id, date_from, date_to, exclude_id=None):
+    """Один запрос по (master, date): все занятые интервалы мастера за период."""
+    rows = Appointment.objects.filter(
+        master_id=master_id,
+        date__range=(date_from, date_to),
+    ).exclude(status=FREEING_STATUS)
+    if exclude_id is not None:
+        rows = rows.exclude(pk=exclude_id)
+
+    index = IntervalIndex()
+    for day, start_time, duration in rows.values_list('date', 'time', 'service__duration'):
+        start = to_minutes(start_time)
+        index.add(day, start, start + duration)
+    return index.build()
+
+
+def get_free_slots(master_id, duration, date_from, days=7, now=None):
+    """Свободные времена начала услуги длительностью duration по дням: {date: [time, ...]}."""
+    days = max(1, min(days, MAX_DAYS))
+    date_to = date_from + timedelta(days=days - 1)
+    index = build_index(master_id, date_from, date_to)
+
+    now = timezone.localtime(now or timezone.now())
+    opening = to_minutes(OPENING_TIME)
+    closing = to_minutes(CLOSING_TIME)
+
+    result = {}
+    for offset in range(days):
+        day = date_from + timedelta(days=offset)
+        if day < now.date():
+            result[day] = []
+            continue
+
+        first = opening
+        if day == now.date():
+            # Сегодня — только слоты после текущего момента, выровненные по сетке
+            passed = to_minutes(now.time()) + 1
+            if passed > opening:
+                first = opening + math.ceil((passed - opening) / SLOT_STEP) * SLOT_STEP
+
+        result[day] = [
+            from_minutes(start)
+            for start in range(first, closing - duration + 1, SLOT_STEP)
+            if index.is_free(day, start, start + duration)
+        ]
+    return result
+
+
+def is_slot_free(master_id, day, start_time, duration, exclude_id=None):
+    start = to_minutes(start_time)
+    return build_index(master_id, day, day, exclude_id=exclude_id).is_free(day, start, start + duration)
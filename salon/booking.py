@@ -0,0 +1,51 @@
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Appointment, MasterDayLock
+from .availability import is_slot_free
+from .outbox import enqueue_booking_confirmation
+from .ics import invalidate_calendars
+from .reports import SummaryDelta
+
+
+class SlotTakenError(Exception):
+    pass
+
+
+def lock_master_day(master_id, day):
+    lock_master_days([(master_id, day)])
+
+
+def lock_master_days(keys):
+    """
+    Блокирует дни мастеров [(master_id, date), ...] до конца текущей транзакции.
+
+    Upsert строки (master, date) должен быть первым запросом транзакции:
+    в PostgreSQL он берёт блокировку только этой строки, поэтому записи
+    к разным мастерам и на разные дни идут параллельно; в SQLite он сразу
+    берёт блокировку записи, и последующая проверка видит актуальные данные.
+    Ключи блокируются в отсортированном порядке, чтобы не было взаимных блокировок.
+    """
+    now = timezone.now()
+    MasterDayLock.objects.bulk_create(
+        [MasterDayLock(master_id=master_id, date=day, locked_at=now) for master_id, day in sorted(keys)],
+        update_conflicts=True,
+        unique_fields=['master', 'date'],
+        update_fields=['locked_at'],
+    )
+
+
+def create_appointment(**data):
+    master, service = data['master'], data['service']
+
+    with transaction.atomic():
+        lock_master_day(master.id, data['date'])
+        if not is_slot_free(master.id, data['date'], data['time'], service.duration):
+            raise SlotTakenError(f'У мастера {master.name} это время уже занято')
+        appointment = Appointment.objects.create(**data)
+        SummaryDelta().add_appointment(appointment).apply()
+        invalidate_calendars([master.id])
+        # Письмо уходит в очередь в той же транзакции: ответ не ждёт SMTP,
+        # а при откате записи не останется и письма
+        enqueue_booking_confirmation(appointment)
+        return appointment
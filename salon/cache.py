@@ -0,0 +1,131 @@
+import time
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.cache import cache
+
+from .models import Service, Master
+
+
+CATALOG_VERSION_KEY = 'salon:catalog-version'
+CSRF_PLACEHOLDER = 'csrf-token-placeholder-3f6b1c'
+
+
+def get_version(key):
+    """Счётчик версии в кэше; создаётся при первом чтении."""
+    version = cache.get(key)
+    if version is None:
+        # Версия из времени: после вытеснения ключа она не вернётся к старому значению
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def bump_version(key):
+    try:
+        return cache.incr(key)
+    except ValueError:
+        get_version(key)
+        return cache.incr(key)
+
+
+def get_catalog_version():
+    return get_version(CATALOG_VERSION_KEY)
+
+
+def bump_catalog_version():
+    return bump_version(CATALOG_VERSION_KEY)
+
+
+def get_cached_page(name, render):
+    """
+    HTML страницы из кэша по текущей версии каталога; render() вызывается только при промахе.
+
+    Страница рендерится с CSRF_PLACEHOLDER вместо токена — подставляет его вызывающий код.
+    Хэш манифеста статики в ключе: после новой сборки страница ссылается на новые файлы.
+    """
+    static_version = getattr(staticfiles_storage, 'manifest_hash', '')
+    key = f'salon:page:{name}:{get_catalog_version()}:{static_version}'
+    content = cache.get(key)
+    if content is None:
+        content = render()
+        cache.set(key, content, settings.PAGE_CACHE_TIMEOUT)
+    return content
+
+
+# Последние прочитанные версионные значения в памяти процесса: {имя: (версия, значение)}
+_local = {}
+
+
+def get_versioned(name, build):
+    """
+    Значение build() для текущей версии каталога: память процесса, затем кэш, затем build().
+
+    Возвращает (версия, значение). Пока версия не сменилась, обращений к БД нет.
+    """
+    version = get_catalog_version()
+    cached_version, value = _local.get(name, (None, None))
+    if cached_version == version:
+        return version, value
+
+    key = f'salon:{name}:{version}'
+    value = cache.get(key)
+    if value is None:
+        value = build()
+        cache.set(key, value, settings.PAGE_CACHE_TIMEOUT)
+    _local[name] = (version, value)
+    return version, value
+
+
+def build_service_masters_map():
+    mapping = {}
+    rows = Master.services.through.objects.filter(
+        master__is_active=True
+    ).order_by('master__name', 'master_id').values_list(
+        'service_id', 'master_id', 'master__name', 'master__specialization'
+    )
+    for service_id, master_id, name, specialization in rows:
+        mapping.setdefault(service_id, []).append({
+            'id': master_id,
+            'name': name,
+            'specialization': specialization
+        })
+    return mapping
+
+
+def get_service_masters(service_id):
+    """Активные мастера услуги из предрасчитанной карты."""
+    return get_versioned('service-masters', build_service_masters_map)[1].get(service_id, [])
+
+
+def build_bootstrap():
+    services = Service.objects.filter(is_active=True).values_list(
+        'id', 'name', 'price', 'duration', 'category'
+    )
+    masters = Master.objects.filter(is_active=True).values_list('id', 'name', 'specialization')
+    pairs = Master.services.through.objects.filter(
+        master__is_active=True,
+        service__is_active=True
+    ).order_by('master__name', 'master_id').values_list('service_id', 'master_id')
+
+    service_masters = {}
+    for service_id, master_id in pairs:
+        service_masters.setdefault(service_id, []).append(master_id)
+
+    return {
+        'services': [
+            {'id': id, 'name': name, 'price': str(price), 'duration': duration, 'category': category}
+            for id, name, price, duration, category in services
+        ],
+        'masters': [
+            {'id': id, 'name': name, 'specialization': specialization}
+            for id, name, specialization in masters
+        ],
+        'service_masters': service_masters,
+    }
+
+
+def get_bootstrap():
+    """Каталог для формы записи: услуги, активные мастера и матрица услуга -> мастера."""
+    version, bootstrap = get_versioned('bootstrap', build_bootstrap)
+    return {'version': version, **bootstrap}
@@ -0,0 +1,228 @@
+"""
+Потоковая выгрузка записей в CSV и XLSX для бухгалтерии.
+
+Строки читаются через iterator(chunk_size=...) (на PostgreSQL — серверный
+курсор) и сразу отдаются клиенту, поэтому память не зависит от размера
+выгрузки. XLSX собирается вручную: лист пишется построчно в ZIP-поток
+с inline-строками, без sharedStrings и без промежуточного файла.
+"""
+import csv
+import re
+import zipfile
+from datetime import date, datetime, time
+from decimal import Decimal
+from xml.sax.saxutils import escape
+
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+from .models import Appointment
+
+
+CHUNK_SIZE = 2000
+
+# Начало текста, с которого Excel читает значение CSV как формулу
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+COLUMNS = [
+    ('id', 'ID'),
+    ('date', 'Дата'),
+    ('time', 'Время'),
+    ('client_name', 'Клиент'),
+    ('client_phone', 'Телефон'),
+    ('client_email', 'Email'),
+    ('master__name', 'Мастер'),
+    ('service__name', 'Услуга'),
+    ('service__price', 'Цена'),
+    ('status', 'Статус'),
+    ('comment', 'Комментарий'),
+    ('created_at', 'Создана'),
+]
+
+def export_rows(queryset, chunk_size=CHUNK_SIZE):
+    """Кортежи значений COLUMNS без загрузки моделей; статус — подписью."""
+    statuses = dict(Appointment.STATUS_CHOICES)
+    status_index = [name for name, _ in COLUMNS].index('status')
+    rows = queryset.order_by('date', 'time', 'id').values_list(*[name for name, _ in COLUMNS])
+    for row in rows.iterator(chunk_size=chunk_size):
+        row = list(row)
+        row[status_index] = statuses.get(row[status_index], row[status_index])
+        if row[-1] is not None:
+            row[-1] = timezone.localtime(row[-1]).replace(tzinfo=None)
+        yield row
+
+
+class Echo:
+    """Файлоподобный объект для csv.writer: write возвращает строку вместо записи."""
+
+    def write(self, value):
+        return value
+
+
+def stream_csv(rows):
+    writer = csv.writer(Echo())
+    # BOM — чтобы Excel открыл UTF-8 с кириллицей
+    yield '\ufeff' + writer.writerow([title for _, title in COLUMNS])
+    for row in rows:
+        yield writer.writerow([format_csv_value(value) for value in row])
+
+
+def format_csv_value(value):
+    if isinstance(value, datetime):
+        return value.strftime('%d.%m.%Y %H:%M')
+    if isinstance(value, date):
+        return value.strftime('%d.%m.%Y')
+    if isinstance(value, time):
+        return value.strftime('%H:%M')
+    # Имя, телефон и комментарий приходят из формы записи: апостроф не даёт выполнить их как формулу
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+class ZipStream:
+    """Несмещаемый поток для ZipFile: накапливает записанные байты до следующего pop()."""
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def flush(self):
+        pass
+
+    def pop(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+XLSX_EPOCH = datetime(1899, 12, 30)
+
+XLSX_PARTS = {
+    '[Content_Types].xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '<Override PartName="/xl/styles.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+        '</Types>'
+    ),
+    '_rels/.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+        'Target="xl/workbook.xml"/>'
+        '</Relationships>'
+    ),
+    'xl/workbook.xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        '<sheets><sheet name="Записи" sheetId="1" r:id="rId1"/></sheets>'
+        '</workbook>'
+    ),
+    'xl/_rels/workbook.xml.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+        'Target="worksheets/sheet1.xml"/>'
+        '<Relationship Id="rId2" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" '
+        'Target="styles.xml"/>'
+        '</Relationships>'
+    ),
+    # Стили ячеек: 1 — дата, 2 — время, 3 — дата и время
+    'xl/styles.xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+        '<numFmts count="1"><numFmt numFmtId="164" formatCode="dd.mm.yyyy hh:mm"/></numFmts>'
+        '<fonts count="1"><font><sz val="11"/><name val="Calibri"/></font></fonts>'
+        '<fills count="1"><fill><patternFill patternType="none"/></fill></fills>'
+        '<borders count="1"><border/></borders>'
+        '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+        '<cellXfs count="4">'
+        '<xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+        '<xf numFmtId="14" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+        '<xf numFmtId="20" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+        '<xf numFmtId="164" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+        '</cellXfs>'
+        '</styleSheet>'
+    ),
+}
+
+SHEET_START = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+)
+SHEET_END = '</sheetData></worksheet>'
+
+# Управляющие символы, запрещённые в XML 1.0: из формы записи они проходят, а лист с ними не откроется
+XML_ILLEGAL = re.compile(r'[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+
+def xlsx_cell(value):
+    if value is None or value == '':
+        return '<c/>'
+    if isinstance(value, datetime):
+        delta = value - XLSX_EPOCH
+        return f'<c s="3"><v>{delta.days + delta.seconds / 86400}</v></c>'
+    if isinstance(value, date):
+        return f'<c s="1"><v>{(value - XLSX_EPOCH.date()).days}</v></c>'
+    if isinstance(value, time):
+        return f'<c s="2"><v>{(value.hour * 3600 + value.minute * 60 + value.second) / 86400}</v></c>'
+    if isinstance(value, (int, float, Decimal)):
+        return f'<c><v>{value}</v></c>'
+    # Любой текст — inline-строка: Excel не вычисляет её как формулу, даже если она начинается с «=»
+    text = escape(XML_ILLEGAL.sub('', str(value)))
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+def xlsx_row(values):
+    return '<row>' + ''.join(xlsx_cell(value) for value in values) + '</row>'
+
+
+def stream_xlsx(rows, flush_every=500):
+    stream = ZipStream()
+    with zipfile.ZipFile(stream, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, content in XLSX_PARTS.items():
+            archive.writestr(name, content)
+        yield stream.pop()
+
+        with archive.open('xl/worksheets/sheet1.xml', 'w', force_zip64=True) as sheet:
+            sheet.write((SHEET_START + xlsx_row([title for _, title in COLUMNS])).encode())
+            for number, row in enumerate(rows, start=1):
+                sheet.write(xlsx_row(row).encode())
+                if number % flush_every == 0:
+                    data = stream.pop()
+                    if data:
+                        yield data
+            sheet.write(SHEET_END.encode())
+    yield stream.pop()
+
+
+FORMATS = {
+    'csv': (stream_csv, 'text/csv; charset=utf-8'),
+    'xlsx': (stream_xlsx, 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'),
+}
+
+
+def export_response(queryset, fmt, filename='appointments'):
+    stream, content_type = FORMATS[fmt]
+    response = StreamingHttpResponse(stream(export_rows(queryset)), content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="{filename}.{fmt}"'
+    return response
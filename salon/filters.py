@@ -0,0 +1,25 @@
+"""Фильтры списков записей: API, архив, выгрузка и админка."""
+from datetime import timedelta
+
+from django.utils import timezone
+
+
+# Периоды фильтра «Дата»: (начало, конец) в днях от сегодня; 'past' — все прошедшие дни
+DATE_PERIODS = {
+    'today': (0, 0),
+    'tomorrow': (1, 1),
+    'week': (0, 6),
+    'month': (0, 29),
+    'past_week': (-7, -1),
+    'past_month': (-30, -1),
+}
+
+
+def filter_period(queryset, period):
+    today = timezone.localdate()
+    if period == 'past':
+        return queryset.filter(date__lt=today)
+    if period in DATE_PERIODS:
+        start, end = DATE_PERIODS[period]
+        return queryset.filter(date__range=(today + timedelta(days=start), today + timedelta(days=end)))
+    return queryset
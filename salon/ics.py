@@ -0,0 +1,155 @@
+"""
+Календарь записей мастера в формате iCalendar (RFC 5545) для подписки с телефона.
+
+Лента закрыта токеном — HMAC от id мастера на SECRET_KEY, ссылку показывает
+админка мастера. В ленту попадает только окно CALENDAR_PAST_DAYS дней назад
+и CALENDAR_FUTURE_DAYS вперёд; отменённые записи остаются со STATUS:CANCELLED,
+чтобы календарь убрал ранее загруженные события.
+
+У каждого мастера своя версия в кэше, её увеличивают после коммита все пути
+изменения записей (invalidate_calendars). ETag строится из версии мастера,
+версии каталога (названия услуг) и текущего дня (окно сдвигается), поэтому
+ответ 304 и повторная выдача готового ICS не обращаются к БД.
+"""
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.crypto import constant_time_compare, salted_hmac
+
+from .cache import bump_version, get_catalog_version, get_version
+from .models import Appointment, Master
+
+
+PRODID = '-//Salon//Master calendar//RU'
+EVENT_STATUSES = {'new': 'TENTATIVE', 'confirmed': 'CONFIRMED', 'completed': 'CONFIRMED', 'cancelled': 'CANCELLED'}
+LINE_LIMIT = 75   # октетов в строке без CRLF
+
+
+def calendar_token(master_id):
+    return salted_hmac('salon.ics', str(master_id), algorithm='sha256').hexdigest()[:32]
+
+
+def check_calendar_token(master_id, token):
+    return bool(token) and constant_time_compare(token, calendar_token(master_id))
+
+
+def calendar_url(master_id):
+    return f'{reverse("master-calendar", args=[master_id])}?token={calendar_token(master_id)}'
+
+
+def version_key(master_id):
+    return f'salon:calendar-version:{master_id}'
+
+
+def get_calendar_version(master_id):
+    return get_version(version_key(master_id))
+
+
+def bump_calendar_version(master_id):
+    return bump_version(version_key(master_id))
+
+
+def invalidate_calendars(master_ids):
+    """Сбрасывает ленты мастеров после коммита: раньше читатель мог бы закэшировать старые данные под новой версией."""
+    master_ids = set(master_ids)
+    if master_ids:
+        transaction.on_commit(lambda: [bump_calendar_version(master_id) for master_id in master_ids])
+
+
+def calendar_window(today):
+    return today - timedelta(days=settings.CALENDAR_PAST_DAYS), today + timedelta(days=settings.CALENDAR_FUTURE_DAYS)
+
+
+def calendar_state(master_id, today):
+    """Строка состояния ленты: из неё ETag и ключ кэша готового ICS."""
+    return f'{master_id}.{get_catalog_version()}.{get_calendar_version(master_id)}.{today:%Y%m%d}'
+
+
+def escape(text):
+    return (
+        text.replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,')
+        .replace('\r\n', '\\n').replace('\n', '\\n')
+    )
+
+
+def fold(line):
+    """Переносит строку длиннее 75 октетов UTF-8, не разрывая символы."""
+    parts = []
+    current, size, limit = [], 0, LINE_LIMIT
+    for char in line:
+        width = len(char.encode())
+        if size + width > limit:
+            parts.append(''.join(current))
+            # Продолжение начинается с пробела, он тоже входит в 75 октетов
+            current, size, limit = [], 0, LINE_LIMIT - 1
+        current.append(char)
+        size += width
+    parts.append(''.join(current))
+    return '\r\n '.join(parts)
+
+
+def utc(value):
+    return value.astimezone(dt_timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+
+def render_calendar(master_name, rows):
+    stamp = utc(timezone.now())
+    lines = [
+        'BEGIN:VCALENDAR',
+        'VERSION:2.0',
+        f'PRODID:{PRODID}',
+        'CALSCALE:GREGORIAN',
+        'METHOD:PUBLISH',
+        f'X-WR-CALNAME:{escape(master_name)}',
+        f'X-WR-TIMEZONE:{settings.TIME_ZONE}',
+        # Подсказка клиентам, как часто опрашивать ленту
+        'REFRESH-INTERVAL;VALUE=DURATION:PT1H',
+        'X-PUBLISHED-TTL:PT1H',
+    ]
+    tz = timezone.get_default_timezone()
+    for pk, day, start_time, status, client_name, client_phone, comment, service_name, duration in rows:
+        start = datetime.combine(day, start_time, tzinfo=tz)
+        description = f'Телефон: {client_phone}'
+        if comment:
+            description += f'\nКомментарий: {comment}'
+        lines += [
+            'BEGIN:VEVENT',
+            f'UID:appointment-{pk}@salon',
+            f'DTSTAMP:{stamp}',
+            f'DTSTART:{utc(start)}',
+            f'DTEND:{utc(start + timedelta(minutes=duration))}',
+            f'SUMMARY:{escape(f"{service_name} — {client_name}")}',
+            f'DESCRIPTION:{escape(description)}',
+            f'STATUS:{EVENT_STATUSES[status]}',
+            'END:VEVENT',
+        ]
+    lines.append('END:VCALENDAR')
+    return ''.join(fold(line) + '\r\n' for line in lines)
+
+
+def build_calendar(master_id, today):
+    """ICS мастера за окно вокруг today; None, если мастера нет."""
+    master_name = Master.objects.filter(pk=master_id).values_list('name', flat=True).first()
+    if master_name is None:
+        return None
+    rows = Appointment.objects.filter(
+        master_id=master_id, date__range=calendar_window(today)
+    ).order_by('date', 'time', 'pk').values_list(
+        'pk', 'date', 'time', 'status', 'client_name', 'client_phone', 'comment', 'service__name', 'service__duration'
+    )
+    return render_calendar(master_name, rows)
+
+
+def get_calendar(master_id, state, today):
+    """Готовый ICS из кэша по состоянию ленты; build_calendar — только при промахе."""
+    key = f'salon:calendar:{state}'
+    content = cache.get(key)
+    if content is None:
+        content = build_calendar(master_id, today)
+        if content is not None:
+            cache.set(key, content, settings.PAGE_CACHE_TIMEOUT)
+    return content
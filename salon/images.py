@@ -0,0 +1,100 @@
+import posixpath
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+
+# Ширины производных изображений по полям, px. Ширина в имени файла — целевая:
+# если оригинал уже, вариант сохраняется в размере оригинала, без увеличения.
+IMAGE_VARIANTS = {
+    'salon.SalonInfo.hero_image': (640, 1280, 1920),
+    'salon.Master.photo': (320, 640),
+    'salon.Service.image': (320, 640),
+}
+
+# (формат для имени и srcset, формат Pillow, параметры сохранения)
+VARIANT_FORMATS = (
+    ('webp', 'WEBP', {'quality': 80, 'method': 6}),
+    ('jpeg', 'JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+)
+
+VARIANTS_DIR = 'variants'
+
+
+def field_widths(field):
+    return IMAGE_VARIANTS.get(f'{field.model._meta.label}.{field.name}', ())
+
+
+def variant_name(name, width, fmt):
+    """masters/anna.png -> variants/masters/anna-320w.webp: имя детерминировано, генерация идемпотентна."""
+    root, _ = posixpath.splitext(name)
+    return posixpath.join(VARIANTS_DIR, f'{root}-{width}w.{fmt}')
+
+
+def variant_urls(name, widths, url):
+    """[{'width', 'webp', 'jpeg'}, ...] для файла name; url — функция имя -> URL."""
+    if not name or not widths:
+        return None
+    return [
+        {'width': width, **{fmt: url(variant_name(name, width, fmt)) for fmt, _, _ in VARIANT_FORMATS}}
+        for width in widths
+    ]
+
+
+def srcset(name, widths, fmt, url):
+    return ', '.join(f'{url(variant_name(name, width, fmt))} {width}w' for width in widths)
+
+
+def render_variant(image, width, pillow_format, options):
+    if image.width > width:
+        image = image.resize((width, round(image.height * width / image.width)), Image.LANCZOS)
+    if pillow_format == 'JPEG' and image.mode != 'RGB':
+        background = Image.new('RGB', image.size, 'white')
+        background.paste(image, mask=image.getchannel('A') if 'A' in image.getbands() else None)
+        image = background
+    buffer = BytesIO()
+    image.save(buffer, pillow_format, **options)
+    return buffer.getvalue()
+
+
+def generate_variants(storage, name, widths, force=False):
+    """
+    Создаёт недостающие варианты файла name; возвращает число созданных.
+
+    Уже существующие варианты не трогаются (force=True — пересоздать все),
+    поэтому повторный запуск ничего не делает.
+    """
+    targets = [
+        (variant_name(name, width, fmt), width, pillow_format, options)
+        for width in widths
+        for fmt, pillow_format, options in VARIANT_FORMATS
+    ]
+    if not force:
+        targets = [target for target in targets if not storage.exists(target[0])]
+    if not targets:
+        return 0
+
+    with storage.open(name, 'rb') as file:
+        image = ImageOps.exif_transpose(Image.open(file))
+        image.load()
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if 'transparency' in image.info or 'A' in image.getbands() else 'RGB')
+
+    for target, width, pillow_format, options in targets:
+        content = render_variant(image, width, pillow_format, options)
+        if storage.exists(target):
+            storage.delete(target)
+        storage.save(target, ContentFile(content))
+    return len(targets)
+
+
+def generate_instance_variants(instance, force=False):
+    """Варианты для всех полей-изображений экземпляра из IMAGE_VARIANTS."""
+    created = 0
+    for field in instance._meta.fields:
+        widths = field_widths(field)
+        file = getattr(instance, field.name) if widths else None
+        if file:
+            created += generate_variants(file.storage, file.name, widths, force=force)
+    return created
@@ -0,0 +1,239 @@
+import csv
+import json
+from collections import defaultdict
+from datetime import datetime
+
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import transaction
+from django.db.models import Q
+
+from .models import Service, Master, Appointment
+from .availability import IntervalIndex, FREEING_STATUS, to_minutes
+from .booking import lock_master_days
+from .ics import invalidate_calendars
+from .reports import SummaryDelta
+
+
+IMPORT_FIELDS = [
+    'client_name',
+    'client_phone',
+    'client_email',
+    'master',
+    'service',
+    'date',
+    'time',
+    'status',
+    'comment'
+]
+DATE_FORMATS = ['%Y-%m-%d', '%d.%m.%Y']
+TIME_FORMATS = ['%H:%M', '%H:%M:%S']
+JSONL_CONTENT_TYPES = ['application/x-ndjson', 'application/jsonl', 'application/json-lines']
+
+
+def detect_format(name='', content_type=''):
+    if content_type.startswith('text/csv') or name.endswith('.csv'):
+        return 'csv'
+    if content_type.split(';')[0].strip() in JSONL_CONTENT_TYPES or name.endswith(('.jsonl', '.ndjson')):
+        return 'jsonl'
+    return None
+
+
+def read_rows(lines, fmt):
+    """
+    Записи из CSV с заголовком или JSON lines: (номер записи, dict или текст ошибки).
+
+    lines — итератор строк текста, файл читается потоком.
+    """
+    if fmt == 'csv':
+        for number, row in enumerate(csv.DictReader(lines), start=1):
+            yield number, row
+        return
+
+    number = 0
+    for line in lines:
+        if not line.strip():
+            continue
+        number += 1
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError as error:
+            yield number, f'Некорректный JSON: {error.msg}'
+            continue
+        yield number, row if isinstance(row, dict) else 'Ожидался JSON-объект'
+
+
+def parse_value(value, formats):
+    for fmt in formats:
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            pass
+    return None
+
+
+class AppointmentImporter:
+    """
+    Пакетный импорт записей: проверка пачками по заранее загруженным справочникам,
+    вставка через bulk_create — одна транзакция на пачку, ошибки — построчно.
+    """
+
+    def __init__(self, batch_size=1000, dry_run=False):
+        self.batch_size = batch_size
+        self.dry_run = dry_run
+        self.masters = dict(Master.objects.values_list('id', 'name'))
+        self.services = {
+            pk: (category, price, duration)
+            for pk, category, price, duration in Service.objects.values_list('id', 'category', 'price', 'duration')
+        }
+        self.durations = {pk: duration for pk, (_, _, duration) in self.services.items()}
+        self.pairs = set(Master.services.through.objects.values_list('master_id', 'service_id'))
+        self.statuses = dict(Appointment.STATUS_CHOICES)
+        self.max_lengths = {
+            field: Appointment._meta.get_field(field).max_length
+            for field in ('client_name', 'client_phone')
+        }
+        self.created = 0
+        self.total = 0
+        self.errors = []
+
+    def run(self, rows):
+        batch = []
+        for number, row in rows:
+            self.total += 1
+            batch.append((number, row))
+            if len(batch) >= self.batch_size:
+                self.import_batch(batch)
+                batch = []
+        if batch:
+            self.import_batch(batch)
+        return self.report()
+
+    def report(self):
+        return {
+            'total': self.total,
+            'created': self.created,
+            'failed': len(self.errors),
+            'dry_run': self.dry_run,
+            'errors': self.errors
+        }
+
+    def import_batch(self, batch):
+        valid = []
+        for number, row in batch:
+            if isinstance(row, str):
+                self.errors.append({'row': number, 'errors': {'row': row}})
+                continue
+            data, errors = self.clean_row(row)
+            if errors:
+                self.errors.append({'row': number, 'errors': errors})
+            else:
+                valid.append((number, data))
+
+        if not valid:
+            return
+
+        keys = {(data['master_id'], data['date']) for _, data in valid}
+        with transaction.atomic():
+            if not self.dry_run:
+                lock_master_days(keys)
+            index = self.load_busy(keys)
+            accepted = []
+            for number, data in valid:
+                if data['status'] != FREEING_STATUS:
+                    key = (data['master_id'], data['date'])
+                    start = to_minutes(data['time'])
+                    end = start + self.durations[data['service_id']]
+                    if not index.is_free(key, start, end):
+                        self.errors.append({'row': number, 'errors': {'time': 'Пересекается с другой записью мастера'}})
+                        continue
+                    index.insert(key, start, end)
+                accepted.append(Appointment(**data))
+
+            if not self.dry_run:
+                Appointment.objects.bulk_create(accepted, batch_size=self.batch_size)
+                delta = SummaryDelta()
+                for appointment in accepted:
+                    delta.add(appointment.date, appointment.master_id, *self.services[appointment.service_id],
+                              appointment.status)
+                delta.apply()
+                invalidate_calendars(appointment.master_id for appointment in accepted)
+            self.created += len(accepted)
+
+    def busy_rows(self, keys):
+        """Записи ровно тех (мастер, день), что есть в пачке, а не всего диапазона её дат."""
+        days = defaultdict(set)
+        for master_id, day in keys:
+            days[master_id].add(day)
+        condition = Q()
+        for master_id, master_days in days.items():
+            condition |= Q(master_id=master_id, date__in=sorted(master_days))
+        return Appointment.objects.filter(condition).exclude(
+            status=FREEING_STATUS
+        ).order_by().values_list('master_id', 'date', 'time', 'service__duration')
+
+    def load_busy(self, keys):
+        """Занятость всех (мастер, день) пачки одним запросом по индексу (master, date, time)."""
+        index = IntervalIndex()
+        for master_id, day, start_time, duration in self.busy_rows(keys):
+            start = to_minutes(start_time)
+            index.add((master_id, day), start, start + duration)
+        return index.build()
+
+    def clean_row(self, row):
+        errors = {}
+        value = {field: str(row.get(field) or '').strip() for field in IMPORT_FIELDS}
+
+        for field in ('client_name', 'client_phone', 'master', 'service', 'date', 'time'):
+            if not value[field]:
+                errors[field] = 'Обязательное поле'
+
+        for field, max_length in self.max_lengths.items():
+            if len(value[field]) > max_length:
+                errors[field] = f'Не длиннее {max_length} символов'
+
+        if value['client_phone'] and 'client_phone' not in errors:
+            try:
+                Appointment.phone_regex(value['client_phone'])
+            except ValidationError as error:
+                errors['client_phone'] = error.messages[0]
+
+        if value['client_email']:
+            try:
+                validate_email(value['client_email'])
+            except ValidationError:
+                errors['client_email'] = 'Некорректный email'
+
+        status = value['status'] or 'new'
+        if status not in self.statuses:
+            errors['status'] = f'Допустимые значения: {", ".join(self.statuses)}'
+
+        day = parse_value(value['date'], DATE_FORMATS) if value['date'] else None
+        if value['date'] and day is None:
+            errors['date'] = 'Дата в формате ГГГГ-ММ-ДД или ДД.ММ.ГГГГ'
+        start = parse_value(value['time'], TIME_FORMATS) if value['time'] else None
+        if value['time'] and start is None:
+            errors['time'] = 'Время в формате ЧЧ:ММ'
+
+        master_id = int(value['master']) if value['master'].isdigit() else None
+        service_id = int(value['service']) if value['service'].isdigit() else None
+        if value['master'] and master_id not in self.masters:
+            errors['master'] = 'Мастер не найден'
+        if value['service'] and service_id not in self.durations:
+            errors['service'] = 'Услуга не найдена'
+        if 'master' not in errors and 'service' not in errors and (master_id, service_id) not in self.pairs:
+            errors['service'] = f'Мастер {self.masters.get(master_id)} не оказывает эту услугу'
+
+        if errors:
+            return None, errors
+        return {
+            'client_name': value['client_name'],
+            'client_phone': value['client_phone'],
+            'client_email': value['client_email'],
+            'master_id': master_id,
+            'service_id': service_id,
+            'date': day.date(),
+            'time': start.time(),
+            'status': status,
+            'comment': value['comment']
+        }, None
@@ -0,0 +1,45 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from salon.archive import ARCHIVE_STATUSES, CHUNK_SIZE, archive_appointments, archive_candidates
+
+
+class Command(BaseCommand):
+    help = 'Перенос старых выполненных и отменённых записей в архив пачками'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--older-than', type=int, required=True, help='Переносить записи старше стольких дней')
+        parser.add_argument('--batch-size', type=int, default=CHUNK_SIZE, help='Записей в одной транзакции')
+        parser.add_argument('--statuses', default=','.join(ARCHIVE_STATUSES), help='Статусы через запятую')
+        parser.add_argument('--pause', type=float, default=0.1, help='Пауза между пачками, сек.')
+        parser.add_argument('--dry-run', action='store_true', help='Только посчитать записи')
+
+    def handle(self, *args, **options):
+        if options['older_than'] < 1:
+            raise CommandError('--older-than должен быть не меньше 1 дня')
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size должен быть положительным')
+
+        before = timezone.localdate() - timedelta(days=options['older_than'])
+        statuses = [status.strip() for status in options['statuses'].split(',') if status.strip()]
+
+        if options['dry_run']:
+            count = archive_candidates(before, statuses).count()
+            self.stdout.write(f'К переносу: {count} (записи до {before:%d.%m.%Y})')
+            return
+
+        moved = 0
+        try:
+            for count in archive_appointments(before, statuses, chunk_size=options['batch_size']):
+                moved += count
+                if options['verbosity'] > 1:
+                    self.stdout.write(f'Перенесено: {moved}')
+                # Пауза отдаёт блокировку записи запросам сайта
+                time.sleep(options['pause'])
+        except KeyboardInterrupt:
+            self.stdout.write('Прервано, повторный запуск продолжит перенос')
+
+        self.stdout.write(f'Перенесено в архив: {moved} (записи до {before:%d.%m.%Y})')
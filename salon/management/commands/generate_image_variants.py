@@ -0,0 +1,31 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand
+
+from salon.images import IMAGE_VARIANTS, generate_variants
+
+
+class Command(BaseCommand):
+    help = 'Создание производных изображений (размеры, WebP и JPEG) для всех загруженных файлов'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Пересоздать уже существующие варианты')
+
+    def handle(self, *args, **options):
+        files = created = failed = 0
+        for path, widths in IMAGE_VARIANTS.items():
+            label, field_name = path.rsplit('.', 1)
+            model = apps.get_model(label)
+            storage = model._meta.get_field(field_name).storage
+            names = model.objects.exclude(**{field_name: ''}).exclude(**{f'{field_name}__isnull': True})
+
+            for name in names.values_list(field_name, flat=True).distinct().iterator():
+                files += 1
+                try:
+                    created += generate_variants(storage, name, widths, force=options['force'])
+                except OSError as error:
+                    failed += 1
+                    self.stderr.write(f'{name}: {error}')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Файлов: {files}, создано вариантов: {created}, ошибок: {failed}'
+        ))
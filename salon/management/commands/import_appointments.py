@@ -0,0 +1,41 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from salon.importer import AppointmentImporter, detect_format, read_rows
+
+
+class Command(BaseCommand):
+    help = 'Импорт записей из CSV или JSON lines с построчным отчётом об ошибках'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Файл .csv или .jsonl')
+        parser.add_argument('--input-format', choices=['csv', 'jsonl'], help='Формат, если не ясен из расширения')
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--dry-run', action='store_true', help='Только проверить, ничего не записывать')
+        parser.add_argument('--report', help='Сохранить полный отчёт в JSON-файл')
+
+    def handle(self, *args, **options):
+        fmt = options['input_format'] or detect_format(name=options['path'])
+        if fmt is None:
+            raise CommandError('Не удалось определить формат: укажите --input-format')
+
+        importer = AppointmentImporter(batch_size=options['batch_size'], dry_run=options['dry_run'])
+        try:
+            with open(options['path'], encoding='utf-8-sig', newline='') as lines:
+                report = importer.run(read_rows(lines, fmt))
+        except OSError as error:
+            raise CommandError(error)
+
+        for error in report['errors']:
+            details = '; '.join(f'{field}: {message}' for field, message in error['errors'].items())
+            self.stderr.write(f'Строка {error["row"]}: {details}')
+
+        if options['report']:
+            with open(options['report'], 'w', encoding='utf-8') as file:
+                json.dump(report, file, ensure_ascii=False, indent=2)
+
+        verb = 'Проверено' if report['dry_run'] else 'Импортировано'
+        self.stdout.write(self.style.SUCCESS(
+            f'{verb}: {report["created"]} из {report["total"]}, ошибок: {report["failed"]}'
+        ))
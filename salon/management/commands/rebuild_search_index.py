@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+
+from salon.search import rebuild_index
+
+
+class Command(BaseCommand):
+    help = 'Пересоздание полнотекстового индекса услуг и мастеров'
+
+    def handle(self, *args, **options):
+        self.stdout.write(f'Проиндексировано: {rebuild_index()}')
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from salon.reports import rebuild_summaries
+
+
+class Command(BaseCommand):
+    help = 'Пересчёт сводок выручки и загрузки по записям и архиву'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--from', dest='date_from', help='С даты ГГГГ-ММ-ДД (по умолчанию — все)')
+        parser.add_argument('--to', dest='date_to', help='По дату ГГГГ-ММ-ДД включительно')
+
+    def handle(self, *args, **options):
+        days = {}
+        for option in ('date_from', 'date_to'):
+            value = options[option]
+            try:
+                days[option] = parse_date(value) if value else None
+            except ValueError:
+                days[option] = None
+            if value and days[option] is None:
+                raise CommandError(f'--{option[5:]}: дата в формате ГГГГ-ММ-ДД')
+
+        rows = rebuild_summaries(days['date_from'], days['date_to'])
+        self.stdout.write(f'Строк сводок: {rows}')
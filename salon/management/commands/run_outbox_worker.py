@@ -0,0 +1,31 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from salon.outbox import OutboxWorker
+
+
+class Command(BaseCommand):
+    help = 'Отправка писем из очереди (outbox) пачками с повторами'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Отправить готовое и выйти')
+        parser.add_argument('--batch-size', type=int, help='Писем за одну выборку')
+        parser.add_argument('--max-attempts', type=int, help='После стольких ошибок письмо помечается как failed')
+        parser.add_argument('--interval', type=float, default=5, help='Пауза между проверками пустой очереди, сек.')
+
+    def handle(self, *args, **options):
+        worker = OutboxWorker(batch_size=options['batch_size'], max_attempts=options['max_attempts'])
+
+        try:
+            while True:
+                close_old_connections()
+                sent, retried, failed = worker.drain()
+                if sent or retried or failed:
+                    self.stdout.write(f'Отправлено: {sent}, отложено: {retried}, ошибок: {failed}')
+                if options['once']:
+                    break
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            pass
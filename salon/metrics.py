@@ -0,0 +1,186 @@
+import logging
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+
+
+logger = logging.getLogger('salon.slow_queries')
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)   # сек.
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+# имя: (тип, описание, границы корзин для гистограмм)
+METRICS = {
+    'salon_http_request_duration_seconds': ('histogram', 'Время обработки запроса', LATENCY_BUCKETS),
+    'salon_http_requests_total': ('counter', 'Запросы по статусу ответа', None),
+    'salon_http_response_bytes_total': ('counter', 'Объём тел ответов', None),
+    'salon_db_queries_per_request': ('histogram', 'SQL-запросов на один HTTP-запрос', QUERY_COUNT_BUCKETS),
+    'salon_db_query_duration_seconds_total': ('counter', 'Суммарное время SQL-запросов', None),
+    'salon_db_slow_queries_total': ('counter', 'SQL-запросы дольше METRICS_SLOW_QUERY_MS', None),
+}
+
+
+class Histogram:
+    __slots__ = ('buckets', 'counts', 'sum', 'count')
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+def format_labels(labels, **extra):
+    pairs = list(labels) + list(extra.items())
+    escaped = (
+        (name, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for name, value in pairs
+    )
+    return '{' + ','.join(f'{name}="{value}"' for name, value in escaped) + '}'
+
+
+class MetricsRegistry:
+    """
+    Метрики процесса в памяти; экспорт в текстовом формате Prometheus.
+
+    У каждого воркера свой реестр: при нескольких воркерах Prometheus
+    собирает каждый процесс отдельно или суммирует по меткам.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._values = {name: {} for name in METRICS}
+
+    def inc(self, name, labels, amount=1):
+        series = self._values[name]
+        series[labels] = series.get(labels, 0) + amount
+
+    def observe(self, name, labels, value):
+        series = self._values[name]
+        histogram = series.get(labels)
+        if histogram is None:
+            histogram = series[labels] = Histogram(METRICS[name][2])
+        histogram.observe(value)
+
+    def record_request(self, view, method, status, duration, size, queries):
+        labels = (('view', view), ('method', method))
+        with self._lock:
+            self.observe('salon_http_request_duration_seconds', labels, duration)
+            self.inc('salon_http_requests_total', labels + (('status', str(status)),))
+            self.inc('salon_http_response_bytes_total', labels, size)
+            self.observe('salon_db_queries_per_request', labels, queries.count)
+            self.inc('salon_db_query_duration_seconds_total', labels, queries.duration)
+            if queries.slow:
+                self.inc('salon_db_slow_queries_total', labels, queries.slow)
+
+    def render(self):
+        lines = []
+        with self._lock:
+            for name, (kind, description, _) in METRICS.items():
+                lines.append(f'# HELP {name} {description}')
+                lines.append(f'# TYPE {name} {kind}')
+                for labels, value in sorted(self._values[name].items()):
+                    if kind == 'histogram':
+                        lines.extend(self.render_histogram(name, labels, value))
+                    else:
+                        lines.append(f'{name}{format_labels(labels)} {value:g}')
+        return '\n'.join(lines) + '\n'
+
+    @staticmethod
+    def render_histogram(name, labels, histogram):
+        cumulative = 0
+        for bound, count in zip(histogram.buckets + ('+Inf',), histogram.counts):
+            cumulative += count
+            yield f'{name}_bucket{format_labels(labels, le=bound)} {cumulative}'
+        yield f'{name}_sum{format_labels(labels)} {histogram.sum:g}'
+        yield f'{name}_count{format_labels(labels)} {histogram.count}'
+
+
+registry = MetricsRegistry()
+
+
+# QueryStats текущего HTTP-запроса. Переменная контекста копируется и в потоки
+# sync_to_async, где асинхронные вьюхи выполняют ORM-запросы на своих соединениях
+current_queries = ContextVar('salon_current_queries', default=None)
+
+
+def record_query(execute, sql, params, many, context):
+    """execute_wrapper всех соединений (ставится при подключении): учёт в QueryStats текущего запроса."""
+    queries = current_queries.get()
+    if queries is None:
+        return execute(sql, params, many, context)
+    return queries(execute, sql, params, many, context)
+
+
+@contextmanager
+def collect_queries(queries):
+    token = current_queries.set(queries)
+    try:
+        yield queries
+    finally:
+        current_queries.reset(token)
+
+
+class QueryStats:
+    """
+    Число и время SQL одного HTTP-запроса (через record_query).
+
+    Запросы дольше METRICS_SLOW_QUERY_MS пишутся в лог salon.slow_queries
+    вместе с планом (EXPLAIN QUERY PLAN в SQLite, EXPLAIN в PostgreSQL).
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.slow = 0
+        self.threshold = settings.METRICS_SLOW_QUERY_MS / 1000
+        self._explaining = False
+
+    def __call__(self, execute, sql, params, many, context):
+        if self._explaining:
+            return execute(sql, params, many, context)
+
+        started = time.perf_counter()
+        succeeded = False
+        try:
+            result = execute(sql, params, many, context)
+            succeeded = True
+            return result
+        finally:
+            elapsed = time.perf_counter() - started
+            self.count += 1
+            self.duration += elapsed
+            if self.threshold and elapsed >= self.threshold:
+                self.slow += 1
+                # План только для успешных запросов: после ошибки транзакция в PostgreSQL уже прервана
+                self.log_slow_query(sql, params, many, elapsed, context['connection'], explain=succeeded)
+
+    def log_slow_query(self, sql, params, many, elapsed, connection, explain=True):
+        plan = None
+        if explain and not many and sql.lstrip()[:6].upper() == 'SELECT':
+            self._explaining = True
+            try:
+                with connection.cursor() as cursor:
+                    cursor.execute(f'{connection.ops.explain_query_prefix()} {sql}', params)
+                    plan = '\n'.join(' '.join(str(column) for column in row) for row in cursor.fetchall())
+            except Exception as error:
+                plan = f'EXPLAIN не удался: {error}'
+            finally:
+                self._explaining = False
+        logger.warning(
+            'Медленный запрос %.1f мс: %s; параметры: %r%s',
+            elapsed * 1000, sql, params, f'\nПлан:\n{plan}' if plan else ''
+        )
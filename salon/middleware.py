@@ -0,0 +1,158 @@
+import mimetypes
+import os
+import re
+import time
+from urllib.parse import urlsplit
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+from .metrics import registry, QueryStats, collect_queries
+
+
+# style.3f2a9c81d0e4.css: имя с хэшем содержимого от ManifestStaticFilesStorage
+HASHED_NAME = re.compile(r'\.[0-9a-f]{12}\.[^./]+$')
+IMMUTABLE = 'public, max-age=31536000, immutable'
+REVALIDATE = 'public, max-age=0, must-revalidate'
+
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+
+def accepted_encodings(header):
+    """Кодировки из Accept-Encoding с ненулевым q."""
+    accepted = set()
+    for item in header.split(','):
+        coding, _, params = item.strip().partition(';')
+        q = params.strip()
+        if q.startswith('q=') and q[2:].strip() in ('0', '0.0', '0.00', '0.000'):
+            continue
+        accepted.add(coding.strip().lower())
+    return accepted
+
+
+class AsyncCapableMiddleware:
+    """
+    Основа middleware, работающих и в WSGI, и в ASGI без адаптации цепочки:
+    под uvicorn асинхронные вьюхи не должны ходить через sync_to_async ради middleware.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.handle(request)
+
+
+class StaticFilesMiddleware(AsyncCapableMiddleware):
+    """
+    Отдаёт собранную статику из STATIC_ROOT без похода во вьюхи.
+
+    Файлы с хэшем в имени кэшируются браузером навсегда (immutable), остальные —
+    с обязательной перепроверкой по ETag. Если клиент принимает br или gzip и
+    рядом лежит .br/.gz, отдаётся предварительно сжатый файл.
+    """
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.prefix = urlsplit(settings.STATIC_URL).path
+        self.root = str(settings.STATIC_ROOT) if settings.STATIC_ROOT else None
+
+    def static_name(self, request):
+        if (
+            self.root is None
+            or request.method not in ('GET', 'HEAD')
+            or not request.path_info.startswith(self.prefix)
+        ):
+            return None
+        return request.path_info[len(self.prefix):]
+
+    def handle(self, request):
+        name = self.static_name(request)
+        response = self.serve(request, name) if name is not None else None
+        return response if response is not None else self.get_response(request)
+
+    async def __acall__(self, request):
+        name = self.static_name(request)
+        # Обращения к файловой системе — в потоке, только для запросов к статике
+        response = await sync_to_async(self.serve)(request, name) if name is not None else None
+        return response if response is not None else await self.get_response(request)
+
+    def serve(self, request, name):
+        try:
+            path = safe_join(self.root, name)
+        except SuspiciousFileOperation:
+            return None
+        if not os.path.isfile(path):
+            return None
+
+        encoding, served_path = None, path
+        accepted = accepted_encodings(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        for coding, suffix in ENCODINGS:
+            if coding in accepted and os.path.isfile(path + suffix):
+                encoding, served_path = coding, path + suffix
+                break
+
+        stat = os.stat(served_path)
+        etag = quote_etag(f'{int(stat.st_mtime):x}-{stat.st_size:x}')
+        last_modified = http_date(stat.st_mtime)
+
+        response = get_conditional_response(request, etag=etag, last_modified=int(stat.st_mtime))
+        if response is None:
+            content_type = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+            response = FileResponse(
+                open(served_path, 'rb'), content_type=content_type, filename=os.path.basename(path)
+            )
+            if encoding:
+                response.headers['Content-Encoding'] = encoding
+
+        response.headers['ETag'] = etag
+        response.headers['Last-Modified'] = last_modified
+        response.headers['Vary'] = 'Accept-Encoding'
+        response.headers['Cache-Control'] = IMMUTABLE if HASHED_NAME.search(name) else REVALIDATE
+        return response
+
+
+class MetricsMiddleware(AsyncCapableMiddleware):
+    """
+    Время ответа, статус, размер тела и SQL (число и время запросов) по вьюхам.
+
+    Метка view — имя URL-маршрута, а не путь, чтобы число рядов метрик не росло
+    с каждым id. Экспорт — /metrics (salon.views.metrics).
+    """
+
+    def handle(self, request):
+        queries = QueryStats()
+        started = time.perf_counter()
+        with collect_queries(queries):
+            response = self.get_response(request)
+        return self.record(request, response, queries, started)
+
+    async def __acall__(self, request):
+        queries = QueryStats()
+        started = time.perf_counter()
+        with collect_queries(queries):
+            response = await self.get_response(request)
+        return self.record(request, response, queries, started)
+
+    def record(self, request, response, queries, started):
+        duration = time.perf_counter() - started
+
+        match = request.resolver_match
+        view = (match.view_name or match.route) if match else 'unmatched'
+        if response.streaming:
+            size = int(response.headers.get('Content-Length') or 0)
+        else:
+            size = len(response.content)
+        registry.record_request(view, request.method, response.status_code, duration, size, queries)
+        return response
@@ -0,0 +1,29 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('salon', '0002_appointment_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MasterDayLock',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name='Дата')),
+                ('locked_at', models.DateTimeField(verbose_name='Последняя блокировка')),
+                ('master', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='salon.master', verbose_name='Мастер')),
+            ],
+            options={
+                'verbose_name': 'Блокировка дня мастера',
+                'verbose_name_plural': 'Блокировки дней мастеров',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='masterdaylock',
+            constraint=models.UniqueConstraint(fields=('master', 'date'), name='salon_master_day_lock_unique'),
+        ),
+    ]
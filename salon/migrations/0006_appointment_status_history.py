@@ -0,0 +1,35 @@
+# Generated by Django 4.2.30 on 2026-10-18 14:22
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('salon', '0005_outbox_message'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AppointmentStatusChange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('old_status', models.CharField(choices=[('new', 'Новая'), ('confirmed', 'Подтверждена'), ('completed', 'Выполнена'), ('cancelled', 'Отменена')], max_length=20, verbose_name='Был статус')),
+                ('new_status', models.CharField(choices=[('new', 'Новая'), ('confirmed', 'Подтверждена'), ('completed', 'Выполнена'), ('cancelled', 'Отменена')], max_length=20, verbose_name='Стал статус')),
+                ('changed_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Когда')),
+                ('source', models.CharField(default='admin', help_text='admin, api, system', max_length=20, verbose_name='Источник')),
+                ('appointment', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='status_history', to='salon.appointment', verbose_name='Запись')),
+                ('changed_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Кто')),
+            ],
+            options={
+                'verbose_name': 'Смена статуса',
+                'verbose_name_plural': 'История статусов',
+                'ordering': ['appointment', 'changed_at', 'id'],
+                'indexes': [models.Index(fields=['appointment', 'changed_at'], name='salon_status_change_idx')],
+            },
+        ),
+    ]
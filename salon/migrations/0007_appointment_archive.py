@@ -0,0 +1,39 @@
+# Generated by Django 4.2.30 on 2026-10-18 14:27
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('salon', '0006_appointment_status_history'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AppointmentArchive',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False, verbose_name='ID записи')),
+                ('client_name', models.CharField(max_length=200, verbose_name='Имя клиента')),
+                ('client_phone', models.CharField(max_length=15, verbose_name='Телефон')),
+                ('client_email', models.EmailField(blank=True, max_length=254, verbose_name='Email')),
+                ('date', models.DateField(verbose_name='Дата')),
+                ('time', models.TimeField(verbose_name='Время')),
+                ('status', models.CharField(choices=[('new', 'Новая'), ('confirmed', 'Подтверждена'), ('completed', 'Выполнена'), ('cancelled', 'Отменена')], max_length=20, verbose_name='Статус')),
+                ('comment', models.TextField(blank=True, verbose_name='Комментарий')),
+                ('created_at', models.DateTimeField(verbose_name='Дата создания')),
+                ('status_history', models.JSONField(blank=True, default=list, verbose_name='История статусов')),
+                ('archived_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Перенесена в архив')),
+                ('master', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_appointments', to='salon.master', verbose_name='Мастер')),
+                ('service', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_appointments', to='salon.service', verbose_name='Услуга')),
+            ],
+            options={
+                'verbose_name': 'Архивная запись',
+                'verbose_name_plural': 'Архив записей',
+                'ordering': ['-date', '-time'],
+                'indexes': [models.Index(fields=['date', 'time'], name='salon_archive_date_time_idx'), models.Index(fields=['master', 'date', 'time'], name='salon_archive_master_idx'), models.Index(fields=['client_phone', 'date'], name='salon_archive_phone_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 4.2.30 on 2026-10-18 14:31
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('salon', '0007_appointment_archive'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailySummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(verbose_name='День')),
+                ('category', models.CharField(choices=[('hair', 'Парикмахерские услуги'), ('nails', 'Маникюр и педикюр'), ('face', 'Уход за лицом'), ('body', 'Уход за телом'), ('makeup', 'Макияж'), ('other', 'Другое')], max_length=20, verbose_name='Категория')),
+                ('bookings', models.IntegerField(default=0, help_text='Кроме отменённых', verbose_name='Записей')),
+                ('booked_minutes', models.IntegerField(default=0, verbose_name='Занято минут')),
+                ('booked_revenue', models.DecimalField(decimal_places=2, default=0, max_digits=12, verbose_name='Ожидаемая выручка')),
+                ('completed', models.IntegerField(default=0, verbose_name='Выполнено')),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, help_text='По выполненным записям', max_digits=12, verbose_name='Выручка')),
+                ('cancellations', models.IntegerField(default=0, verbose_name='Отмен')),
+                ('master', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='salon.master', verbose_name='Мастер')),
+            ],
+            options={
+                'verbose_name': 'Сводка за день',
+                'verbose_name_plural': 'Сводки по дням',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='dailysummary',
+            constraint=models.UniqueConstraint(fields=('day', 'master', 'category'), name='salon_summary_unique'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+from django.db import migrations
+
+from salon.search import TABLE, create_index, rebuild_index
+
+
+def create(apps, schema_editor):
+    create_index(schema_editor)
+    rebuild_index({
+        'service': apps.get_model('salon', 'Service'),
+        'master': apps.get_model('salon', 'Master'),
+    })
+
+
+def drop(apps, schema_editor):
+    schema_editor.execute(f'DROP TABLE {TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('salon', '0008_daily_summary'),
+    ]
+
+    operations = [
+        migrations.RunPython(create, drop),
+    ]
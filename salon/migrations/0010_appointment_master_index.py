@@ -0,0 +1,19 @@
+# Generated by Django 4.2.30 on 2026-10-18 15:03
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('salon', '0009_search_index'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='appointment',
+            name='master',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='appointments', to='salon.master', verbose_name='Мастер'),
+        ),
+    ]
@@ -1,5 +1,7 @@
+from django.conf import settings
 from django.db import models
 from django.core.validators import RegexValidator
+from django.utils import timezone
 
 
 class SalonInfo(models.Model):
@@ -171,6 +173,7 @@ class Appointment(models.Model):
         Master,
         on_delete=models.CASCADE,
         related_name='appointments',
+        db_index=False,  # покрыт salon_appt_master_slot_idx (master, date, time)
         verbose_name='Мастер'
     )
     service = models.ForeignKey(
@@ -205,11 +208,303 @@ class Appointment(models.Model):
         verbose_name = 'Запись'
         verbose_name_plural = 'Записи'
         ordering = ['-date', '-time']
+        indexes = [
+            # Сортировка по умолчанию, date_hierarchy и фильтр по дате в админке
+            models.Index(fields=['date', 'time'], name='salon_appt_date_time_idx'),
+            # Фильтр админки по мастеру и выборка дня мастера
+            models.Index(fields=['master', 'date', 'time'], name='salon_appt_master_slot_idx'),
+            # Проверка пересечений и свободные слоты: отменённые записи не нужны
+            models.Index(
+                fields=['master', 'date', 'time'],
+                condition=~models.Q(status='cancelled'),
+                name='salon_appt_active_slot_idx'
+            ),
+            models.Index(fields=['status', 'date', 'time'], name='salon_appt_status_idx'),
+            models.Index(fields=['created_at'], name='salon_appt_created_idx'),
+        ]
 
     def __str__(self):
         return f'{self.client_name} - {self.service.name} ({self.date} {self.time})'
 
 
+class AppointmentStatusChange(models.Model):
+    """Журнал смен статуса записи: строки только добавляются (salon.transitions)."""
+
+    appointment = models.ForeignKey(
+        Appointment,
+        on_delete=models.CASCADE,
+        related_name='status_history',
+        db_index=False,  # покрыт salon_status_change_idx
+        verbose_name='Запись'
+    )
+    old_status = models.CharField(
+        max_length=20,
+        choices=Appointment.STATUS_CHOICES,
+        verbose_name='Был статус'
+    )
+    new_status = models.CharField(
+        max_length=20,
+        choices=Appointment.STATUS_CHOICES,
+        verbose_name='Стал статус'
+    )
+    changed_at = models.DateTimeField(
+        default=timezone.now,
+        verbose_name='Когда'
+    )
+    changed_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name='Кто'
+    )
+    source = models.CharField(
+        max_length=20,
+        default='admin',
+        verbose_name='Источник',
+        help_text='admin, api, system'
+    )
+
+    class Meta:
+        verbose_name = 'Смена статуса'
+        verbose_name_plural = 'История статусов'
+        ordering = ['appointment', 'changed_at', 'id']
+        indexes = [
+            models.Index(fields=['appointment', 'changed_at'], name='salon_status_change_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.appointment_id}: {self.old_status} → {self.new_status}'
+
+
+class AppointmentArchive(models.Model):
+    """
+    Холодное хранилище старых выполненных и отменённых записей
+    (manage.py archive_appointments). id совпадает с id исходной записи,
+    история статусов переносится в status_history.
+    """
+
+    id = models.BigIntegerField(
+        primary_key=True,
+        verbose_name='ID записи'
+    )
+    client_name = models.CharField(
+        max_length=200,
+        verbose_name='Имя клиента'
+    )
+    client_phone = models.CharField(
+        max_length=15,
+        verbose_name='Телефон'
+    )
+    client_email = models.EmailField(
+        verbose_name='Email',
+        blank=True
+    )
+    master = models.ForeignKey(
+        Master,
+        on_delete=models.CASCADE,
+        related_name='archived_appointments',
+        verbose_name='Мастер'
+    )
+    service = models.ForeignKey(
+        Service,
+        on_delete=models.CASCADE,
+        related_name='archived_appointments',
+        verbose_name='Услуга'
+    )
+    date = models.DateField(
+        verbose_name='Дата'
+    )
+    time = models.TimeField(
+        verbose_name='Время'
+    )
+    status = models.CharField(
+        max_length=20,
+        choices=Appointment.STATUS_CHOICES,
+        verbose_name='Статус'
+    )
+    comment = models.TextField(
+        verbose_name='Комментарий',
+        blank=True
+    )
+    created_at = models.DateTimeField(
+        verbose_name='Дата создания'
+    )
+    status_history = models.JSONField(
+        default=list,
+        blank=True,
+        verbose_name='История статусов'
+    )
+    archived_at = models.DateTimeField(
+        default=timezone.now,
+        verbose_name='Перенесена в архив'
+    )
+
+    class Meta:
+        verbose_name = 'Архивная запись'
+        verbose_name_plural = 'Архив записей'
+        ordering = ['-date', '-time']
+        indexes = [
+            models.Index(fields=['date', 'time'], name='salon_archive_date_time_idx'),
+            models.Index(fields=['master', 'date', 'time'], name='salon_archive_master_idx'),
+            # История клиента по телефону
+            models.Index(fields=['client_phone', 'date'], name='salon_archive_phone_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.client_name} ({self.date} {self.time})'
+
+
+class DailySummary(models.Model):
+    """
+    Сводка по дню, мастеру и категории услуг; обновляется приращениями
+    при создании записи и смене статуса (salon.reports), пересобирается
+    командой rebuild_summaries.
+    """
+
+    day = models.DateField(
+        verbose_name='День'
+    )
+    master = models.ForeignKey(
+        Master,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name='Мастер'
+    )
+    category = models.CharField(
+        max_length=20,
+        choices=Service.CATEGORY_CHOICES,
+        verbose_name='Категория'
+    )
+    bookings = models.IntegerField(
+        default=0,
+        verbose_name='Записей',
+        help_text='Кроме отменённых'
+    )
+    booked_minutes = models.IntegerField(
+        default=0,
+        verbose_name='Занято минут'
+    )
+    booked_revenue = models.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        default=0,
+        verbose_name='Ожидаемая выручка'
+    )
+    completed = models.IntegerField(
+        default=0,
+        verbose_name='Выполнено'
+    )
+    revenue = models.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        default=0,
+        verbose_name='Выручка',
+        help_text='По выполненным записям'
+    )
+    cancellations = models.IntegerField(
+        default=0,
+        verbose_name='Отмен'
+    )
+
+    class Meta:
+        verbose_name = 'Сводка за день'
+        verbose_name_plural = 'Сводки по дням'
+        constraints = [
+            # Ключ приращений; по нему же выборка отчёта за период
+            models.UniqueConstraint(fields=['day', 'master', 'category'], name='salon_summary_unique'),
+        ]
+
+    def __str__(self):
+        return f'{self.day} {self.master_id} {self.category}'
+
+
+class MasterDayLock(models.Model):
+    master = models.ForeignKey(
+        Master,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name='Мастер'
+    )
+    date = models.DateField(
+        verbose_name='Дата'
+    )
+    locked_at = models.DateTimeField(
+        verbose_name='Последняя блокировка'
+    )
+
+    class Meta:
+        verbose_name = 'Блокировка дня мастера'
+        verbose_name_plural = 'Блокировки дней мастеров'
+        constraints = [
+            models.UniqueConstraint(fields=['master', 'date'], name='salon_master_day_lock_unique'),
+        ]
+
+    def __str__(self):
+        return f'{self.master_id}: {self.date}'
+
+
+class OutboxMessage(models.Model):
+    STATUS_CHOICES = [
+        ('pending', 'Ожидает отправки'),
+        ('sent', 'Отправлено'),
+        ('failed', 'Ошибка'),
+    ]
+
+    recipient = models.EmailField(
+        verbose_name='Получатель'
+    )
+    subject = models.CharField(
+        max_length=200,
+        verbose_name='Тема'
+    )
+    body = models.TextField(
+        verbose_name='Текст'
+    )
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default='pending',
+        verbose_name='Статус'
+    )
+    attempts = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Попыток'
+    )
+    available_at = models.DateTimeField(
+        verbose_name='Следующая попытка'
+    )
+    last_error = models.TextField(
+        verbose_name='Последняя ошибка',
+        blank=True
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Создано'
+    )
+    sent_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Отправлено'
+    )
+
+    class Meta:
+        verbose_name = 'Исходящее сообщение'
+        verbose_name_plural = 'Исходящие сообщения'
+        indexes = [
+            # Выборка очереди воркером: только неотправленные
+            models.Index(
+                fields=['available_at'],
+                condition=models.Q(status='pending'),
+                name='salon_outbox_pending_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.recipient}: {self.subject}'
+
+
 class Contact(models.Model):
     address = models.CharField(
         max_length=300,
@@ -254,3 +549,26 @@ class Contact(models.Model):
     def __str__(self):
         return f'Контакты: {self.address}'
 
+
+class ContentVersion(models.Model):
+    table = models.CharField(
+        max_length=100,
+        unique=True,
+        verbose_name='Таблица'
+    )
+    version = models.PositiveBigIntegerField(
+        default=0,
+        verbose_name='Версия'
+    )
+    updated_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Последнее изменение'
+    )
+
+    class Meta:
+        verbose_name = 'Версия данных'
+        verbose_name_plural = 'Версии данных'
+
+    def __str__(self):
+        return f'{self.table}: {self.version}'
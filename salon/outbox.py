@@ -0,0 +1,140 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import connection, transaction
+from django.db.models import F
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from .models import OutboxMessage
+
+
+def enqueue(recipient, subject, body):
+    """Кладёт письмо в очередь; вызывать внутри транзакции, которая создаёт повод для письма."""
+    return OutboxMessage.objects.create(
+        recipient=recipient,
+        subject=subject,
+        body=body,
+        available_at=timezone.now(),
+    )
+
+
+def enqueue_booking_confirmation(appointment):
+    if not appointment.client_email:
+        return None
+    context = {'appointment': appointment, 'master': appointment.master, 'service': appointment.service}
+    return enqueue(
+        appointment.client_email,
+        'Заявка на запись принята',
+        render_to_string('salon/emails/booking_confirmation.txt', context),
+    )
+
+
+def retry_delay(attempts):
+    """Экспоненциальная пауза перед следующей попыткой: 1, 2, 4... базовых интервала."""
+    delay = settings.OUTBOX_RETRY_DELAY * 2 ** (attempts - 1)
+    return timedelta(seconds=min(delay, settings.OUTBOX_MAX_RETRY_DELAY))
+
+
+def claim_batch(size):
+    """
+    Забирает до size готовых к отправке сообщений.
+
+    Забранным сообщениям сразу увеличивается счётчик попыток и переносится
+    available_at на OUTBOX_LEASE секунд вперёд: если воркер упадёт посреди
+    отправки, сообщения снова станут доступны после истечения аренды.
+    В PostgreSQL параллельные воркеры пропускают чужие строки (SKIP LOCKED).
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        pending = OutboxMessage.objects.filter(status='pending', available_at__lte=now).order_by('available_at')
+        if connection.features.has_select_for_update_skip_locked:
+            pending = pending.select_for_update(skip_locked=True)
+        ids = list(pending.values_list('id', flat=True)[:size])
+        OutboxMessage.objects.filter(id__in=ids).update(
+            attempts=F('attempts') + 1,
+            available_at=now + timedelta(seconds=settings.OUTBOX_LEASE),
+        )
+    return list(OutboxMessage.objects.filter(id__in=ids).order_by('available_at', 'id'))
+
+
+class OutboxWorker:
+    """
+    Отправляет сообщения из очереди пачками через одно SMTP-соединение.
+
+    Соединение открывается при первой пачке и живёт, пока в очереди есть
+    работа; при ошибке отправки оно переоткрывается для следующего письма.
+    """
+
+    def __init__(self, batch_size=None, max_attempts=None):
+        self.batch_size = batch_size or settings.OUTBOX_BATCH_SIZE
+        self.max_attempts = max_attempts or settings.OUTBOX_MAX_ATTEMPTS
+        self.connection = None
+
+    def open(self):
+        if self.connection is None:
+            self.connection = get_connection(fail_silently=False)
+            self.connection.open()
+
+    def close(self):
+        if self.connection is not None:
+            try:
+                self.connection.close()
+            except Exception:
+                pass
+            self.connection = None
+
+    def send(self, message):
+        email = EmailMessage(
+            message.subject,
+            message.body,
+            settings.DEFAULT_FROM_EMAIL,
+            [message.recipient],
+            connection=self.connection,
+        )
+        email.send()
+
+    def process_batch(self):
+        """Одна пачка: возвращает (отправлено, отложено, отброшено)."""
+        messages = claim_batch(self.batch_size)
+        if not messages:
+            return 0, 0, 0
+
+        sent, retried, failed = [], [], []
+        for message in messages:
+            try:
+                self.open()
+                self.send(message)
+            except Exception as error:
+                self.close()
+                message.last_error = f'{type(error).__name__}: {error}'
+                if message.attempts >= self.max_attempts:
+                    message.status = 'failed'
+                    failed.append(message)
+                else:
+                    message.available_at = timezone.now() + retry_delay(message.attempts)
+                    retried.append(message)
+            else:
+                message.status = 'sent'
+                message.sent_at = timezone.now()
+                message.last_error = ''
+                sent.append(message)
+
+        OutboxMessage.objects.bulk_update(sent, ['status', 'sent_at', 'last_error'])
+        OutboxMessage.objects.bulk_update(retried, ['available_at', 'last_error'])
+        OutboxMessage.objects.bulk_update(failed, ['status', 'last_error'])
+        return len(sent), len(retried), len(failed)
+
+    def drain(self):
+        """Отправляет всё, что готово к отправке сейчас; возвращает суммарные счётчики."""
+        totals = [0, 0, 0]
+        try:
+            while True:
+                counts = self.process_batch()
+                if not any(counts):
+                    break
+                totals = [total + count for total, count in zip(totals, counts)]
+        finally:
+            self.close()
+        return tuple(totals)
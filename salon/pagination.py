@@ -0,0 +1,127 @@
+import base64
+from datetime import date, time
+
+from django.core.paginator import Paginator
+from django.db import DatabaseError, connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Курсорная пагинация по (date, time, id): следующая страница — это
+    диапазон по индексу (date, time) от курсора, а не OFFSET, поэтому
+    любая страница стоит столько же, сколько первая.
+    """
+    page_size = 50
+    max_page_size = 200
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    ordering_query_param = 'ordering'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.descending = request.query_params.get(self.ordering_query_param, '-date') != 'date'
+        page_size = self.get_page_size(request)
+
+        if self.descending:
+            queryset = queryset.order_by('-date', '-time', '-id')
+        else:
+            queryset = queryset.order_by('date', 'time', 'id')
+
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor:
+            queryset = queryset.filter(self.after(*self.decode_cursor(cursor)))
+
+        rows = list(queryset[:page_size + 1])
+        self.has_next = len(rows) > page_size
+        rows = rows[:page_size]
+        self.last = rows[-1] if rows else None
+        return rows
+
+    def after(self, day, start, pk):
+        op = 'lt' if self.descending else 'gt'
+        # Без отдельной границы по date планировщик не берёт диапазон по индексу
+        # (date, time) из OR и просматривает индекс с начала
+        bound = Q(**{f'date__{op}e': day})
+        return bound & (
+            Q(**{f'date__{op}': day})
+            | Q(date=day, **{f'time__{op}': start})
+            | Q(date=day, time=start, **{f'id__{op}': pk})
+        )
+
+    def get_page_size(self, request):
+        value = request.query_params.get(self.page_size_query_param, '')
+        if value.isdigit() and int(value) > 0:
+            return min(int(value), self.max_page_size)
+        return self.page_size
+
+    def encode_cursor(self, item):
+        raw = f'{item.date.isoformat()},{item.time.isoformat()},{item.pk}'
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        try:
+            raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+            day, start, pk = raw.split(',')
+            return date.fromisoformat(day), time.fromisoformat(start), int(pk)
+        except (TypeError, ValueError, UnicodeDecodeError):
+            raise NotFound('Неверный курсор')
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.last))
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'results': data
+        })
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Пагинатор для больших таблиц: COUNT(*) не дальше count_cap строк.
+
+    Без фильтров число строк берётся из статистики планировщика
+    (sqlite_stat1 после ANALYZE, pg_class.reltuples в PostgreSQL), если она есть;
+    иначе и при фильтрах показывается не больше count_cap.
+    """
+    count_cap = 10_000
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        capped = queryset.values('pk').order_by()[:self.count_cap + 1].count()
+        if capped <= self.count_cap:
+            return capped
+        if not queryset.query.where:
+            estimate = estimate_table_rows(queryset.model, queryset.db)
+            if estimate and estimate > self.count_cap:
+                return estimate
+        return self.count_cap
+
+
+def estimate_table_rows(model, using='default'):
+    connection = connections[using]
+    table = model._meta.db_table
+    try:
+        with connection.cursor() as cursor:
+            if connection.vendor == 'sqlite':
+                # Первое число в stat — строк в индексе. У частичных индексов
+                # (salon_appt_active_slot_idx) их меньше, чем в таблице, поэтому берётся максимум
+                cursor.execute('SELECT stat FROM sqlite_stat1 WHERE tbl = %s', [table])
+                return max((int(stat.split()[0]) for stat, in cursor.fetchall()), default=None)
+            if connection.vendor == 'postgresql':
+                cursor.execute('SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass', [table])
+                row = cursor.fetchone()
+                return row[0] if row and row[0] > 0 else None
+    except DatabaseError:
+        return None
+    return None
@@ -0,0 +1,177 @@
+"""
+Сводки выручки и загрузки мастеров (DailySummary).
+
+Каждая запись вносит в строку (день, мастер, категория услуги) вклад,
+зависящий от статуса. При создании, смене статуса или удалении записи
+вклады собираются в SummaryDelta и применяются одним INSERT ... ON CONFLICT
+DO UPDATE с приращениями — в той же транзакции, что и изменение записи.
+Цена и длительность берутся из услуги на момент изменения; после правки
+цен сводки можно пересобрать командой rebuild_summaries.
+"""
+from collections import Counter, defaultdict
+from decimal import Decimal
+
+from django.db import connection, transaction
+from django.db.models import Count, Q, Sum
+
+from .availability import OPENING_TIME, CLOSING_TIME, to_minutes
+from .models import Appointment, AppointmentArchive, DailySummary
+
+
+SUMMARY_FIELDS = ['bookings', 'booked_minutes', 'booked_revenue', 'completed', 'revenue', 'cancellations']
+DECIMAL_FIELDS = {'booked_revenue', 'revenue'}
+
+# Группировки отчёта: поля DailySummary в выдаче
+REPORT_GROUPS = {
+    'day': ['day'],
+    'master': ['master', 'master__name'],
+    'category': ['category'],
+}
+
+# Поля записи, от которых зависит её вклад в сводку
+FACT_FIELDS = ['date', 'master_id', 'service__category', 'service__price', 'service__duration', 'status']
+
+
+def contribution(status, price, duration):
+    if status == 'cancelled':
+        return {'cancellations': 1}
+    values = {'bookings': 1, 'booked_minutes': duration, 'booked_revenue': price}
+    if status == 'completed':
+        values.update(completed=1, revenue=price)
+    return values
+
+
+class SummaryDelta:
+    """Накопленные приращения сводок по ключам (день, мастер, категория)."""
+
+    def __init__(self):
+        self.rows = defaultdict(Counter)
+
+    def add(self, day, master_id, category, price, duration, status, sign=1):
+        row = self.rows[(day, master_id, category)]
+        for field, value in contribution(status, price, duration).items():
+            row[field] += sign * value
+        return self
+
+    def remove(self, day, master_id, category, price, duration, status):
+        return self.add(day, master_id, category, price, duration, status, sign=-1)
+
+    def add_appointment(self, appointment, sign=1):
+        service = appointment.service
+        return self.add(
+            appointment.date, appointment.master_id, service.category,
+            service.price, service.duration, appointment.status, sign
+        )
+
+    def apply(self):
+        rows = [(key, row) for key, row in self.rows.items() if any(row.values())]
+        if not rows:
+            return
+        table = connection.ops.quote_name(DailySummary._meta.db_table)
+        columns = ['day', 'master_id', 'category'] + SUMMARY_FIELDS
+        quoted = [connection.ops.quote_name(column) for column in columns]
+        placeholders = '(' + ', '.join(['%s'] * len(columns)) + ')'
+        updates = ', '.join(f'{column} = {table}.{column} + excluded.{column}' for column in quoted[3:])
+
+        params = []
+        for (day, master_id, category), row in rows:
+            params += [connection.ops.adapt_datefield_value(day), master_id, category]
+            params += [
+                connection.ops.adapt_decimalfield_value(Decimal(row[field]), 12, 2) if field in DECIMAL_FIELDS
+                else row[field]
+                for field in SUMMARY_FIELDS
+            ]
+
+        # Один и тот же синтаксис upsert в SQLite (3.24+) и PostgreSQL
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'INSERT INTO {table} ({", ".join(quoted)}) VALUES {", ".join([placeholders] * len(rows))} '
+                f'ON CONFLICT ({", ".join(quoted[:3])}) DO UPDATE SET {updates}',
+                params
+            )
+        self.rows.clear()
+
+
+def appointment_facts(queryset):
+    return list(queryset.order_by().values_list(*FACT_FIELDS))
+
+
+def summary_rows(queryset, day_from=None, day_to=None):
+    """Сводки, посчитанные заново по таблице записей: {(день, мастер, категория): {поле: значение}}."""
+    if day_from:
+        queryset = queryset.filter(date__gte=day_from)
+    if day_to:
+        queryset = queryset.filter(date__lte=day_to)
+    active = ~Q(status='cancelled')
+    completed = Q(status='completed')
+    rows = queryset.order_by().values('date', 'master_id', 'service__category').annotate(
+        bookings=Count('id', filter=active),
+        booked_minutes=Sum('service__duration', filter=active, default=0),
+        booked_revenue=Sum('service__price', filter=active, default=0),
+        completed=Count('id', filter=completed),
+        revenue=Sum('service__price', filter=completed, default=0),
+        cancellations=Count('id', filter=Q(status='cancelled')),
+    )
+    return {
+        (row['date'], row['master_id'], row['service__category']): {field: row[field] for field in SUMMARY_FIELDS}
+        for row in rows
+    }
+
+
+def rebuild_summaries(day_from=None, day_to=None):
+    """Пересчитывает сводки за период (по умолчанию целиком) по рабочей таблице и архиву; возвращает число строк."""
+    totals = defaultdict(Counter)
+    for model in (Appointment, AppointmentArchive):
+        for key, values in summary_rows(model.objects.all(), day_from, day_to).items():
+            totals[key].update(values)
+
+    summaries = DailySummary.objects.all()
+    if day_from:
+        summaries = summaries.filter(day__gte=day_from)
+    if day_to:
+        summaries = summaries.filter(day__lte=day_to)
+
+    with transaction.atomic():
+        summaries.delete()
+        DailySummary.objects.bulk_create([
+            DailySummary(day=day, master_id=master_id, category=category, **{
+                field: values[field] for field in SUMMARY_FIELDS
+            })
+            for (day, master_id, category), values in totals.items()
+        ], batch_size=500)
+    return len(totals)
+
+
+def report(day_from, day_to, group_by='day', master_id=None, category=None):
+    """
+    Отчёт за период только по таблице сводок: строки по группировке и итоги.
+    Для группировки по мастерам — загрузка: доля занятых минут рабочего дня.
+    """
+    summaries = DailySummary.objects.filter(day__range=(day_from, day_to))
+    if master_id is not None:
+        summaries = summaries.filter(master_id=master_id)
+    if category is not None:
+        summaries = summaries.filter(category=category)
+
+    group = REPORT_GROUPS[group_by]
+    # Имена агрегатов не должны совпадать с полями модели
+    sums = summaries.values(*group).annotate(**{f'sum_{field}': Sum(field) for field in SUMMARY_FIELDS})
+    capacity = ((day_to - day_from).days + 1) * (to_minutes(CLOSING_TIME) - to_minutes(OPENING_TIME))
+
+    rows = []
+    totals = dict.fromkeys(SUMMARY_FIELDS, 0)
+    for values in sums.order_by(*group):
+        row = {name.replace('__', '_'): values[name] for name in group}
+        for field in SUMMARY_FIELDS:
+            row[field] = values[f'sum_{field}']
+            totals[field] += row[field]
+        if group_by == 'master':
+            row['utilization'] = round(row['booked_minutes'] / capacity, 4)
+        rows.append(row)
+
+    for row in rows + [totals]:
+        for field in DECIMAL_FIELDS:
+            row[field] = str(Decimal(row[field]).quantize(Decimal('0.01')))
+        if 'day' in row:
+            row['day'] = row['day'].isoformat()
+    return rows, totals
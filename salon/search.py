@@ -0,0 +1,171 @@
+"""
+Полнотекстовый поиск по услугам и мастерам.
+
+SQLite: виртуальная таблица FTS5 salon_search. Встроенных русских стеммеров
+в SQLite нет, поэтому в индекс и в запрос попадают основы слов после
+стеммера Snowball (stem ниже), а слова запроса ищутся как префиксы.
+Ранжирование — bm25, название весит больше описания.
+
+PostgreSQL: таблица с tsvector по конфигурации 'russian' и GIN-индексом,
+ранжирование — ts_rank.
+
+Индекс обновляется сигналами при сохранении и удалении услуг и мастеров;
+заполнить его заново — manage.py rebuild_search_index.
+"""
+import re
+
+from django.db import connection
+
+from .models import Service, Master
+
+
+TABLE = 'salon_search'
+MODELS = {'service': Service, 'master': Master}
+KINDS = {model: kind for kind, model in MODELS.items()}
+
+VOWELS = 'аеиоуыэюя'
+PERFECTIVE_GERUND = re.compile(r'(ив|ивши|ившись|ыв|ывши|ывшись|(?<=[ая])(в|вши|вшись))$')
+ADJECTIVE = r'(ее|ие|ые|ое|ими|ыми|ей|ий|ый|ой|ем|им|ым|ом|его|ого|ему|ому|их|ых|ую|юю|ая|яя|ою|ею)'
+PARTICIPLE = r'(ивш|ывш|ующ|(?<=[ая])(ем|нн|вш|ющ|щ))'
+ADJECTIVAL = re.compile(f'{PARTICIPLE}?{ADJECTIVE}$')
+REFLEXIVE = re.compile(r'(ся|сь)$')
+VERB = re.compile(
+    r'(ила|ыла|ена|ейте|уйте|ите|или|ыли|ей|уй|ил|ыл|им|ым|ен|ило|ыло|ено|ят|ует|уют|ит|ыт|ены|ить|ыть|ишь|ую|ю'
+    r'|(?<=[ая])(ла|на|ете|йте|ли|й|л|ем|н|ло|но|ет|ют|ны|ть|ешь|нно))$'
+)
+NOUN = re.compile(
+    r'(а|ев|ов|ие|ье|е|иями|ями|ами|еи|ии|и|ией|ей|ой|ий|й|иям|ям|ием|ем|ам|ом|о|у|ах|иях|ях|ы|ь|ию|ью|ю|ия|ья|я)$'
+)
+DERIVATIONAL = re.compile(r'(ост|ость)$')
+SUPERLATIVE = re.compile(r'(ейше|ейш)$')
+
+
+def _region(word, start=0):
+    """Начало области после первой согласной, идущей за гласной (R1/R2 Snowball)."""
+    for i in range(start + 1, len(word)):
+        if word[i] not in VOWELS and word[i - 1] in VOWELS:
+            return i + 1
+    return len(word)
+
+
+def stem(word):
+    """Русский стеммер Snowball."""
+    word = word.lower().replace('ё', 'е')
+    rv_start = next((i + 1 for i, char in enumerate(word) if char in VOWELS), len(word))
+    r2_start = _region(word, _region(word))
+    prefix, rv = word[:rv_start], word[rv_start:]
+
+    stripped = PERFECTIVE_GERUND.sub('', rv, count=1)
+    if stripped == rv:
+        rv = REFLEXIVE.sub('', rv, count=1)
+        for ending in (ADJECTIVAL, VERB, NOUN):
+            stripped = ending.sub('', rv, count=1)
+            if stripped != rv:
+                break
+    rv = stripped
+
+    if rv.endswith('и'):
+        rv = rv[:-1]
+
+    match = DERIVATIONAL.search(rv)
+    if match and rv_start + match.start() >= r2_start:
+        rv = rv[:match.start()]
+
+    if rv.endswith('нн'):
+        rv = rv[:-1]
+    elif SUPERLATIVE.search(rv):
+        rv = SUPERLATIVE.sub('', rv)
+        if rv.endswith('нн'):
+            rv = rv[:-1]
+    elif rv.endswith('ь'):
+        rv = rv[:-1]
+    return prefix + rv
+
+
+def words(text):
+    return re.findall(r'\w+', (text or '').lower())
+
+
+def stem_text(text):
+    return ' '.join(stem(word) for word in words(text))
+
+
+def documents(kind, instance):
+    """(заголовок, текст) документа поиска для услуги или мастера."""
+    if kind == 'service':
+        return instance.name, f'{instance.description} {instance.get_category_display()}'
+    return instance.name, f'{instance.specialization} {instance.bio}'
+
+
+def index_object(kind, instance):
+    title, body = documents(kind, instance)
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute(
+                f'INSERT INTO {TABLE} (kind, object_id, document) VALUES (%s, %s, '
+                "setweight(to_tsvector('russian', %s), 'A') || setweight(to_tsvector('russian', %s), 'B')) "
+                'ON CONFLICT (kind, object_id) DO UPDATE SET document = excluded.document',
+                [kind, instance.pk, title, body]
+            )
+        else:
+            cursor.execute(f'DELETE FROM {TABLE} WHERE kind = %s AND object_id = %s', [kind, instance.pk])
+            cursor.execute(
+                f'INSERT INTO {TABLE} (kind, object_id, title, body) VALUES (%s, %s, %s, %s)',
+                [kind, instance.pk, stem_text(title), stem_text(body)]
+            )
+
+
+def remove_object(kind, pk):
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {TABLE} WHERE kind = %s AND object_id = %s', [kind, pk])
+
+
+def search(query, kind, limit=None):
+    """id объектов kind ('service' или 'master') по запросу, от самых релевантных."""
+    terms = words(query)
+    if not terms:
+        return []
+
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            # Слова — только \w, поэтому синтаксис tsquery в запрос не попадёт
+            cursor.execute(
+                f"SELECT object_id FROM {TABLE}, to_tsquery('russian', %s) query "
+                'WHERE kind = %s AND document @@ query ORDER BY ts_rank(document, query) DESC, object_id '
+                'LIMIT %s',
+                [' & '.join(f'{term}:*' for term in terms), kind, limit]
+            )
+        else:
+            # Каждая основа в кавычках и как префикс: "стрижк"* "мужск"*
+            cursor.execute(
+                f'SELECT object_id FROM {TABLE} WHERE {TABLE} MATCH %s AND kind = %s '
+                f'ORDER BY bm25({TABLE}, 0, 0, 10.0, 1.0), object_id LIMIT %s',
+                [' '.join(f'"{stem(term)}"*' for term in terms), kind, -1 if limit is None else limit]
+            )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def create_index(schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(
+            f'CREATE TABLE {TABLE} (kind varchar(20) NOT NULL, object_id bigint NOT NULL, '
+            'document tsvector NOT NULL, PRIMARY KEY (kind, object_id))'
+        )
+        schema_editor.execute(f'CREATE INDEX {TABLE}_document_idx ON {TABLE} USING GIN (document)')
+    else:
+        schema_editor.execute(
+            f'CREATE VIRTUAL TABLE {TABLE} USING fts5(kind UNINDEXED, object_id UNINDEXED, title, body, '
+            "tokenize = 'unicode61 remove_diacritics 2')"
+        )
+
+
+def rebuild_index(models=MODELS):
+    """Заполняет индекс заново; models — {вид: модель}, в миграции — исторические модели."""
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {TABLE}')
+    count = 0
+    for kind, model in models.items():
+        for instance in model.objects.order_by('pk').iterator():
+            index_object(kind, instance)
+            count += 1
+    return count
@@ -1,13 +1,30 @@
 from rest_framework import serializers
-from .models import Service, Master, Appointment, Contact, SalonInfo
+from .models import Service, Master, Appointment, AppointmentArchive, Contact, SalonInfo
+from .availability import OPENING_TIME, CLOSING_TIME, to_minutes
+from .booking import create_appointment, SlotTakenError
+from .images import field_widths, variant_urls
 from django.utils import timezone
 
 
+class ImageVariantsField(serializers.ReadOnlyField):
+    """URL производных изображений поля-источника: [{'width', 'webp', 'jpeg'}, ...] или None."""
+
+    def __init__(self, image_field, **kwargs):
+        self.image_field = image_field
+        super().__init__(source=image_field, **kwargs)
+
+    def to_representation(self, value):
+        model = self.parent.Meta.model
+        url = _file_url(model, self.image_field, self.context.get('request'))
+        return variant_urls(value.name, field_widths(model._meta.get_field(self.image_field)), url)
+
+
 class ServiceSerializer(serializers.ModelSerializer):
     category_display = serializers.CharField(
         source='get_category_display',
         read_only=True
     )
+    image_variants = ImageVariantsField('image')
 
     class Meta:
         model = Service
@@ -19,12 +36,14 @@ class ServiceSerializer(serializers.ModelSerializer):
             'duration',
             'category',
             'category_display',
-            'image'
+            'image',
+            'image_variants'
         ]
 
 
 class MasterSerializer(serializers.ModelSerializer):
     services = ServiceSerializer(many=True, read_only=True)
+    photo_variants = ImageVariantsField('photo')
 
     class Meta:
         model = Master
@@ -32,6 +51,7 @@ class MasterSerializer(serializers.ModelSerializer):
             'id',
             'name',
             'photo',
+            'photo_variants',
             'specialization',
             'experience',
             'bio',
@@ -40,13 +60,47 @@ class MasterSerializer(serializers.ModelSerializer):
         ]
 
 
+class AppointmentValidationMixin:
+    def validate_date(self, value):
+        if value < timezone.now().date():
+            raise serializers.ValidationError(
+                'Нельзя записаться на прошедшую дату'
+            )
+        return value
+
+    def validate_time(self, value):
+        if value < OPENING_TIME or value >= CLOSING_TIME:
+            raise serializers.ValidationError(
+                f'Запись возможна с {OPENING_TIME.strftime("%H:%M")} до {CLOSING_TIME.strftime("%H:%M")}'
+            )
+        return value
+
+    def validate(self, data):
+        master = data.get('master')
+        service = data.get('service')
+
+        if master and service:
+            if not master.services.filter(id=service.id).exists():
+                raise serializers.ValidationError({
+                    'service': f'Мастер {master.name} не оказывает услугу "{service.name}"'
+                })
+
+        if service and data.get('time'):
+            if to_minutes(data['time']) + service.duration > to_minutes(CLOSING_TIME):
+                raise serializers.ValidationError({
+                    'time': f'Услуга не успеет закончиться до {CLOSING_TIME.strftime("%H:%M")}'
+                })
+
+        return data
+
+
 class MasterShortSerializer(serializers.ModelSerializer):
     class Meta:
         model = Master
         fields = ['id', 'name', 'specialization']
 
 
-class AppointmentSerializer(serializers.ModelSerializer):
+class AppointmentSerializer(AppointmentValidationMixin, serializers.ModelSerializer):
     master_details = MasterShortSerializer(source='master', read_only=True)
     service_details = ServiceSerializer(source='service', read_only=True)
     status_display = serializers.CharField(
@@ -75,39 +129,22 @@ class AppointmentSerializer(serializers.ModelSerializer):
 
         read_only_fields = ['status', 'created_at']
 
-    def validate_date(self, value):
-        if value < timezone.now().date():
-            raise serializers.ValidationError(
-                'Нельзя записаться на прошедшую дату'
-            )
-        return value
-
-    def validate_time(self, value):
-        from datetime import time
-
-        opening_time = time(9, 0)   # 9:00
-        closing_time = time(21, 0)  # 21:00
-
-        if value < opening_time or value >= closing_time:
-            raise serializers.ValidationError(
-                f'Запись возможна с {opening_time.strftime("%H:%M")} до {closing_time.strftime("%H:%M")}'
-            )
-        return value
-
-    def validate(self, data):
-        master = data.get('master')
-        service = data.get('service')
 
-        if master and service:
-            if not master.services.filter(id=service.id).exists():
-                raise serializers.ValidationError({
-                    'service': f'Мастер {master.name} не оказывает услугу "{service.name}"'
-                })
+class AppointmentArchiveSerializer(serializers.ModelSerializer):
+    master_details = MasterShortSerializer(source='master', read_only=True)
+    service_details = ServiceSerializer(source='service', read_only=True)
+    status_display = serializers.CharField(
+        source='get_status_display',
+        read_only=True
+    )
 
-        return data
+    class Meta:
+        model = AppointmentArchive
+        fields = AppointmentSerializer.Meta.fields + ['status_history', 'archived_at']
+        read_only_fields = fields
 
 
-class AppointmentCreateSerializer(serializers.ModelSerializer):
+class AppointmentCreateSerializer(AppointmentValidationMixin, serializers.ModelSerializer):
     class Meta:
         model = Appointment
         fields = [
@@ -121,12 +158,11 @@ class AppointmentCreateSerializer(serializers.ModelSerializer):
             'comment'
         ]
 
-    def validate_date(self, value):
-        if value < timezone.now().date():
-            raise serializers.ValidationError(
-                'Нельзя записаться на прошедшую дату'
-            )
-        return value
+    def create(self, validated_data):
+        try:
+            return create_appointment(**validated_data)
+        except SlotTakenError as error:
+            raise serializers.ValidationError({'time': str(error)})
 
 
 class ContactSerializer(serializers.ModelSerializer):
@@ -146,6 +182,8 @@ class ContactSerializer(serializers.ModelSerializer):
 
 
 class SalonInfoSerializer(serializers.ModelSerializer):
+    hero_image_variants = ImageVariantsField('hero_image')
+
     class Meta:
         model = SalonInfo
         fields = [
@@ -153,6 +191,120 @@ class SalonInfoSerializer(serializers.ModelSerializer):
             'name',
             'tagline',
             'about_text',
-            'hero_image'
+            'hero_image',
+            'hero_image_variants'
         ]
 
+
+# Быстрый путь только для чтения: тот же JSON, что у ServiceSerializer и
+# MasterSerializer, но из values() без экземпляров моделей и полей DRF на каждую строку.
+
+SERVICE_VALUES = ['id', 'name', 'description', 'price', 'duration', 'category', 'image']
+MASTER_VALUES = ['id', 'name', 'photo', 'specialization', 'experience', 'bio', 'is_active']
+
+
+def _price_field():
+    price = Service._meta.get_field('price')
+    return serializers.DecimalField(max_digits=price.max_digits, decimal_places=price.decimal_places)
+
+
+def _file_url(model, field_name, request):
+    storage = model._meta.get_field(field_name).storage
+
+    def url(name):
+        if not name:
+            return None
+        if request is not None:
+            return request.build_absolute_uri(storage.url(name))
+        return storage.url(name)
+    return url
+
+
+def _service_representer(request):
+    price = _price_field()
+    image_url = _file_url(Service, 'image', request)
+    image_widths = field_widths(Service._meta.get_field('image'))
+    categories = dict(Service.CATEGORY_CHOICES)
+
+    def represent(row):
+        return {
+            'id': row['id'],
+            'name': row['name'],
+            'description': row['description'],
+            'price': price.to_representation(row['price']),
+            'duration': row['duration'],
+            'category': row['category'],
+            'category_display': categories.get(row['category'], row['category']),
+            'image': image_url(row['image']),
+            'image_variants': variant_urls(row['image'], image_widths, image_url)
+        }
+    return represent
+
+
+def represent_services(queryset, request=None):
+    represent = _service_representer(request)
+    return [represent(row) for row in queryset.values(*SERVICE_VALUES)]
+
+
+async def arepresent_services(queryset, request=None):
+    represent = _service_representer(request)
+    return [represent(row) async for row in queryset.values(*SERVICE_VALUES)]
+
+
+def _master_relations(queryset):
+    """Связи и услуги — двумя запросами на весь список, как prefetch_related('services')."""
+    through = Master.services.through.objects.filter(master__in=queryset.values('pk'))
+    pairs = through.order_by(*[f'service__{field}' for field in Service._meta.ordering], 'service_id').values_list(
+        'master_id', 'service_id'
+    )
+    return pairs, Service.objects.filter(pk__in=through.values('service_id'))
+
+
+def _assemble_masters(masters, pairs, services, request):
+    services_by_master = {}
+    for master_id, service_id in pairs:
+        services_by_master.setdefault(master_id, []).append(service_id)
+
+    services = {service['id']: service for service in services}
+    photo_url = _file_url(Master, 'photo', request)
+    photo_widths = field_widths(Master._meta.get_field('photo'))
+
+    return [
+        {
+            'id': row['id'],
+            'name': row['name'],
+            'photo': photo_url(row['photo']),
+            'photo_variants': variant_urls(row['photo'], photo_widths, photo_url),
+            'specialization': row['specialization'],
+            'experience': row['experience'],
+            'bio': row['bio'],
+            'services': [services[service_id] for service_id in services_by_master.get(row['id'], [])],
+            'is_active': row['is_active']
+        }
+        for row in masters
+    ]
+
+
+def represent_masters(queryset, request=None):
+    queryset = queryset.prefetch_related(None)
+    masters = list(queryset.values(*MASTER_VALUES))
+    if not masters:
+        return []
+
+    pairs, services = _master_relations(queryset)
+    return _assemble_masters(masters, list(pairs), represent_services(services, request), request)
+
+
+async def arepresent_masters(queryset, request=None):
+    queryset = queryset.prefetch_related(None)
+    masters = [row async for row in queryset.values(*MASTER_VALUES)]
+    if not masters:
+        return []
+
+    pairs, services = _master_relations(queryset)
+    return _assemble_masters(
+        masters,
+        [pair async for pair in pairs],
+        await arepresent_services(services, request),
+        request
+    )
@@ -0,0 +1,86 @@
+import logging
+
+from django.conf import settings
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_save, post_delete, m2m_changed
+from django.dispatch import receiver
+
+from .models import Service, Master, Contact, SalonInfo
+from .cache import bump_catalog_version
+from .versions import bump_table_version
+from .images import generate_instance_variants
+from .metrics import record_query
+from .search import KINDS as SEARCH_KINDS, index_object, remove_object
+
+
+logger = logging.getLogger(__name__)
+
+
+CATALOG_MODELS = (Service, Master, Contact, SalonInfo)
+
+
+def bump_after_commit(model):
+    # До коммита читатель увидел бы новую версию и закэшировал под ней старые строки
+    def bump():
+        bump_table_version(model)
+        bump_catalog_version()
+    transaction.on_commit(bump)
+
+
+def catalog_changed(sender, **kwargs):
+    bump_after_commit(sender)
+
+
+for model in CATALOG_MODELS:
+    post_save.connect(catalog_changed, sender=model, dispatch_uid=f'catalog-save-{model.__name__}')
+    post_delete.connect(catalog_changed, sender=model, dispatch_uid=f'catalog-delete-{model.__name__}')
+
+
+@receiver(m2m_changed, sender=Master.services.through)
+def master_services_changed(sender, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        bump_after_commit(Master)
+
+
+def image_saved(sender, instance, **kwargs):
+    # Варианты недостающих размеров создаются после коммита; уже готовые не пересоздаются
+    def generate():
+        try:
+            generate_instance_variants(instance)
+        except OSError:
+            logger.exception('Не удалось создать варианты изображений для %r', instance)
+    transaction.on_commit(generate)
+
+
+for model in (SalonInfo, Master, Service):
+    post_save.connect(image_saved, sender=model, dispatch_uid=f'image-variants-{model.__name__}')
+
+
+def search_saved(sender, instance, **kwargs):
+    index_object(SEARCH_KINDS[sender], instance)
+
+
+def search_deleted(sender, instance, **kwargs):
+    remove_object(SEARCH_KINDS[sender], instance.pk)
+
+
+for model in SEARCH_KINDS:
+    post_save.connect(search_saved, sender=model, dispatch_uid=f'search-save-{model.__name__}')
+    post_delete.connect(search_deleted, sender=model, dispatch_uid=f'search-delete-{model.__name__}')
+
+
+@receiver(connection_created)
+def install_query_metrics(sender, connection, **kwargs):
+    # Обёртка на всё время жизни соединения: учитывает SQL и из потоков sync_to_async
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+@receiver(connection_created)
+def configure_sqlite(sender, connection, **kwargs):
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for name, value in getattr(settings, 'SQLITE_PRAGMAS', {}).items():
+            cursor.execute(f'PRAGMA {name} = {value}')
@@ -0,0 +1,120 @@
+import gzip
+import re
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import rjsmin
+except ImportError:
+    rjsmin = None
+
+
+COMPRESSIBLE = ('.css', '.js', '.svg', '.json', '.txt', '.html', '.map', '.xml', '.ico', '.ttf', '.otf', '.eot')
+MIN_COMPRESS_SIZE = 512  # байт: меньшие файлы сжимать нет смысла
+
+# Строки и комментарии CSS: внутри строк пробелы значимы, комментарии выбрасываются
+CSS_TOKENS = re.compile(r'("(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\')|/\*.*?\*/', re.S)
+CSS_SPACES = re.compile(r'\s+')
+CSS_PUNCTUATION = re.compile(r' ?([{};,]) ?')
+
+
+def minify_css(source):
+    """
+    Консервативная минификация CSS: комментарии, лишние пробелы и ";" перед "}".
+
+    Пробелы вокруг ":", "+", ">" не трогаются: в селекторах и calc() они значимы.
+    """
+    parts = []
+    pending = ''
+    position = 0
+    for match in CSS_TOKENS.finditer(source):
+        pending += source[position:match.start()]
+        position = match.end()
+        if match.group(1):
+            parts.extend([_squeeze_css(pending), match.group(1)])
+            pending = ''
+        else:
+            pending += ' '
+    parts.append(_squeeze_css(pending + source[position:]))
+    return ''.join(parts).strip()
+
+
+def _squeeze_css(chunk):
+    chunk = CSS_SPACES.sub(' ', chunk)
+    chunk = CSS_PUNCTUATION.sub(r'\1', chunk)
+    return chunk.replace(';}', '}')
+
+
+def minify(name, content):
+    if name.endswith(('.min.css', '.min.js')):
+        return content
+    if name.endswith('.css'):
+        return minify_css(content)
+    if name.endswith('.js') and rjsmin is not None:
+        return rjsmin.jsmin(content)
+    return content
+
+
+def compressed_variants(content):
+    """[(расширение, байты), ...]: gzip всегда, brotli — если установлен пакет brotli."""
+    variants = [('.gz', gzip.compress(content, compresslevel=9, mtime=0))]
+    if brotli is not None:
+        variants.append(('.br', brotli.compress(content)))
+    return [(suffix, data) for suffix, data in variants if len(data) < len(content)]
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """
+    collectstatic: минификация CSS/JS, хэш содержимого в имени, манифест и соседние .gz/.br.
+
+    Минифицируются копии в STATIC_ROOT до хэширования, поэтому хэш считается
+    от итогового содержимого. {% static %} отдаёт имена из манифеста; пока
+    collectstatic не запускался, — исходные имена без хэша.
+    """
+
+    def post_process(self, paths, dry_run=False, **options):
+        if dry_run:
+            return
+
+        paths = dict(paths)
+        for name in paths:
+            if name.endswith(('.css', '.js')):
+                self.minify_file(name)
+                paths[name] = (self, name)
+
+        yield from super().post_process(paths, dry_run=dry_run, **options)
+
+        for name in set(self.hashed_files.values()):
+            if name.endswith(COMPRESSIBLE):
+                self.compress_file(name)
+
+    def minify_file(self, name):
+        with self.open(name) as file:
+            source = file.read().decode('utf-8')
+        minified = minify(name, source)
+        if minified != source:
+            self.delete(name)
+            self._save(name, ContentFile(minified.encode('utf-8')))
+
+    def compress_file(self, name):
+        with self.open(name) as file:
+            content = file.read()
+        if len(content) < MIN_COMPRESS_SIZE:
+            return
+        for suffix, data in compressed_variants(content):
+            if self.exists(name + suffix):
+                self.delete(name + suffix)
+            self._save(name + suffix, ContentFile(data))
+
+    def url(self, name, force=False):
+        try:
+            return super().url(name, force)
+        except ValueError:
+            # Сборки ещё не было (локальный запуск, тесты): отдаём файл без хэша
+            return self._url(lambda name: name, name, force)
@@ -0,0 +1,13 @@
+from django import template
+
+from salon import images
+
+register = template.Library()
+
+
+@register.filter
+def srcset(file, fmt):
+    """{{ master.photo|srcset:"webp" }} -> "…-320w.webp 320w, …-640w.webp 640w"."""
+    if not file:
+        return ''
+    return images.srcset(file.name, images.field_widths(file.field), fmt, file.storage.url)
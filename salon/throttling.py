@@ -0,0 +1,94 @@
+"""
+Ограничение частоты записи: по IP клиента и по номеру телефона.
+
+Корзина токенов в виде GCRA: в кэше под ключом лежит одно число —
+теоретическое время следующего запроса (TAT) в миллисекундах. Каждый запрос
+сдвигает его атомарным incr на интервал period / N; если TAT ушёл дальше,
+чем на period, запрос отклоняется и сдвиг откатывается. Состояние живёт
+только в общем кэше (Redis, Memcached), к базе проверка не обращается.
+"""
+import re
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.exceptions import Throttled
+from rest_framework.throttling import BaseThrottle
+
+
+KEY_PREFIX = 'salon:throttle'
+PERIODS = {'s': 1, 'm': 60, 'h': 60 * 60, 'd': 24 * 60 * 60}
+MESSAGE = 'Слишком много попыток записи.'
+
+
+def parse_rate(rate):
+    """'10/min' -> (10, 60); пустая строка или 'none' отключают ограничение."""
+    if not rate or rate.strip().lower() == 'none':
+        return None
+    count, period = rate.split('/')
+    return int(count), PERIODS[period.strip()[0]]
+
+
+def normalize_phone(phone):
+    # +7 (900) 123-45-67, 8 900 123 45 67 и 9001234567 — один телефон
+    digits = re.sub(r'\D', '', str(phone or ''))
+    return digits[-10:]
+
+
+def hit(key, rate):
+    """Учитывает запрос; None — пропустить, иначе сколько секунд ждать."""
+    count, period = rate
+    interval = period * 1000 // count
+    burst = interval * (count - 1)
+    timeout = period + 1
+    now = time.time_ns() // 1_000_000
+
+    try:
+        tat = cache.incr(key, interval)
+    except ValueError:
+        if cache.add(key, now + interval, timeout):
+            return None
+        tat = cache.incr(key, interval)
+
+    if tat - interval < now:
+        # Запросов давно не было — корзина полная
+        cache.set(key, now + interval, timeout)
+        return None
+    if tat - now > burst + interval:
+        cache.decr(key, interval)
+        return (tat - interval - burst - now) / 1000
+    cache.touch(key, timeout)
+    return None
+
+
+def check_booking(ident, phone):
+    """Проверяет лимиты записи по IP и по телефону; возвращает ожидание в секундах или None."""
+    checks = [('ip', ident, parse_rate(settings.BOOKING_THROTTLE_IP))]
+    phone = normalize_phone(phone)
+    if phone:
+        checks.append(('phone', phone, parse_rate(settings.BOOKING_THROTTLE_PHONE)))
+
+    for scope, value, rate in checks:
+        if rate is None:
+            continue
+        wait = hit(f'{KEY_PREFIX}:{scope}:{value}', rate)
+        if wait is not None:
+            return wait
+    return None
+
+
+def booking_throttled(wait):
+    return Throttled(wait=wait, detail=MESSAGE)
+
+
+def booking_phone(data):
+    return data.get('client_phone') if isinstance(data, dict) else None
+
+
+class BookingThrottle(BaseThrottle):
+    def allow_request(self, request, view):
+        self.wait_seconds = check_booking(self.get_ident(request), booking_phone(request.data))
+        return self.wait_seconds is None
+
+    def wait(self):
+        return self.wait_seconds
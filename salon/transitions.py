@@ -0,0 +1,113 @@
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import Appointment, AppointmentStatusChange
+from .ics import invalidate_calendars
+from .reports import FACT_FIELDS, SummaryDelta
+
+
+# Допустимые переходы статусов; выполненные и отменённые записи конечны
+ALLOWED_TRANSITIONS = {
+    'new': {'confirmed', 'completed', 'cancelled'},
+    'confirmed': {'completed', 'cancelled'},
+    'completed': set(),
+    'cancelled': set(),
+}
+
+CHUNK_SIZE = 500  # id в одном UPDATE ... WHERE id IN (...)
+
+
+class TransitionError(Exception):
+    pass
+
+
+def allowed_sources(new_status):
+    """Статусы, из которых можно перейти в new_status."""
+    return [status for status, targets in ALLOWED_TRANSITIONS.items() if new_status in targets]
+
+
+def check_transition(old_status, new_status):
+    if new_status not in ALLOWED_TRANSITIONS.get(old_status, ()):
+        labels = dict(Appointment.STATUS_CHOICES)
+        raise TransitionError(
+            f'Нельзя сменить статус «{labels.get(old_status, old_status)}» '
+            f'на «{labels.get(new_status, new_status)}»'
+        )
+
+
+def record_change(appointment, old_status, user=None, source='admin'):
+    """История для уже сохранённой записи, статус которой сменился с old_status."""
+    return AppointmentStatusChange.objects.create(
+        appointment=appointment,
+        old_status=old_status,
+        new_status=appointment.status,
+        changed_by=user if user is not None and user.is_authenticated else None,
+        source=source,
+    )
+
+
+def change_status(appointment, new_status, user=None, source='api'):
+    """Смена статуса одной записи с проверкой перехода и записью в историю."""
+    transition(Appointment.objects.filter(pk=appointment.pk), new_status, user=user, source=source, strict=True)
+    appointment.status = new_status
+    return appointment
+
+
+def transition(queryset, new_status, user=None, source='admin', chunk_size=CHUNK_SIZE, strict=False):
+    """
+    Переводит записи queryset в new_status пачками; возвращает (изменено, пропущено).
+
+    Каждая пачка — одна транзакция из четырёх запросов: выборка подходящих
+    записей, один UPDATE по их id, bulk_create истории и upsert сводок. Записи,
+    для которых переход недопустим, пропускаются; strict=True — исключение.
+    """
+    if new_status not in ALLOWED_TRANSITIONS:
+        raise TransitionError(f'Неизвестный статус: {new_status}')
+
+    sources = allowed_sources(new_status)
+    if strict:
+        wrong = queryset.exclude(status__in=sources).values_list('status', flat=True).first()
+        if wrong is not None:
+            check_transition(wrong, new_status)
+
+    changed_by = user if user is not None and user.is_authenticated else None
+    total = queryset.count()
+    changed = 0
+    last_id = 0
+    ids = queryset.filter(status__in=sources).order_by('pk').values_list('pk', flat=True)
+
+    while True:
+        with transaction.atomic():
+            rows = Appointment.objects.filter(pk__in=ids.filter(pk__gt=last_id)[:chunk_size])
+            if connection.features.has_select_for_update:
+                # Блокируются только строки записей, не услуги из JOIN
+                rows = rows.select_for_update(of=('self',))
+            # Вместе с id и статусом — поля вклада в сводки (услуга через JOIN)
+            chunk = list(rows.filter(status__in=sources).order_by('pk').values_list('pk', *FACT_FIELDS))
+            if not chunk:
+                break
+
+            chunk_ids = [pk for pk, *_ in chunk]
+            Appointment.objects.filter(pk__in=chunk_ids).update(status=new_status)
+            now = timezone.now()
+            AppointmentStatusChange.objects.bulk_create([
+                AppointmentStatusChange(
+                    appointment_id=pk,
+                    old_status=facts[-1],
+                    new_status=new_status,
+                    changed_at=now,
+                    changed_by=changed_by,
+                    source=source,
+                )
+                for pk, *facts in chunk
+            ])
+            delta = SummaryDelta()
+            for _, *facts in chunk:
+                delta.remove(*facts)
+                delta.add(*facts[:-1], new_status)
+            delta.apply()
+            invalidate_calendars(facts[1] for _, *facts in chunk)
+        changed += len(chunk)
+        last_id = chunk_ids[-1]
+
+    return changed, total - changed
@@ -5,10 +5,19 @@ from .views import (
     IndexView,
     ServiceViewSet,
     MasterViewSet,
-    AppointmentCreateView,
+    AppointmentListCreateView,
+    AppointmentImportView,
+    AppointmentArchiveListView,
+    AppointmentExportView,
     get_contacts,
     get_salon_info,
-    get_masters_for_service
+    get_masters_for_service,
+    get_master_availability,
+    get_bootstrap_data,
+    get_reports,
+    search_catalog,
+    master_calendar,
+    metrics
 )
 
 router = DefaultRouter()
@@ -19,10 +28,20 @@ router.register(r'masters', MasterViewSet, basename='master')
 urlpatterns = [
 
     path('', IndexView.as_view(), name='index'),
+    path('metrics', metrics, name='metrics'),
+    path('calendar/<int:master_id>.ics', master_calendar, name='master-calendar'),
+    path('api/async/', include('salon.async_urls')),
     path('api/', include(router.urls)),
-    path('api/appointments/', AppointmentCreateView.as_view(), name='appointment-create'),
+    path('api/appointments/', AppointmentListCreateView.as_view(), name='appointments'),
+    path('api/appointments/import/', AppointmentImportView.as_view(), name='appointment-import'),
+    path('api/appointments/archive/', AppointmentArchiveListView.as_view(), name='appointment-archive'),
+    path('api/appointments/export.<str:fmt>', AppointmentExportView.as_view(), name='appointment-export'),
     path('api/contacts/', get_contacts, name='contacts'),
     path('api/salon-info/', get_salon_info, name='salon-info'),
+    path('api/bootstrap/', get_bootstrap_data, name='bootstrap'),
+    path('api/reports/', get_reports, name='reports'),
+    path('api/search/', search_catalog, name='search'),
     path('api/services/<int:service_id>/masters/', get_masters_for_service, name='service-masters'),
+    path('api/masters/<int:master_id>/availability/', get_master_availability, name='master-availability'),
 ]
 
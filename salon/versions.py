@@ -0,0 +1,68 @@
+from functools import wraps
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+from .models import ContentVersion
+
+
+def bump_table_version(model):
+    table = model._meta.label_lower
+    now = timezone.now()
+    updated = ContentVersion.objects.filter(table=table).update(version=F('version') + 1, updated_at=now)
+    if not updated:
+        try:
+            with transaction.atomic():
+                ContentVersion.objects.create(table=table, version=1, updated_at=now)
+        except IntegrityError:
+            ContentVersion.objects.filter(table=table).update(version=F('version') + 1, updated_at=now)
+
+
+def get_table_versions(*models):
+    """Версии и время последнего изменения таблиц одним запросом: ([(table, version)], updated_at)."""
+    tables = [model._meta.label_lower for model in models]
+    rows = {
+        row.table: row
+        for row in ContentVersion.objects.filter(table__in=tables)
+    }
+    versions = [(table, rows[table].version if table in rows else 0) for table in tables]
+    timestamps = [row.updated_at for row in rows.values() if row.updated_at]
+    return versions, max(timestamps, default=None)
+
+
+def conditional_on(*models):
+    """
+    Conditional GET для представлений, чей ответ зависит только от таблиц models.
+
+    ETag и Last-Modified строятся по счётчикам версий таблиц, поэтому на
+    If-None-Match/If-Modified-Since отвечаем 304, не вызывая представление.
+    Методы ViewSet оборачиваются через method_decorator.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            versions, last_modified = get_table_versions(*models)
+
+            # Формат ответа входит в ETag: JSON и browsable API — разные представления
+            renderer = getattr(request, 'accepted_renderer', None)
+            etag = quote_etag('-'.join(
+                [f'{table.split(".")[-1]}.{version}' for table, version in versions]
+                + ([renderer.format] if renderer else [])
+            ))
+            last_modified = int(last_modified.timestamp()) if last_modified else None
+
+            response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+            if response is not None:
+                return response
+
+            response = view(request, *args, **kwargs)
+            if request.method in ('GET', 'HEAD') and response.status_code == 200:
+                response.headers.setdefault('ETag', etag)
+                if last_modified:
+                    response.headers.setdefault('Last-Modified', http_date(last_modified))
+            return response
+        return wrapper
+    return decorator
@@ -1,23 +1,87 @@
-from django.shortcuts import render
+import codecs
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.http import HttpResponse, HttpResponseForbidden, Http404
+from django.middleware.csrf import get_token
+from django.shortcuts import render, get_object_or_404
+from django.template.loader import render_to_string
+from django.utils.decorators import method_decorator
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.crypto import constant_time_compare
+from django.utils.dateparse import parse_date
+from django.utils.http import quote_etag
 from django.views.generic import TemplateView
 from rest_framework import viewsets, status, generics
 from rest_framework.response import Response
-from rest_framework.decorators import api_view
-from rest_framework.permissions import AllowAny
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import AllowAny, IsAdminUser
+from rest_framework.exceptions import ValidationError
+from rest_framework.parsers import MultiPartParser
+from rest_framework.views import APIView
 
-from .models import Service, Master, Appointment, Contact, SalonInfo
+from .models import Service, Master, Appointment, AppointmentArchive, Contact, SalonInfo
+from .availability import get_free_slots, MAX_DAYS
+from .cache import get_cached_page, get_service_masters, get_bootstrap, CSRF_PLACEHOLDER
+from .versions import conditional_on
+from .metrics import registry as metrics_registry
+from .pagination import KeysetPagination
+from .reports import REPORT_GROUPS, report
+from .search import search
+from .ics import calendar_state, check_calendar_token, get_calendar
+from .export import FORMATS as EXPORT_FORMATS, export_response
+from .filters import DATE_PERIODS, filter_period
+from .throttling import BookingThrottle, booking_throttled
+from .importer import AppointmentImporter, detect_format, read_rows
 from .serializers import (
     ServiceSerializer,
     MasterSerializer,
     AppointmentSerializer,
     AppointmentCreateSerializer,
+    AppointmentArchiveSerializer,
     ContactSerializer,
-    SalonInfoSerializer
+    SalonInfoSerializer,
+    represent_services,
+    represent_masters
 )
 
+def parse_date_param(value):
+    try:
+        return parse_date(value or '')
+    except ValueError:
+        return None
+
+
+def booking_confirmation(appointment):
+    return {
+        'success': True,
+        'message': 'Запись успешно создана! Мы свяжемся с вами для подтверждения.',
+        'appointment_id': appointment.id,
+        'details': {
+            'name': appointment.client_name,
+            'date': appointment.date.strftime('%d.%m.%Y'),
+            'time': appointment.time.strftime('%H:%M'),
+            'master': appointment.master.name,
+            'service': appointment.service.name
+        }
+    }
+
+
 class IndexView(TemplateView):
     template_name = 'salon/index.html'
 
+    def get(self, request, *args, **kwargs):
+        # Страница одинакова для всех, кроме CSRF-токена формы записи
+        content = get_cached_page('index', lambda: self.render_page(**kwargs))
+        return HttpResponse(content.replace(CSRF_PLACEHOLDER, get_token(request)))
+
+    def render_page(self, **kwargs):
+        context = self.get_context_data(**kwargs)
+        context['csrf_token'] = CSRF_PLACEHOLDER
+        return render_to_string(self.template_name, context, request=self.request)
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['salon_info'] = SalonInfo.objects.first()
@@ -33,51 +97,215 @@ class IndexView(TemplateView):
 
         context['masters'] = Master.objects.filter(is_active=True).prefetch_related('services')
         context['contacts'] = Contact.objects.first()
+        context['bootstrap'] = get_bootstrap()
 
         return context
 
-class ServiceViewSet(viewsets.ReadOnlyModelViewSet):
+class FastReadMixin:
+    """list/retrieve через represent_* из values(); serializer_class остаётся эталоном формата."""
+    represent = None
+
+    def list(self, request, *args, **kwargs):
+        return Response(self.represent(self.get_queryset(), request))
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup = self.kwargs[self.lookup_url_kwarg or self.lookup_field]
+        try:
+            rows = self.represent(self.get_queryset().filter(**{self.lookup_field: lookup}), request)
+        except (TypeError, ValueError, DjangoValidationError):
+            rows = []
+        if not rows:
+            raise Http404
+        return Response(rows[0])
+
+
+@method_decorator(conditional_on(Service), name='list')
+@method_decorator(conditional_on(Service), name='retrieve')
+class ServiceViewSet(FastReadMixin, viewsets.ReadOnlyModelViewSet):
     queryset = Service.objects.filter(is_active=True)
     serializer_class = ServiceSerializer
+    represent = staticmethod(represent_services)
     permission_classes = [AllowAny]  # Доступно всем без авторизации
 
 
-class MasterViewSet(viewsets.ReadOnlyModelViewSet):
+@method_decorator(conditional_on(Master, Service), name='list')
+@method_decorator(conditional_on(Master, Service), name='retrieve')
+class MasterViewSet(FastReadMixin, viewsets.ReadOnlyModelViewSet):
     queryset = Master.objects.filter(is_active=True).prefetch_related('services')
     serializer_class = MasterSerializer
+    represent = staticmethod(represent_masters)
     permission_classes = [AllowAny]
 
 
-class AppointmentCreateView(generics.CreateAPIView):
-    queryset = Appointment.objects.all()
-    serializer_class = AppointmentCreateSerializer
-    permission_classes = [AllowAny]
+def filter_appointments(queryset, params):
+    """
+    Фильтры списка записей для персонала: master, service, status, period
+    (как фильтр «Дата» в админке), date_from, date_to.
+    """
+    errors = {}
+
+    for param, message in (('master', 'Укажите id мастера'), ('service', 'Укажите id услуги')):
+        if param in params:
+            if params[param].isdigit():
+                queryset = queryset.filter(**{f'{param}_id': params[param]})
+            else:
+                errors[param] = message
+
+    if 'status' in params:
+        if params['status'] in dict(Appointment.STATUS_CHOICES):
+            queryset = queryset.filter(status=params['status'])
+        else:
+            errors['status'] = f'Допустимые значения: {", ".join(dict(Appointment.STATUS_CHOICES))}'
+
+    if 'period' in params:
+        if params['period'] in DATE_PERIODS or params['period'] == 'past':
+            queryset = filter_period(queryset, params['period'])
+        else:
+            errors['period'] = f'Допустимые значения: {", ".join([*DATE_PERIODS, "past"])}'
+
+    for param, lookup in (('date_from', 'date__gte'), ('date_to', 'date__lte')):
+        if param in params:
+            value = parse_date_param(params[param])
+            if value is None:
+                errors[param] = 'Дата в формате ГГГГ-ММ-ДД'
+            else:
+                queryset = queryset.filter(**{lookup: value})
+
+    if errors:
+        raise ValidationError(errors)
+    return queryset
+
+
+class AppointmentListCreateView(generics.ListCreateAPIView):
+    # Запись доступна всем, просмотр списка — только персоналу
+    pagination_class = KeysetPagination
+
+    def get_permissions(self):
+        if self.request.method == 'POST':
+            return [AllowAny()]
+        return [IsAdminUser()]
+
+    def get_serializer_class(self):
+        if self.request.method == 'POST':
+            return AppointmentCreateSerializer
+        return AppointmentSerializer
+
+    def get_throttles(self):
+        if self.request.method == 'POST':
+            return [BookingThrottle()]
+        return []
+
+    def throttled(self, request, wait):
+        raise booking_throttled(wait)
+
+    def get_queryset(self):
+        queryset = Appointment.objects.select_related('master', 'service')
+        return filter_appointments(queryset, self.request.query_params)
 
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
 
-        if serializer.is_valid():
+        try:
+            serializer.is_valid(raise_exception=True)
             appointment = serializer.save()
+        except ValidationError as error:
             return Response({
-                'success': True,
-                'message': 'Запись успешно создана! Мы свяжемся с вами для подтверждения.',
-                'appointment_id': appointment.id,
-                'details': {
-                    'name': appointment.client_name,
-                    'date': appointment.date.strftime('%d.%m.%Y'),
-                    'time': appointment.time.strftime('%H:%M'),
-                    'master': appointment.master.name,
-                    'service': appointment.service.name
-                }
-            }, status=status.HTTP_201_CREATED)
-
-        return Response({
-            'success': False,
-            'errors': serializer.errors
-        }, status=status.HTTP_400_BAD_REQUEST)
+                'success': False,
+                'errors': error.detail
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(booking_confirmation(appointment), status=status.HTTP_201_CREATED)
+
+
+class AppointmentArchiveListView(generics.ListAPIView):
+    """Архив записей для персонала: те же фильтры, что у списка записей, и client_phone."""
+    permission_classes = [IsAdminUser]
+    pagination_class = KeysetPagination
+    serializer_class = AppointmentArchiveSerializer
+
+    def get_queryset(self):
+        queryset = AppointmentArchive.objects.select_related('master', 'service')
+        params = self.request.query_params
+        if params.get('client_phone'):
+            queryset = queryset.filter(client_phone=params['client_phone'])
+        return filter_appointments(queryset, params)
+
+
+class AppointmentExportView(APIView):
+    """Потоковая выгрузка записей для персонала: /api/appointments/export.csv или .xlsx с фильтрами списка."""
+    permission_classes = [IsAdminUser]
+
+    def perform_content_negotiation(self, request, force=False):
+        # Ответ — файл, а не JSON: Accept: text/csv не должен давать 406
+        return super().perform_content_negotiation(request, force=True)
+
+    def get(self, request, fmt):
+        if fmt not in EXPORT_FORMATS:
+            raise Http404
+        queryset = filter_appointments(Appointment.objects.all(), request.query_params)
+        return export_response(queryset, fmt)
+
+
+class AppointmentImportView(APIView):
+    """
+    Пакетный импорт записей для персонала: файл в поле file (multipart)
+    либо тело запроса с Content-Type text/csv или application/x-ndjson.
+    """
+    permission_classes = [IsAdminUser]
+    parser_classes = [MultiPartParser]
+
+    def post(self, request, *args, **kwargs):
+        if request.content_type.startswith('multipart/form-data'):
+            upload = request.data.get('file')
+            if upload is None:
+                return Response({'errors': {'file': 'Прикрепите файл'}}, status=status.HTTP_400_BAD_REQUEST)
+            fmt = detect_format(name=upload.name, content_type=upload.content_type or '')
+            lines = upload
+        else:
+            fmt = detect_format(content_type=request.content_type)
+            lines = request.stream or []
+
+        if fmt is None:
+            return Response(
+                {'errors': {'file': 'Поддерживаются CSV (.csv, text/csv) и JSON lines (.jsonl, application/x-ndjson)'}},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        importer = AppointmentImporter(dry_run=request.query_params.get('dry_run') in ('1', 'true'))
+        try:
+            report = importer.run(read_rows(codecs.iterdecode(lines, 'utf-8-sig'), fmt))
+        except UnicodeDecodeError:
+            report = importer.report()
+            report['errors'].append({'row': importer.total + 1, 'errors': {'row': 'Файл должен быть в UTF-8'}})
+            return Response(report, status=status.HTTP_400_BAD_REQUEST)
+        return Response(report)
+
+
+SEARCH_LIMIT = 20
 
 
 @api_view(['GET'])
+@conditional_on(Master, Service)
+def search_catalog(request):
+    """Поиск по активным услугам и мастерам: ?q=..., результаты от самых релевантных."""
+    query = request.query_params.get('q', '').strip()
+    if len(query) < 2:
+        return Response({'errors': {'q': 'Введите не меньше 2 символов'}}, status=status.HTTP_400_BAD_REQUEST)
+
+    results = {}
+    for kind, model, represent in (
+        ('services', Service, represent_services),
+        ('masters', Master, represent_masters),
+    ):
+        # С запасом на неактивные: они есть в индексе, но не в выдаче
+        ids = search(query, kind[:-1], limit=SEARCH_LIMIT * 2)
+        rows = {row['id']: row for row in represent(model.objects.filter(is_active=True, pk__in=ids), request)}
+        results[kind] = [rows[pk] for pk in ids if pk in rows][:SEARCH_LIMIT]
+    return Response({'query': query, **results})
+
+
+@api_view(['GET'])
+@conditional_on(Contact)
 def get_contacts(request):
     contact = Contact.objects.first()
     if contact:
@@ -87,6 +315,7 @@ def get_contacts(request):
 
 
 @api_view(['GET'])
+@conditional_on(SalonInfo)
 def get_salon_info(request):
     salon_info = SalonInfo.objects.first()
     if salon_info:
@@ -97,11 +326,141 @@ def get_salon_info(request):
 
 @api_view(['GET'])
 def get_masters_for_service(request, service_id):
-    masters = Master.objects.filter(
-        is_active=True,
-        services__id=service_id
-    ).distinct()
+    return Response(get_service_masters(service_id))
+
+
+@api_view(['GET'])
+def get_bootstrap_data(request):
+    bootstrap = get_bootstrap()
+    etag = quote_etag(f'catalog.{bootstrap["version"]}-{request.accepted_renderer.format}')
+
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = Response(bootstrap)
+        response['ETag'] = etag
+
+    # Ссылка с актуальной версией (?v=...) не меняется никогда — её можно кэшировать навсегда
+    if request.query_params.get('v') == str(bootstrap['version']):
+        response['Cache-Control'] = 'public, max-age=31536000, immutable'
+    else:
+        response['Cache-Control'] = 'no-cache'
+    return response
+
+
+@api_view(['GET'])
+def get_master_availability(request, master_id):
+    master = get_object_or_404(Master, pk=master_id, is_active=True)
+
+    service_id = request.query_params.get('service')
+    if not service_id or not service_id.isdigit():
+        return Response({'errors': {'service': 'Укажите услугу'}}, status=status.HTTP_400_BAD_REQUEST)
+
+    service = master.services.filter(pk=service_id, is_active=True).only('id', 'duration').first()
+    if service is None:
+        return Response(
+            {'errors': {'service': f'Мастер {master.name} не оказывает эту услугу'}},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    date_from = timezone.localdate()
+    if 'date' in request.query_params:
+        date_from = parse_date_param(request.query_params['date'])
+        if date_from is None:
+            return Response({'errors': {'date': 'Дата в формате ГГГГ-ММ-ДД'}}, status=status.HTTP_400_BAD_REQUEST)
+
+    days = request.query_params.get('days', '7')
+    if not days.isdigit() or not 1 <= int(days) <= MAX_DAYS:
+        return Response({'errors': {'days': f'От 1 до {MAX_DAYS}'}}, status=status.HTTP_400_BAD_REQUEST)
+
+    slots = get_free_slots(master.id, service.duration, date_from, days=int(days))
+    return Response({
+        'master': master.id,
+        'service': service.id,
+        'duration': service.duration,
+        'days': [
+            {
+                'date': day.isoformat(),
+                'slots': [start.strftime('%H:%M') for start in starts]
+            }
+            for day, starts in slots.items()
+        ]
+    })
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def get_reports(request):
+    """
+    Выручка и загрузка за период по сводкам: date_from, date_to (по умолчанию
+    последние 30 дней), group_by=day|master|category, фильтры master и category.
+    """
+    params = request.query_params
+    errors = {}
+
+    days = {}
+    for param in ('date_from', 'date_to'):
+        if param in params:
+            days[param] = parse_date_param(params[param])
+            if days[param] is None:
+                errors[param] = 'Дата в формате ГГГГ-ММ-ДД'
+    date_to = days.get('date_to') or timezone.localdate()
+    date_from = days.get('date_from') or date_to - timedelta(days=29)
+    if date_from > date_to:
+        errors['date_from'] = 'Начало периода позже конца'
+
+    group_by = params.get('group_by', 'day')
+    if group_by not in REPORT_GROUPS:
+        errors['group_by'] = f'Допустимые значения: {", ".join(REPORT_GROUPS)}'
+
+    master_id = params.get('master')
+    if master_id is not None and not master_id.isdigit():
+        errors['master'] = 'Укажите id мастера'
+    category = params.get('category')
+    if category is not None and category not in dict(Service.CATEGORY_CHOICES):
+        errors['category'] = f'Допустимые значения: {", ".join(dict(Service.CATEGORY_CHOICES))}'
+
+    if errors:
+        return Response({'errors': errors}, status=status.HTTP_400_BAD_REQUEST)
+
+    rows, totals = report(date_from, date_to, group_by, master_id=master_id and int(master_id), category=category)
+    return Response({
+        'date_from': date_from.isoformat(),
+        'date_to': date_to.isoformat(),
+        'group_by': group_by,
+        'results': rows,
+        'totals': totals,
+    })
+
+
+def master_calendar(request, master_id):
+    """
+    ICS-лента записей мастера по токену из админки. Без запросов к БД,
+    пока записи мастера не менялись: 304 по ETag или готовый ICS из кэша.
+    """
+    if not check_calendar_token(master_id, request.GET.get('token', '')):
+        raise Http404
+    today = timezone.localdate()
+    state = calendar_state(master_id, today)
+    etag = quote_etag(state)
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        content = get_calendar(master_id, state, today)
+        if content is None:
+            raise Http404
+        response = HttpResponse(content, content_type='text/calendar; charset=utf-8')
+    response['ETag'] = etag
+    response['Cache-Control'] = 'private, no-cache'
+    return response
 
-    serializer = MasterSerializer(masters, many=True)
-    return Response(serializer.data)
 
+def metrics(request):
+    """Метрики процесса в формате Prometheus: по токену METRICS_TOKEN или для персонала."""
+    token = settings.METRICS_TOKEN
+    authorization = request.headers.get('Authorization', '')
+    allowed = (
+        (token and constant_time_compare(authorization, f'Bearer {token}'))
+        or (request.user.is_authenticated and request.user.is_staff)
+    )
+    if not allowed:
+        return HttpResponseForbidden()
+    return HttpResponse(metrics_registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -21,6 +21,8 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'salon.middleware.StaticFilesMiddleware',
+    'salon.middleware.MetricsMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -50,13 +52,90 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'spa_site.wsgi.application'
 
-DATABASES = {
+DB_ENGINE = config('DB_ENGINE', default='sqlite3')
+
+if DB_ENGINE == 'postgresql':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': config('DB_NAME', default='spa_site'),
+            'USER': config('DB_USER', default='postgres'),
+            'PASSWORD': config('DB_PASSWORD', default=''),
+            'HOST': config('DB_HOST', default='localhost'),
+            'PORT': config('DB_PORT', default='5432'),
+        }
+    }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': config('DB_NAME', default=str(BASE_DIR / 'db.sqlite3')),
+            'OPTIONS': {
+                # Сколько ждать блокировку записи, сек. (sqlite3.connect(timeout=...))
+                'timeout': config('SQLITE_TIMEOUT', default=20, cast=int),
+            },
+        }
+    }
+
+# Постоянные соединения только для WSGI (gunicorn, runserver): DB_CONN_MAX_AGE=60 — не открывать
+# новое на каждый запрос, перед повторным использованием соединение проверяется (CONN_HEALTH_CHECKS).
+# Под ASGI (uvicorn) оставьте 0: ORM асинхронных вьюх работает в потоках sync_to_async,
+# и их соединения переживают запрос — close_old_connections до них не доходит
+DATABASES['default']['CONN_MAX_AGE'] = config('DB_CONN_MAX_AGE', default=0, cast=int)
+DATABASES['default']['CONN_HEALTH_CHECKS'] = config('DB_CONN_HEALTH_CHECKS', default=True, cast=bool)
+
+# PRAGMA для каждого нового соединения SQLite (salon.signals.configure_sqlite).
+# WAL: читатели не блокируют писателя и наоборот; synchronous=NORMAL в WAL
+# безопасен для целостности и не делает fsync на каждый коммит
+SQLITE_PRAGMAS = {
+    'journal_mode': config('SQLITE_JOURNAL_MODE', default='WAL'),
+    'synchronous': config('SQLITE_SYNCHRONOUS', default='NORMAL'),
+    'busy_timeout': config('SQLITE_BUSY_TIMEOUT', default=20000, cast=int),   # мс
+    'mmap_size': config('SQLITE_MMAP_SIZE', default=256 * 1024 * 1024, cast=int),
+    'temp_store': 'MEMORY',
+}
+
+# LocMemCache живёт внутри процесса: при нескольких воркерах укажите общий бэкенд
+# (FileBasedCache, Redis, Memcached), иначе сброс версии каталога не дойдёт до остальных
+CACHES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default='spa-site'),
     }
 }
 
+PAGE_CACHE_TIMEOUT = config('PAGE_CACHE_TIMEOUT', default=60 * 60 * 24, cast=int)
+
+EMAIL_BACKEND = config('EMAIL_BACKEND', default='django.core.mail.backends.console.EmailBackend')
+EMAIL_HOST = config('EMAIL_HOST', default='localhost')
+EMAIL_PORT = config('EMAIL_PORT', default=25, cast=int)
+EMAIL_HOST_USER = config('EMAIL_HOST_USER', default='')
+EMAIL_HOST_PASSWORD = config('EMAIL_HOST_PASSWORD', default='')
+EMAIL_USE_TLS = config('EMAIL_USE_TLS', default=False, cast=bool)
+EMAIL_TIMEOUT = config('EMAIL_TIMEOUT', default=10, cast=int)
+DEFAULT_FROM_EMAIL = config('DEFAULT_FROM_EMAIL', default='webmaster@localhost')
+
+# Очередь исходящих писем (salon.outbox, manage.py run_outbox_worker)
+OUTBOX_BATCH_SIZE = config('OUTBOX_BATCH_SIZE', default=50, cast=int)
+OUTBOX_MAX_ATTEMPTS = config('OUTBOX_MAX_ATTEMPTS', default=8, cast=int)
+OUTBOX_RETRY_DELAY = config('OUTBOX_RETRY_DELAY', default=30, cast=int)            # сек., удваивается
+OUTBOX_MAX_RETRY_DELAY = config('OUTBOX_MAX_RETRY_DELAY', default=60 * 60, cast=int)
+OUTBOX_LEASE = config('OUTBOX_LEASE', default=5 * 60, cast=int)                    # сек. на отправку пачки
+
+# /metrics: доступ по заголовку "Authorization: Bearer <METRICS_TOKEN>" или для персонала.
+# METRICS_SLOW_QUERY_MS > 0 включает лог медленных SQL с планом запроса
+METRICS_TOKEN = config('METRICS_TOKEN', default='')
+METRICS_SLOW_QUERY_MS = config('METRICS_SLOW_QUERY_MS', default=0, cast=float)
+
+# Лимиты записи через API: "<число>/<s|min|hour|day>", пустое значение или none — без ограничения.
+# Счётчики хранятся в кэше, поэтому при нескольких процессах нужен общий CACHE_BACKEND (Redis, Memcached)
+BOOKING_THROTTLE_IP = config('BOOKING_THROTTLE_IP', default='10/min')
+BOOKING_THROTTLE_PHONE = config('BOOKING_THROTTLE_PHONE', default='5/hour')
+
+# Окно ICS-ленты мастера /calendar/<id>.ics: дней назад и вперёд от сегодняшнего
+CALENDAR_PAST_DAYS = config('CALENDAR_PAST_DAYS', default=7, cast=int)
+CALENDAR_FUTURE_DAYS = config('CALENDAR_FUTURE_DAYS', default=60, cast=int)
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -86,6 +165,17 @@ STATICFILES_DIRS = [
 
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 
+# collectstatic минифицирует CSS/JS, добавляет хэш в имена и пишет .gz/.br рядом;
+# StaticFilesMiddleware раздаёт результат из STATIC_ROOT
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'salon.staticfiles.CompressedManifestStaticFilesStorage',
+    },
+}
+
 MEDIA_URL = 'media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
@@ -97,6 +187,9 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.AllowAny',
     ],
+    # Число доверенных прокси перед приложением: IP клиента для лимитов берётся из X-Forwarded-For
+    # только за ними; 0 — только REMOTE_ADDR, иначе подменённый заголовок обходит лимит по IP
+    'NUM_PROXIES': config('NUM_PROXIES', default=0, cast=int),
 }
 
 
@@ -4,6 +4,7 @@ document.addEventListener('DOMContentLoaded', function() {
     const serviceSelect = document.getElementById('service');
     const masterSelect = document.getElementById('master');
     const dateInput = document.getElementById('date');
+    const timeSelect = document.getElementById('time');
     const formMessage = document.getElementById('formMessage');
     function setMinDate() {
         const today = new Date();
@@ -17,6 +18,28 @@ document.addEventListener('DOMContentLoaded', function() {
 
     setMinDate();
 
+    let catalog = null;
+
+    // Каталог встроен в страницу; отдельный запрос — только если его там нет
+    async function loadCatalog() {
+        if (catalog) {
+            return catalog;
+        }
+
+        const inline = document.getElementById('catalogBootstrap');
+        if (inline) {
+            catalog = JSON.parse(inline.textContent);
+            return catalog;
+        }
+
+        const response = await fetch('/api/bootstrap/');
+        if (!response.ok) {
+            throw new Error('Ошибка загрузки каталога');
+        }
+        catalog = await response.json();
+        return catalog;
+    }
+
     serviceSelect.addEventListener('change', async function() {
         const serviceId = this.value;
 
@@ -29,16 +52,13 @@ document.addEventListener('DOMContentLoaded', function() {
         }
 
         try {
-            const response = await fetch(`/api/services/${serviceId}/masters/`);
+            const { masters, service_masters } = await loadCatalog();
+            const masterIds = new Set(service_masters[serviceId] || []);
+            const available = masters.filter(master => masterIds.has(master.id));
 
-            if (!response.ok) {
-                throw new Error('Ошибка загрузки мастеров');
-            }
-
-            const masters = await response.json();
             masterSelect.innerHTML = '<option value="">Выберите мастера</option>';
 
-            masters.forEach(master => {
+            available.forEach(master => {
                 const option = document.createElement('option');
                 option.value = master.id;
                 option.textContent = `${master.name} (${master.specialization})`;
@@ -46,7 +66,7 @@ document.addEventListener('DOMContentLoaded', function() {
             });
 
             masterSelect.disabled = false;
-            if (masters.length === 0) {
+            if (available.length === 0) {
                 masterSelect.innerHTML = '<option value="">Нет доступных мастеров</option>';
             }
 
@@ -56,6 +76,45 @@ document.addEventListener('DOMContentLoaded', function() {
         }
     });
 
+    async function loadFreeSlots() {
+        const serviceId = serviceSelect.value;
+        const masterId = masterSelect.value;
+
+        if (!serviceId || !masterId || !dateInput.value) {
+            return;
+        }
+
+        try {
+            const params = new URLSearchParams({ service: serviceId, date: dateInput.value, days: 1 });
+            const response = await fetch(`/api/masters/${masterId}/availability/?${params}`);
+
+            if (!response.ok) {
+                throw new Error('Ошибка загрузки свободного времени');
+            }
+
+            const availability = await response.json();
+            const slots = availability.days.length ? availability.days[0].slots : [];
+            timeSelect.innerHTML = '<option value="">Выберите время</option>';
+
+            slots.forEach(slot => {
+                const option = document.createElement('option');
+                option.value = slot;
+                option.textContent = slot;
+                timeSelect.appendChild(option);
+            });
+
+            if (slots.length === 0) {
+                timeSelect.innerHTML = '<option value="">Нет свободного времени</option>';
+            }
+
+        } catch (error) {
+            console.error('Ошибка:', error);
+        }
+    }
+
+    masterSelect.addEventListener('change', loadFreeSlots);
+    dateInput.addEventListener('change', loadFreeSlots);
+
     const phoneInput = document.getElementById('client_phone');
 
     phoneInput.addEventListener('input', function(e) {
@@ -130,6 +189,8 @@ document.addEventListener('DOMContentLoaded', function() {
                         }
                     }
                     errorMessage = errorList.join(' ');
+                } else if (result.detail) {
+                    errorMessage = result.detail;
                 }
 
                 showMessage('error', errorMessage);
@@ -0,0 +1,148 @@
+from datetime import date, time, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from salon.models import Service, Master, Appointment
+from salon.pagination import EstimatedCountPaginator, estimate_table_rows
+
+
+class AppointmentAdminTest(TestCase):
+    url = '/admin/salon/appointment/'
+
+    def setUp(self):
+        self.client.force_login(User.objects.create_superuser('admin', password='pass'))
+        self.services = [
+            Service.objects.create(name=f'Услуга {i}', price=Decimal('1000.00'), duration=30)
+            for i in range(3)
+        ]
+        self.masters = [Master.objects.create(name=f'Мастер {i}', specialization='Стилист') for i in range(3)]
+
+    def create_appointments(self, count, start=0):
+        Appointment.objects.bulk_create([
+            Appointment(
+                client_name=f'Клиент {i}',
+                client_phone='+79001234567',
+                master=self.masters[i % 3],
+                service=self.services[i % 3],
+                date=date.today() + timedelta(days=i % 10),
+                time=time(9 + i % 12, 0)
+            )
+            for i in range(start, start + count)
+        ])
+
+    def changelist_queries(self, query=''):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url + query)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_changelist_queries_do_not_grow_with_rows(self):
+        self.create_appointments(3)
+        few = self.changelist_queries()
+        self.create_appointments(60, start=3)
+
+        self.assertEqual(self.changelist_queries(), few)
+        self.assertEqual(self.changelist_queries('?period=week&status__exact=new'), few)
+
+    def test_change_form_rejects_overlap(self):
+        booked = Appointment.objects.create(
+            client_name='Клиент', client_phone='+79001234567', master=self.masters[0],
+            service=self.services[0], date=date.today(), time=time(10, 0)
+        )
+        other = Appointment.objects.create(
+            client_name='Клиент', client_phone='+79001234567', master=self.masters[1],
+            service=self.services[0], date=date.today(), time=time(10, 15)
+        )
+        data = {
+            'client_name': 'Клиент',
+            'client_phone': '+79001234567',
+            'client_email': '',
+            'master': self.masters[0].pk,
+            'service': self.services[0].pk,
+            'date': date.today().isoformat(),
+            'time': '10:15',
+            'status': 'new',
+            'comment': '',
+            'status_history-TOTAL_FORMS': '0',
+            'status_history-INITIAL_FORMS': '0',
+        }
+
+        response = self.client.post(f'{self.url}{other.pk}/change/', data)
+        self.assertContains(response, 'это время уже занято')
+        self.assertEqual(Appointment.objects.get(pk=other.pk).master, self.masters[1])
+
+        # Сдвиг внутри собственного интервала: сама запись себе не мешает
+        data.update(time='10:10')
+        response = self.client.post(f'{self.url}{booked.pk}/change/', data)
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(Appointment.objects.get(pk=booked.pk).time, time(10, 10))
+
+    def test_autocomplete_widgets(self):
+        response = self.client.get(self.url + 'add/')
+
+        self.assertContains(response, 'data-field-name="master"')
+        self.assertContains(response, 'data-field-name="service"')
+
+    def test_date_filter(self):
+        self.create_appointments(10)
+
+        response = self.client.get(self.url + '?period=today')
+
+        self.assertEqual(response.context['cl'].result_count, 1)
+
+
+class EstimatedCountPaginatorTest(TestCase):
+    def setUp(self):
+        service = Service.objects.create(name='Стрижка', price=Decimal('1000.00'), duration=30)
+        master = Master.objects.create(name='Анна', specialization='Стилист')
+        Appointment.objects.bulk_create([
+            Appointment(
+                client_name='Клиент',
+                client_phone='+79001234567',
+                master=master,
+                service=service,
+                date=date.today(),
+                time=time(10, 0),
+                status='new' if i % 2 else 'confirmed'
+            )
+            for i in range(30)
+        ])
+
+    def paginator(self, queryset, cap):
+        paginator = EstimatedCountPaginator(queryset, 10)
+        paginator.count_cap = cap
+        return paginator
+
+    def test_exact_below_cap(self):
+        self.assertEqual(self.paginator(Appointment.objects.all(), 100).count, 30)
+
+    def test_filtered_count_is_capped(self):
+        paginator = self.paginator(Appointment.objects.filter(status='new'), 10)
+
+        self.assertEqual(paginator.count, 10)
+        self.assertEqual(paginator.num_pages, 1)
+
+    def test_unfiltered_count_uses_statistics(self):
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+        self.assertEqual(self.paginator(Appointment.objects.all(), 10).count, 30)
+
+    def test_partial_index_statistics_ignored(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest('только для SQLite')
+
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+            # Частичный индекс по неотменённым записям — первой строкой статистики таблицы
+            cursor.execute('DELETE FROM sqlite_stat1 WHERE tbl = %s', ['salon_appointment'])
+            cursor.executemany('INSERT INTO sqlite_stat1 (tbl, idx, stat) VALUES (%s, %s, %s)', [
+                ('salon_appointment', 'salon_appt_active_slot_idx', '12 6 1 1'),
+                ('salon_appointment', 'salon_appt_date_time_idx', '30 30 1'),
+            ])
+
+        self.assertEqual(estimate_table_rows(Appointment), 30)
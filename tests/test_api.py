@@ -1,11 +1,16 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase
 from django.urls import reverse
 from rest_framework.test import APITestCase, APIClient
 from rest_framework import status
 from decimal import Decimal
-from datetime import date, timedelta
+from datetime import date, time, timedelta
 
+from salon.cache import get_catalog_version
 from salon.models import Service, Master, Appointment, Contact, SalonInfo
+from salon.pagination import KeysetPagination
 
 
 class ServiceAPITest(APITestCase):
@@ -103,9 +108,40 @@ class MasterAPITest(APITestCase):
         self.assertEqual(len(response.data), 1)
         self.assertEqual(response.data[0]['name'], 'Анна Тестова')
 
+    def test_masters_for_service_compact_without_queries(self):
+        url = f'/api/services/{self.service.id}/masters/'
+        self.client.get(url)
+
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+
+        self.assertEqual(response.data, [{
+            'id': self.master.id,
+            'name': 'Анна Тестова',
+            'specialization': 'Стилист'
+        }])
+
+    def test_masters_for_service_follow_changes(self):
+        url = f'/api/services/{self.service.id}/masters/'
+        self.client.get(url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.inactive_master.is_active = True
+            self.inactive_master.save()
+            self.inactive_master.services.add(self.service)
+        self.assertEqual(len(self.client.get(url).data), 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.master.services.remove(self.service)
+        self.assertEqual(
+            [m['name'] for m in self.client.get(url).data],
+            ['Неактивный мастер']
+        )
+
 
 class AppointmentAPITest(APITestCase):
     def setUp(self):
+        cache.clear()  # счётчики ограничения частоты записи
         self.service = Service.objects.create(
             name='Услуга для записи',
             price=Decimal('2000.00'),
@@ -173,6 +209,409 @@ class AppointmentAPITest(APITestCase):
 
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
 
+    def booking_data(self, time, **extra):
+        return {
+            'client_name': 'Иван',
+            'client_phone': '+79001234567',
+            'master': self.master.id,
+            'service': self.service.id,
+            'date': self.future_date.strftime('%Y-%m-%d'),
+            'time': time,
+            **extra
+        }
+
+    def test_create_appointment_overlap_rejected(self):
+        url = '/api/appointments/'
+        first = self.client.post(url, self.booking_data('14:00'), format='json')
+        overlapping = self.client.post(url, self.booking_data('14:30'), format='json')
+        adjacent = self.client.post(url, self.booking_data('15:00'), format='json')
+
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(overlapping.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('time', overlapping.data['errors'])
+        self.assertEqual(adjacent.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Appointment.objects.count(), 2)
+
+    def test_cancelled_appointment_frees_slot(self):
+        url = '/api/appointments/'
+        self.client.post(url, self.booking_data('14:00'), format='json')
+        Appointment.objects.update(status='cancelled')
+
+        response = self.client.post(url, self.booking_data('14:00'), format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_other_master_same_time_allowed(self):
+        other_master = Master.objects.create(
+            name='Второй мастер',
+            specialization='Специалист',
+            experience=2
+        )
+        other_master.services.add(self.service)
+        url = '/api/appointments/'
+        self.client.post(url, self.booking_data('14:00'), format='json')
+
+        response = self.client.post(url, self.booking_data('14:00', master=other_master.id), format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_create_appointment_service_not_provided(self):
+        service = Service.objects.create(
+            name='Чужая услуга',
+            price=Decimal('100.00'),
+            duration=30
+        )
+        url = '/api/appointments/'
+
+        response = self.client.post(url, self.booking_data('14:00', service=service.id), format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('service', response.data['errors'])
+        self.assertEqual(Appointment.objects.count(), 0)
+
+
+class AppointmentListAPITest(APITestCase):
+    def setUp(self):
+        self.service = Service.objects.create(
+            name='Услуга',
+            price=Decimal('1000.00'),
+            duration=30,
+            category='hair'
+        )
+        self.master = Master.objects.create(name='Мастер', specialization='Специалист')
+        self.other_master = Master.objects.create(name='Другой', specialization='Специалист')
+        self.staff = User.objects.create_user('staff', password='pass', is_staff=True)
+
+        self.first_day = date.today() + timedelta(days=1)
+        appointments = []
+        for day in range(3):
+            for hour in (10, 12, 14):
+                appointments.append(Appointment(
+                    client_name=f'Клиент {day}-{hour}',
+                    client_phone='+79001234567',
+                    master=self.master if hour != 14 else self.other_master,
+                    service=self.service,
+                    date=self.first_day + timedelta(days=day),
+                    time=time(hour, 0),
+                    status='confirmed' if hour == 10 else 'new'
+                ))
+        Appointment.objects.bulk_create(appointments)
+
+    def test_requires_staff(self):
+        self.assertEqual(self.client.get('/api/appointments/').status_code, status.HTTP_403_FORBIDDEN)
+
+        User.objects.create_user('client', password='pass')
+        self.client.login(username='client', password='pass')
+        self.assertEqual(self.client.get('/api/appointments/').status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_keyset_pages_cover_all_rows(self):
+        self.client.force_authenticate(self.staff)
+        url = '/api/appointments/?page_size=4'
+        seen = []
+
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            seen.extend(response.data['results'])
+            url = response.data['next']
+
+        self.assertEqual(len(seen), 9)
+        self.assertEqual(len({row['id'] for row in seen}), 9)
+        self.assertEqual(seen[0]['client_name'], 'Клиент 2-14')
+        self.assertEqual(seen[-1]['client_name'], 'Клиент 0-10')
+        self.assertEqual(seen[0]['master_details']['name'], 'Другой')
+
+    def test_ascending_order(self):
+        self.client.force_authenticate(self.staff)
+
+        response = self.client.get('/api/appointments/', {'ordering': 'date', 'page_size': 2})
+
+        self.assertEqual([r['client_name'] for r in response.data['results']], ['Клиент 0-10', 'Клиент 0-12'])
+
+    def test_filters(self):
+        self.client.force_authenticate(self.staff)
+
+        response = self.client.get('/api/appointments/', {
+            'master': self.master.id,
+            'status': 'new',
+            'date_from': (self.first_day + timedelta(days=1)).isoformat(),
+            'date_to': (self.first_day + timedelta(days=2)).isoformat(),
+        })
+
+        self.assertEqual([r['client_name'] for r in response.data['results']], ['Клиент 2-12', 'Клиент 1-12'])
+
+    def test_page_in_constant_queries(self):
+        self.client.force_authenticate(self.staff)
+        next_url = self.client.get('/api/appointments/?page_size=2').data['next']
+
+        with self.assertNumQueries(1):
+            self.client.get(next_url)
+
+    def test_cursor_is_index_range(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest('план запроса в формате SQLite')
+
+        paginator = KeysetPagination()
+        for descending in (True, False):
+            paginator.descending = descending
+            queryset = Appointment.objects.filter(paginator.after(self.first_day, time(12, 0), 1))
+            ordering = ['-date', '-time', '-id'] if descending else ['date', 'time', 'id']
+            plan = queryset.order_by(*ordering).explain()
+
+            # Поиск по диапазону индекса, а не просмотр индекса с начала
+            self.assertIn('SEARCH', plan)
+            self.assertNotIn('SCAN', plan)
+
+    def test_invalid_filter_and_cursor(self):
+        self.client.force_authenticate(self.staff)
+
+        self.assertEqual(self.client.get('/api/appointments/', {'status': 'lost'}).status_code, 400)
+        self.assertEqual(self.client.get('/api/appointments/', {'date_from': '2024-02-30'}).status_code, 400)
+        self.assertEqual(self.client.get('/api/appointments/', {'cursor': '!!!'}).status_code, 404)
+
+
+class AvailabilityAPITest(APITestCase):
+    def setUp(self):
+        self.service = Service.objects.create(
+            name='Окрашивание',
+            price=Decimal('3000.00'),
+            duration=90,
+            category='hair'
+        )
+        self.other_service = Service.objects.create(
+            name='Педикюр',
+            price=Decimal('1500.00'),
+            duration=60,
+            category='nails'
+        )
+
+        self.master = Master.objects.create(
+            name='Мастер расписания',
+            specialization='Колорист',
+            experience=4
+        )
+        self.master.services.add(self.service, self.other_service)
+        self.future_date = date.today() + timedelta(days=3)
+        self.url = f'/api/masters/{self.master.id}/availability/'
+
+    def book(self, start, service=None, status='new'):
+        return Appointment.objects.create(
+            client_name='Клиент',
+            client_phone='+79001234567',
+            master=self.master,
+            service=service or self.service,
+            date=self.future_date,
+            time=start,
+            status=status
+        )
+
+    def get_day(self, **params):
+        response = self.client.get(self.url, {
+            'service': self.service.id,
+            'date': self.future_date.isoformat(),
+            'days': 1,
+            **params
+        })
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data['days'][0]['slots']
+
+    def test_empty_day_has_full_grid(self):
+        slots = self.get_day()
+
+        self.assertEqual(slots[0], '09:00')
+        self.assertEqual(slots[-1], '19:30')
+        self.assertEqual(len(slots), 22)
+
+    def test_booked_interval_excluded(self):
+        self.book(time(12, 0), service=self.other_service)
+        slots = self.get_day()
+
+        # 90-минутная услуга не должна пересекаться с 12:00-13:00
+        self.assertIn('10:30', slots)
+        self.assertNotIn('11:00', slots)
+        self.assertNotIn('12:30', slots)
+        self.assertIn('13:00', slots)
+
+    def test_cancelled_appointment_does_not_block(self):
+        self.book(time(12, 0), status='cancelled')
+
+        self.assertIn('12:00', self.get_day())
+
+    def test_week_in_constant_queries(self):
+        for day in range(7):
+            Appointment.objects.create(
+                client_name='Клиент',
+                client_phone='+79001234567',
+                master=self.master,
+                service=self.service,
+                date=self.future_date + timedelta(days=day),
+                time=time(10, 0)
+            )
+
+        with self.assertNumQueries(3):
+            response = self.client.get(self.url, {
+                'service': self.service.id,
+                'date': self.future_date.isoformat(),
+            })
+
+        self.assertEqual(len(response.data['days']), 7)
+        for day in response.data['days']:
+            self.assertNotIn('10:00', day['slots'])
+
+    def test_service_not_provided_by_master(self):
+        service = Service.objects.create(
+            name='Чужая услуга',
+            price=Decimal('100.00'),
+            duration=30
+        )
+        response = self.client.get(self.url, {'service': service.id})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_invalid_date(self):
+        response = self.client.get(self.url, {'service': self.service.id, 'date': '31.12.2030'})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class ConditionalGetTest(APITestCase):
+    def setUp(self):
+        self.service = Service.objects.create(
+            name='Стрижка',
+            price=Decimal('1500.00'),
+            duration=60,
+            category='hair'
+        )
+        self.master = Master.objects.create(
+            name='Анна',
+            specialization='Стилист',
+            experience=5
+        )
+        self.master.services.add(self.service)
+
+    def test_services_not_modified(self):
+        response = self.client.get('/api/services/')
+        etag = response['ETag']
+
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/services/', HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.content, b'')
+
+    def test_etag_changes_after_save(self):
+        etag = self.client.get('/api/services/')['ETag']
+        self.service.price = Decimal('1700.00')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.service.save()
+
+        response = self.client.get('/api/services/', HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_masters_depend_on_services_and_relation(self):
+        etag = self.client.get('/api/masters/')['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            other = Service.objects.create(name='Укладка', price=Decimal('900.00'))
+        after_service = self.client.get('/api/masters/')['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            self.master.services.add(other)
+        after_relation = self.client.get('/api/masters/')['ETag']
+
+        self.assertNotEqual(etag, after_service)
+        self.assertNotEqual(after_service, after_relation)
+
+    def test_versions_bumped_after_commit(self):
+        catalog_version = get_catalog_version()
+        etag = self.client.get('/api/services/')['ETag']
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.service.save()
+            # До коммита читатель не должен получить новую версию со старыми строками
+            self.assertEqual(get_catalog_version(), catalog_version)
+            self.assertEqual(self.client.get('/api/services/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        self.assertNotEqual(get_catalog_version(), catalog_version)
+        self.assertEqual(self.client.get('/api/services/', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_if_modified_since(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Contact.objects.create(
+                address='г. Тест',
+                phone='+7 (123) 456-78-90',
+                email='test@test.ru',
+                working_hours='Пн-Пт: 9-18'
+            )
+        last_modified = self.client.get('/api/contacts/')['Last-Modified']
+
+        response = self.client.get('/api/contacts/', HTTP_IF_MODIFIED_SINCE=last_modified)
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_etag_depends_on_format(self):
+        json_etag = self.client.get('/api/salon-info/', HTTP_ACCEPT='application/json')['ETag']
+        html_etag = self.client.get('/api/salon-info/', HTTP_ACCEPT='text/html')['ETag']
+
+        self.assertNotEqual(json_etag, html_etag)
+
+
+class BootstrapAPITest(APITestCase):
+    def setUp(self):
+        self.service = Service.objects.create(
+            name='Стрижка',
+            price=Decimal('1500.00'),
+            duration=60,
+            category='hair'
+        )
+        self.hidden_service = Service.objects.create(
+            name='Скрытая услуга',
+            price=Decimal('500.00'),
+            is_active=False
+        )
+        self.master = Master.objects.create(
+            name='Анна',
+            specialization='Стилист',
+            experience=5
+        )
+        self.master.services.add(self.service, self.hidden_service)
+
+    def test_bootstrap_document(self):
+        response = self.client.get('/api/bootstrap/')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([s['name'] for s in response.data['services']], ['Стрижка'])
+        self.assertEqual(response.data['services'][0]['price'], '1500.00')
+        self.assertEqual(response.data['masters'], [
+            {'id': self.master.id, 'name': 'Анна', 'specialization': 'Стилист'}
+        ])
+        self.assertEqual(response.data['service_masters'], {self.service.id: [self.master.id]})
+
+    def test_repeat_request_without_queries(self):
+        self.client.get('/api/bootstrap/')
+
+        with self.assertNumQueries(0):
+            self.client.get('/api/bootstrap/')
+
+    def test_versioned_url_is_immutable(self):
+        version = self.client.get('/api/bootstrap/').data['version']
+
+        current = self.client.get('/api/bootstrap/', {'v': version})
+        with self.captureOnCommitCallbacks(execute=True):
+            self.service.save()
+        stale = self.client.get('/api/bootstrap/', {'v': version})
+
+        self.assertIn('immutable', current['Cache-Control'])
+        self.assertEqual(stale['Cache-Control'], 'no-cache')
+        self.assertNotEqual(stale.data['version'], version)
+
+    def test_not_modified(self):
+        etag = self.client.get('/api/bootstrap/')['ETag']
+
+        response = self.client.get('/api/bootstrap/', HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
 
 class ContactAPITest(APITestCase):
     def test_get_contacts_empty(self):
@@ -0,0 +1,111 @@
+from datetime import date, time, timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+from rest_framework.test import APITestCase
+
+from salon.archive import archive_appointments
+from salon.models import Service, Master, Appointment, AppointmentArchive, AppointmentStatusChange
+from salon.transitions import change_status
+
+
+class ArchiveDataMixin:
+    def setUp(self):
+        self.service = Service.objects.create(name='Стрижка', price=Decimal('1500.00'), duration=30)
+        self.master = Master.objects.create(name='Анна', specialization='Стилист')
+        self.old_date = date.today() - timedelta(days=400)
+
+    def create_appointments(self, count, day, status='completed', phone='+79001234567'):
+        return Appointment.objects.bulk_create([
+            Appointment(
+                client_name=f'Клиент {i}',
+                client_phone=phone,
+                master=self.master,
+                service=self.service,
+                date=day,
+                time=time(9 + i % 10, 0),
+                status=status
+            )
+            for i in range(count)
+        ])
+
+
+class ArchiveAppointmentsTest(ArchiveDataMixin, TestCase):
+    def test_moves_only_old_final_rows(self):
+        self.create_appointments(5, self.old_date)
+        self.create_appointments(2, self.old_date, status='cancelled')
+        self.create_appointments(3, self.old_date, status='new')
+        self.create_appointments(4, date.today() - timedelta(days=10))
+
+        out = StringIO()
+        call_command('archive_appointments', older_than=365, batch_size=3, pause=0, stdout=out)
+
+        self.assertIn('Перенесено в архив: 7', out.getvalue())
+        self.assertEqual(AppointmentArchive.objects.count(), 7)
+        self.assertEqual(Appointment.objects.count(), 7)
+        self.assertFalse(Appointment.objects.filter(date=self.old_date, status__in=['completed', 'cancelled']).exists())
+
+    def test_keeps_ids_fields_and_history(self):
+        appointment, = self.create_appointments(1, self.old_date, status='new')
+        change_status(appointment, 'completed', source='admin')
+
+        list(archive_appointments(date.today()))
+
+        archived = AppointmentArchive.objects.get()
+        self.assertEqual(archived.pk, appointment.pk)
+        self.assertEqual((archived.client_name, archived.status), ('Клиент 0', 'completed'))
+        self.assertEqual(
+            [(c['old_status'], c['new_status'], c['source']) for c in archived.status_history],
+            [('new', 'completed', 'admin')]
+        )
+        self.assertFalse(AppointmentStatusChange.objects.exists())
+
+    def test_chunks_are_bounded_and_resumable(self):
+        self.create_appointments(10, self.old_date)
+
+        chunks = archive_appointments(date.today(), chunk_size=4)
+        self.assertEqual(next(chunks), 4)
+        chunks.close()  # прерванный запуск
+        self.assertEqual(AppointmentArchive.objects.count(), 4)
+
+        self.assertEqual(list(archive_appointments(date.today(), chunk_size=4)), [4, 2])
+        self.assertEqual(AppointmentArchive.objects.count(), 10)
+        self.assertFalse(Appointment.objects.exists())
+
+    def test_dry_run(self):
+        self.create_appointments(3, self.old_date)
+        out = StringIO()
+
+        call_command('archive_appointments', older_than=30, dry_run=True, stdout=out)
+
+        self.assertIn('К переносу: 3', out.getvalue())
+        self.assertEqual(Appointment.objects.count(), 3)
+
+
+class ArchiveAPITest(ArchiveDataMixin, APITestCase):
+    url = '/api/appointments/archive/'
+
+    def setUp(self):
+        super().setUp()
+        self.create_appointments(3, self.old_date)
+        self.create_appointments(2, self.old_date, phone='+79990000000')
+        list(archive_appointments(date.today()))
+
+    def test_staff_only(self):
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+
+    def test_filters_and_pagination(self):
+        self.client.force_login(User.objects.create_user('admin', password='pass', is_staff=True))
+
+        response = self.client.get(self.url, {'client_phone': '+79990000000'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['results']), 2)
+        self.assertEqual(response.data['results'][0]['master_details']['name'], 'Анна')
+
+        first = self.client.get(self.url, {'page_size': 4, 'date_to': self.old_date.isoformat()})
+        second = self.client.get(first.data['next'])
+        self.assertEqual(len(first.data['results']) + len(second.data['results']), 5)
+        self.assertEqual(self.client.get(self.url, {'status': 'bad'}).status_code, 400)
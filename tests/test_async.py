@@ -0,0 +1,68 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.test import TestCase
+
+from salon.models import Service, Master, Appointment
+
+
+class AsyncEndpointsTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.service = Service.objects.create(
+            name='Стрижка',
+            price=Decimal('1500.00'),
+            duration=60,
+            category='hair'
+        )
+        self.master = Master.objects.create(
+            name='Анна',
+            specialization='Стилист',
+            experience=5
+        )
+        self.master.services.add(self.service)
+        self.future_date = date.today() + timedelta(days=7)
+
+    async def test_catalog_matches_sync_api(self):
+        for path in (
+            'services/',
+            f'services/{self.service.id}/',
+            'masters/',
+            f'masters/{self.master.id}/',
+            f'services/{self.service.id}/masters/',
+        ):
+            sync_response = await self.async_client.get(f'/api/{path}', HTTP_ACCEPT='application/json')
+            async_response = await self.async_client.get(f'/api/async/{path}')
+
+            self.assertEqual(async_response.status_code, 200)
+            self.assertEqual(async_response.content, sync_response.content, path)
+
+    async def test_detail_not_found(self):
+        response = await self.async_client.get('/api/async/services/999/')
+
+        self.assertEqual(response.status_code, 404)
+
+    async def test_create_appointment(self):
+        data = {
+            'client_name': 'Иван',
+            'client_phone': '+79001234567',
+            'master': self.master.id,
+            'service': self.service.id,
+            'date': self.future_date.isoformat(),
+            'time': '14:00'
+        }
+
+        created = await self.async_client.post('/api/async/appointments/', data, content_type='application/json')
+        overlapping = await self.async_client.post('/api/async/appointments/', data, content_type='application/json')
+
+        self.assertEqual(created.status_code, 201)
+        self.assertTrue(created.json()['success'])
+        self.assertEqual(overlapping.status_code, 400)
+        self.assertIn('time', overlapping.json()['errors'])
+        self.assertEqual(await Appointment.objects.acount(), 1)
+
+    async def test_wrong_method(self):
+        response = await self.async_client.get('/api/async/appointments/')
+
+        self.assertEqual(response.status_code, 405)
@@ -0,0 +1,129 @@
+from datetime import time, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from salon.booking import create_appointment
+from salon.ics import calendar_url, fold
+from salon.models import Service, Master, Appointment
+from salon.transitions import transition
+
+
+@override_settings(CALENDAR_PAST_DAYS=7, CALENDAR_FUTURE_DAYS=30)
+class MasterCalendarTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.service = Service.objects.create(name='Стрижка', price=Decimal('1500.00'), duration=90, category='hair')
+        self.master = Master.objects.create(name='Анна', specialization='Стилист')
+        self.other = Master.objects.create(name='Мария', specialization='Стилист')
+        self.day = timezone.localdate() + timedelta(days=3)
+        self.appointment = self.book(self.master, time(10, 0), comment='Коротко, без чёлки')
+        self.url = calendar_url(self.master.pk)
+
+    def book(self, master, start_time, day=None, **data):
+        return create_appointment(
+            client_name='Ольга', client_phone='+79001234567', master=master,
+            service=self.service, date=day or self.day, time=start_time, **data
+        )
+
+    def get(self, **headers):
+        return self.client.get(self.url, **headers)
+
+    def test_feed_content(self):
+        Appointment.objects.create(
+            client_name='Старая', client_phone='+79001234567', master=self.master,
+            service=self.service, date=timezone.localdate() - timedelta(days=8), time=time(10, 0)
+        )
+        Appointment.objects.create(
+            client_name='Дальняя', client_phone='+79001234567', master=self.master,
+            service=self.service, date=timezone.localdate() + timedelta(days=31), time=time(10, 0)
+        )
+        self.book(self.other, time(10, 0))
+
+        response = self.get()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/calendar; charset=utf-8')
+        content = response.content.decode()
+        self.assertTrue(content.startswith('BEGIN:VCALENDAR\r\n'))
+        self.assertEqual(content.count('BEGIN:VEVENT'), 1)
+        # 10:00 по Москве — 07:00 UTC, длительность услуги 90 минут
+        self.assertIn(f'DTSTART:{self.day:%Y%m%d}T070000Z\r\n', content)
+        self.assertIn(f'DTEND:{self.day:%Y%m%d}T083000Z\r\n', content)
+        self.assertIn(f'UID:appointment-{self.appointment.pk}@salon\r\n', content)
+        self.assertIn('SUMMARY:Стрижка — Ольга\r\n', content)
+        self.assertIn('Комментарий: Коротко\\, без чёлки', content.replace('\r\n ', ''))
+        self.assertIn('STATUS:TENTATIVE', content)
+
+    def test_token_required(self):
+        self.assertEqual(self.client.get(f'/calendar/{self.master.pk}.ics').status_code, 404)
+        self.assertEqual(self.client.get(calendar_url(self.other.pk).replace(
+            f'/{self.other.pk}.', f'/{self.master.pk}.'
+        )).status_code, 404)
+
+        url = calendar_url(self.master.pk)
+        self.master.delete()
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_etag_and_cache_skip_database(self):
+        response = self.get()
+        etag = response['ETag']
+
+        with self.assertNumQueries(0):
+            response = self.get(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        with self.assertNumQueries(0):
+            response = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['ETag'], etag)
+
+    def test_invalidated_by_changes_of_this_master(self):
+        etag = self.get()['ETag']
+
+        # Версии ленты увеличиваются после коммита
+        with self.captureOnCommitCallbacks(execute=True):
+            self.book(self.other, time(12, 0))
+        self.assertEqual(self.get(HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.book(self.master, time(14, 0))
+        response = self.get(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content.decode().count('BEGIN:VEVENT'), 2)
+
+        etag = response['ETag']
+        user = User.objects.create_superuser('admin', password='pass')
+        with self.captureOnCommitCallbacks(execute=True):
+            transition(Appointment.objects.filter(pk=self.appointment.pk), 'cancelled', user=user)
+        response = self.get(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('STATUS:CANCELLED', response.content.decode())
+
+        etag = response['ETag']
+        self.client.force_login(user)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post('/admin/salon/appointment/', {
+                'action': 'delete_selected',
+                '_selected_action': [self.appointment.pk],
+                'post': 'yes',
+            })
+        response = self.get(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.content.decode().count('BEGIN:VEVENT'), 1)
+
+    def test_admin_shows_link(self):
+        self.client.force_login(User.objects.create_superuser('admin', password='pass'))
+
+        response = self.client.get(f'/admin/salon/master/{self.master.pk}/change/')
+
+        self.assertContains(response, self.url.replace('&', '&amp;'))
+
+    def test_fold_keeps_utf8_characters(self):
+        line = 'DESCRIPTION:' + 'ж' * 100
+        folded = fold(line).split('\r\n')
+
+        self.assertTrue(all(len(part.encode()) <= 75 for part in folded))
+        self.assertEqual(''.join(part[1:] if i else part for i, part in enumerate(folded)), line)
@@ -0,0 +1,116 @@
+import csv
+import io
+import zipfile
+from datetime import date, time, timedelta
+from decimal import Decimal
+from xml.etree import ElementTree
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+
+from salon.export import export_rows
+from salon.models import Service, Master, Appointment
+
+
+SHEET_NS = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+
+
+class ExportTest(TestCase):
+    url = '/api/appointments/export.'
+
+    def setUp(self):
+        self.user = User.objects.create_superuser('admin', password='pass')
+        self.client.force_login(self.user)
+        self.service = Service.objects.create(name='Стрижка', price=Decimal('1500.00'), duration=30)
+        self.master = Master.objects.create(name='Анна', specialization='Стилист')
+        self.other = Master.objects.create(name='Мария', specialization='Визажист')
+        today = date.today()
+        Appointment.objects.bulk_create([
+            Appointment(
+                client_name=f'Клиент {i}',
+                client_phone='+79001234567',
+                master=self.master if i < 4 else self.other,
+                service=self.service,
+                date=today + timedelta(days=i),
+                time=time(10, 0),
+                status='completed' if i % 2 else 'new',
+                comment='с "кавычками", <тегами> & запятыми'
+            )
+            for i in range(6)
+        ])
+
+    def read_csv(self, response):
+        self.assertTrue(response.streaming)
+        content = b''.join(response.streaming_content).decode('utf-8')
+        self.assertTrue(content.startswith('\ufeff'))
+        return list(csv.reader(io.StringIO(content[1:])))
+
+    def read_xlsx(self, response):
+        archive = zipfile.ZipFile(io.BytesIO(b''.join(response.streaming_content)))
+        self.assertIsNone(archive.testzip())
+        sheet = ElementTree.fromstring(archive.read('xl/worksheets/sheet1.xml'))
+        return sheet.findall(f'{SHEET_NS}sheetData/{SHEET_NS}row')
+
+    def test_csv_with_filters(self):
+        response = self.client.get(self.url + 'csv', {'master': self.master.id, 'status': 'completed'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('attachment; filename="appointments.csv"', response['Content-Disposition'])
+        header, *rows = self.read_csv(response)
+        self.assertEqual(header[:3], ['ID', 'Дата', 'Время'])
+        self.assertEqual([row[3] for row in rows], ['Клиент 1', 'Клиент 3'])
+        self.assertEqual(rows[0][6:10], ['Анна', 'Стрижка', '1500.00', 'Выполнена'])
+        self.assertEqual(rows[0][10], 'с "кавычками", <тегами> & запятыми')
+
+    def test_xlsx(self):
+        response = self.client.get(self.url + 'xlsx', {'service': self.service.id}, HTTP_ACCEPT='*/*')
+
+        self.assertEqual(response.status_code, 200)
+        rows = self.read_xlsx(response)
+        self.assertEqual(len(rows), 7)
+        texts = [node.text for node in rows[1].iter(f'{SHEET_NS}t')]
+        self.assertIn('Клиент 0', texts)
+        self.assertIn('с "кавычками", <тегами> & запятыми', texts)
+
+    def test_formulas_not_executed(self):
+        Appointment.objects.filter(client_name='Клиент 0').update(
+            client_name='=HYPERLINK("http://evil.example","x")', comment='-2+3\x0b\x00конец'
+        )
+        params = {'master': self.master.id}
+
+        _, row, *_ = self.read_csv(self.client.get(self.url + 'csv', params))
+        self.assertEqual(row[3], '\'=HYPERLINK("http://evil.example","x")')
+        self.assertEqual(row[4], "'+79001234567")
+        self.assertEqual(row[10], "'-2+3\x0b\x00конец")
+
+        _, row, *_ = self.read_xlsx(self.client.get(self.url + 'xlsx', params, HTTP_ACCEPT='*/*'))
+        cell = row[3]
+        self.assertEqual(cell.get('t'), 'inlineStr')
+        self.assertIsNone(cell.find(f'{SHEET_NS}f'))
+        self.assertEqual(cell.find(f'{SHEET_NS}is/{SHEET_NS}t').text, '=HYPERLINK("http://evil.example","x")')
+        self.assertEqual(row[10].find(f'{SHEET_NS}is/{SHEET_NS}t').text, '-2+3конец')
+
+    def test_staff_only_and_bad_params(self):
+        self.assertEqual(self.client.get(self.url + 'pdf').status_code, 404)
+        self.assertEqual(self.client.get(self.url + 'csv', {'period': 'year'}).status_code, 400)
+
+        self.client.logout()
+        self.assertEqual(self.client.get(self.url + 'csv').status_code, 403)
+
+    def test_rows_read_in_one_query(self):
+        with self.assertNumQueries(1):
+            rows = list(export_rows(Appointment.objects.all(), chunk_size=2))
+
+        self.assertEqual(len(rows), 6)
+
+    def test_admin_action_uses_changelist_filters(self):
+        response = self.client.post('/admin/salon/appointment/?period=week&master__id__exact=%d' % self.other.id, {
+            'action': 'export_csv',
+            'select_across': '1',
+            'index': '0',
+            '_selected_action': [Appointment.objects.first().pk],
+        })
+
+        self.assertEqual(response.status_code, 200)
+        header, *rows = self.read_csv(response)
+        self.assertEqual([row[3] for row in rows], ['Клиент 4', 'Клиент 5'])
@@ -0,0 +1,83 @@
+import shutil
+import tempfile
+from io import BytesIO, StringIO
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from PIL import Image
+
+from salon.images import generate_instance_variants, variant_name
+from salon.models import Master
+
+
+def image_file(name, width, height, fmt='PNG'):
+    buffer = BytesIO()
+    Image.new('RGBA' if fmt == 'PNG' else 'RGB', (width, height), (200, 120, 90, 255)).save(buffer, fmt)
+    return SimpleUploadedFile(name, buffer.getvalue())
+
+
+class ImageVariantsTest(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def create_master(self, width=1000, height=1500):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Master.objects.create(
+                name='Анна',
+                specialization='Стилист',
+                photo=image_file('anna.png', width, height)
+            )
+
+    def open_variant(self, master, width, fmt):
+        return Image.open(master.photo.storage.path(variant_name(master.photo.name, width, fmt)))
+
+    def test_variants_created_on_upload(self):
+        master = self.create_master()
+
+        for width in (320, 640):
+            webp = self.open_variant(master, width, 'webp')
+            jpeg = self.open_variant(master, width, 'jpeg')
+            self.assertEqual(webp.format, 'WEBP')
+            self.assertEqual(jpeg.format, 'JPEG')
+            self.assertEqual(webp.size, (width, width * 3 // 2))
+            self.assertEqual(jpeg.mode, 'RGB')
+
+    def test_small_original_is_not_upscaled(self):
+        master = self.create_master(width=400, height=300)
+
+        self.assertEqual(self.open_variant(master, 320, 'webp').width, 320)
+        self.assertEqual(self.open_variant(master, 640, 'webp').width, 400)
+
+    def test_regeneration_is_idempotent(self):
+        master = self.create_master()
+
+        self.assertEqual(generate_instance_variants(master), 0)
+        self.assertEqual(generate_instance_variants(master, force=True), 4)
+
+    def test_command(self):
+        master = self.create_master()
+        master.photo.storage.delete(variant_name(master.photo.name, 320, 'webp'))
+        out = StringIO()
+
+        call_command('generate_image_variants', stdout=out)
+
+        self.assertIn('Файлов: 1, создано вариантов: 1, ошибок: 0', out.getvalue())
+
+    def test_api_and_page_reference_variants(self):
+        master = self.create_master()
+
+        data = self.client.get(f'/api/masters/{master.id}/').json()
+        response = self.client.get('/')
+
+        self.assertEqual(
+            [variant['width'] for variant in data['photo_variants']],
+            [320, 640]
+        )
+        self.assertTrue(data['photo_variants'][0]['webp'].endswith('-320w.webp'))
+        self.assertContains(response, '-640w.webp 640w')
+        self.assertContains(response, '-320w.jpeg 320w')
@@ -0,0 +1,183 @@
+import json
+import os
+import tempfile
+from datetime import date, time, timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from salon.importer import AppointmentImporter
+from salon.models import Service, Master, Appointment
+
+
+class ImportDataMixin:
+    def setUp(self):
+        self.service = Service.objects.create(
+            name='Стрижка',
+            price=Decimal('1500.00'),
+            duration=60,
+            category='hair'
+        )
+        self.foreign_service = Service.objects.create(
+            name='Массаж',
+            price=Decimal('2500.00'),
+            duration=60,
+            category='body'
+        )
+        self.master = Master.objects.create(name='Анна', specialization='Стилист')
+        self.master.services.add(self.service)
+        self.day = date.today() - timedelta(days=30)
+
+    def csv_content(self, rows):
+        header = 'client_name,client_phone,master,service,date,time,status\n'
+        return header + ''.join(
+            f'{name},+79001234567,{master},{service},{day},{start},{status}\n'
+            for name, master, service, day, start, status in rows
+        )
+
+
+class ImportCommandTest(ImportDataMixin, TestCase):
+    def run_import(self, content, suffix='.csv', *args):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, f'import{suffix}')
+            with open(path, 'w', encoding='utf-8') as file:
+                file.write(content)
+            out, err = StringIO(), StringIO()
+            call_command('import_appointments', path, *args, stdout=out, stderr=err)
+        return out.getvalue(), err.getvalue()
+
+    def test_csv_import_with_row_errors(self):
+        day = self.day.isoformat()
+        content = self.csv_content([
+            ('Первый', self.master.id, self.service.id, day, '10:00', 'completed'),
+            ('Пересечение', self.master.id, self.service.id, day, '10:30', 'completed'),
+            ('Отменённая', self.master.id, self.service.id, day, '10:30', 'cancelled'),
+            ('Чужая услуга', self.master.id, self.foreign_service.id, day, '12:00', 'new'),
+            ('Нет мастера', 999, self.service.id, day, '12:00', 'new'),
+            ('Плохая дата', self.master.id, self.service.id, '31-12-2020', '12:00', 'new'),
+            ('Второй', self.master.id, self.service.id, self.day.strftime('%d.%m.%Y'), '11:00', ''),
+        ])
+
+        out, err = self.run_import(content, '.csv', '--batch-size', '3')
+
+        self.assertIn('Импортировано: 3 из 7, ошибок: 4', out)
+        self.assertIn('Строка 2: time', err)
+        self.assertIn('Строка 4: service', err)
+        self.assertIn('Строка 5: master', err)
+        self.assertIn('Строка 6: date', err)
+        self.assertEqual(
+            sorted(Appointment.objects.values_list('client_name', flat=True)),
+            ['Второй', 'Отменённая', 'Первый']
+        )
+        self.assertEqual(Appointment.objects.get(client_name='Второй').status, 'new')
+
+    def test_overlap_with_existing_rows(self):
+        Appointment.objects.create(
+            client_name='Уже есть',
+            client_phone='+79001234567',
+            master=self.master,
+            service=self.service,
+            date=self.day,
+            time=time(15, 0)
+        )
+        lines = [
+            {'client_name': 'А', 'client_phone': '+79001234567', 'master': self.master.id,
+             'service': self.service.id, 'date': self.day.isoformat(), 'time': '15:30'},
+            {'client_name': 'Б', 'client_phone': '+79001234567', 'master': self.master.id,
+             'service': self.service.id, 'date': self.day.isoformat(), 'time': '16:00'},
+        ]
+        content = '\n'.join(json.dumps(line) for line in lines) + '\n{broken\n'
+
+        out, err = self.run_import(content, '.jsonl')
+
+        self.assertIn('Импортировано: 1 из 3, ошибок: 2', out)
+        self.assertIn('Строка 3: row: Некорректный JSON', err)
+        self.assertTrue(Appointment.objects.filter(client_name='Б').exists())
+
+    def test_dry_run_writes_nothing(self):
+        content = self.csv_content([
+            ('Первый', self.master.id, self.service.id, self.day.isoformat(), '10:00', 'new'),
+        ])
+
+        out, _ = self.run_import(content, '.csv', '--dry-run')
+
+        self.assertIn('Проверено: 1 из 1', out)
+        self.assertEqual(Appointment.objects.count(), 0)
+
+    def test_batches_in_constant_queries(self):
+        rows = [
+            (f'Клиент {i}', self.master.id, self.service.id, (self.day + timedelta(days=i)).isoformat(), '10:00', 'new')
+            for i in range(50)
+        ]
+        content = self.csv_content(rows)
+
+        # справочники (3) + на пачку: savepoint, блокировки, занятость, вставка, сводки, release
+        with self.assertNumQueries(3 + 6):
+            self.run_import(content, '.csv', '--batch-size', '100')
+
+        self.assertEqual(Appointment.objects.count(), 50)
+
+    def test_busy_rows_bounded_by_batch_days(self):
+        far_day = self.day - timedelta(days=300)
+        for day in (far_day, far_day + timedelta(days=150), self.day):
+            Appointment.objects.create(
+                client_name='Уже есть', client_phone='+79001234567', master=self.master,
+                service=self.service, date=day, time=time(10, 0)
+            )
+
+        rows = AppointmentImporter().busy_rows({(self.master.id, far_day), (self.master.id, self.day)})
+
+        self.assertEqual(sorted(day for _, day, _, _ in rows), [far_day, self.day])
+
+
+
+class ImportAPITest(ImportDataMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.staff = User.objects.create_user('staff', password='pass', is_staff=True)
+
+    def test_requires_staff(self):
+        response = self.client.post('/api/appointments/import/', 'x', content_type='text/csv')
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_raw_csv_body(self):
+        self.client.force_authenticate(self.staff)
+        content = self.csv_content([
+            ('Первый', self.master.id, self.service.id, self.day.isoformat(), '10:00', 'new'),
+            ('Пересечение', self.master.id, self.service.id, self.day.isoformat(), '10:15', 'new'),
+        ])
+
+        response = self.client.generic('POST', '/api/appointments/import/', content.encode(), content_type='text/csv')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['created'], 1)
+        self.assertEqual(response.data['errors'], [
+            {'row': 2, 'errors': {'time': 'Пересекается с другой записью мастера'}}
+        ])
+
+    def test_multipart_jsonl_file(self):
+        self.client.force_authenticate(self.staff)
+        line = json.dumps({
+            'client_name': 'Файл', 'client_phone': '+79001234567', 'master': self.master.id,
+            'service': self.service.id, 'date': self.day.isoformat(), 'time': '09:00'
+        })
+        upload = SimpleUploadedFile('clients.jsonl', line.encode(), content_type='application/octet-stream')
+
+        response = self.client.post('/api/appointments/import/', {'file': upload}, format='multipart')
+
+        self.assertEqual(response.data['created'], 1)
+        self.assertEqual(Appointment.objects.get().client_name, 'Файл')
+
+    def test_unknown_format(self):
+        self.client.force_authenticate(self.staff)
+
+        response = self.client.generic('POST', '/api/appointments/import/', b'{}', content_type='application/xml')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
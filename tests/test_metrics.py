@@ -0,0 +1,70 @@
+from decimal import Decimal
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.utils.module_loading import import_string
+
+from salon.metrics import registry
+from salon.models import Service
+
+
+@override_settings(METRICS_TOKEN='secret', METRICS_SLOW_QUERY_MS=0)
+class MetricsTest(TestCase):
+    def setUp(self):
+        registry.reset()
+        self.service = Service.objects.create(
+            name='Стрижка',
+            price=Decimal('1500.00'),
+            duration=60,
+            category='hair'
+        )
+
+    def scrape(self):
+        response = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer secret')
+        self.assertEqual(response.status_code, 200)
+        return response.content.decode()
+
+    def test_requests_recorded_per_view(self):
+        self.client.get('/api/services/')
+        self.client.get(f'/api/services/{self.service.id}/')
+        self.client.get('/api/services/999/')
+
+        text = self.scrape()
+
+        self.assertIn('salon_http_requests_total{view="service-list",method="GET",status="200"} 1', text)
+        self.assertIn('salon_http_requests_total{view="service-detail",method="GET",status="200"} 1', text)
+        self.assertIn('salon_http_requests_total{view="service-detail",method="GET",status="404"} 1', text)
+        self.assertIn('salon_http_request_duration_seconds_count{view="service-list",method="GET"} 1', text)
+        self.assertIn('salon_http_request_duration_seconds_bucket{view="service-list",method="GET",le="+Inf"} 1', text)
+        # ContentVersion и список услуг
+        self.assertIn('salon_db_queries_per_request_sum{view="service-list",method="GET"} 2', text)
+        self.assertRegex(text, r'salon_http_response_bytes_total\{view="service-list",method="GET"\} [1-9]')
+
+    async def test_async_views_recorded_without_adapting_chain(self):
+        # Все middleware асинхронные — иначе Django переключал бы потоки на каждом запросе к /api/async/
+        for path in settings.MIDDLEWARE:
+            self.assertTrue(import_string(path).async_capable, path)
+
+        response = await self.async_client.get(f'/api/async/services/{self.service.id}/')
+
+        self.assertEqual(response.status_code, 200)
+        text = registry.render()
+        self.assertIn('salon_http_requests_total{view="async-service-detail",method="GET",status="200"} 1', text)
+        # Запросы вьюхи идут через sync_to_async, но учитываются обёрткой соединения
+        self.assertRegex(text, r'salon_db_queries_per_request_sum\{view="async-service-detail",method="GET"\} [1-9]')
+
+    def test_metrics_protected(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 403)
+        self.assertEqual(self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer wrong').status_code, 403)
+
+        self.client.force_login(User.objects.create_user('admin', password='pass', is_staff=True))
+        self.assertEqual(self.client.get('/metrics').status_code, 200)
+
+    @override_settings(METRICS_SLOW_QUERY_MS=0.000001)
+    def test_slow_query_log_with_plan(self):
+        with self.assertLogs('salon.slow_queries', 'WARNING') as logs:
+            self.client.get('/api/services/')
+
+        self.assertTrue(any('QUERY PLAN' in line or 'SCAN' in line for line in logs.output))
+        self.assertIn('salon_db_slow_queries_total{view="service-list",method="GET"}', self.scrape())
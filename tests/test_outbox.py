@@ -0,0 +1,158 @@
+import socketserver
+import threading
+from datetime import date, time, timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.core import mail
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from salon.booking import create_appointment
+from salon.models import Service, Master, OutboxMessage
+from salon.outbox import OutboxWorker, enqueue
+
+
+class FailingBackend(BaseEmailBackend):
+    def send_messages(self, email_messages):
+        raise ConnectionRefusedError('SMTP недоступен')
+
+
+class FakeSMTPHandler(socketserver.StreamRequestHandler):
+    def reply(self, line):
+        self.wfile.write(line.encode() + b'\r\n')
+
+    def handle(self):
+        self.server.connections += 1
+        self.reply('220 fake')
+        while True:
+            line = self.rfile.readline().decode().strip()
+            if not line:
+                return
+            command = line.split(' ', 1)[0].upper()
+            if command == 'EHLO':
+                self.reply('250 fake')
+            elif command == 'DATA':
+                self.reply('354 go')
+                while self.rfile.readline() not in (b'.\r\n', b''):
+                    pass
+                self.server.messages += 1
+                self.reply('250 ok')
+            elif command == 'QUIT':
+                self.reply('221 bye')
+                return
+            else:
+                self.reply('250 ok')
+
+
+class FakeSMTPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), FakeSMTPHandler)
+        self.connections = 0
+        self.messages = 0
+
+
+class OutboxTest(TestCase):
+    def setUp(self):
+        self.service = Service.objects.create(
+            name='Стрижка',
+            price=Decimal('1500.00'),
+            duration=60,
+            category='hair'
+        )
+        self.master = Master.objects.create(name='Анна', specialization='Стилист')
+        self.master.services.add(self.service)
+        self.future_date = date.today() + timedelta(days=7)
+
+    def book(self, start, email='ivan@example.com'):
+        return create_appointment(
+            client_name='Иван',
+            client_phone='+79001234567',
+            client_email=email,
+            master=self.master,
+            service=self.service,
+            date=self.future_date,
+            time=start
+        )
+
+    def test_booking_enqueues_confirmation(self):
+        self.book(time(14, 0))
+        self.book(time(16, 0), email='')
+
+        message = OutboxMessage.objects.get()
+        self.assertEqual(message.recipient, 'ivan@example.com')
+        self.assertEqual(message.status, 'pending')
+        self.assertIn('Стрижка', message.body)
+        self.assertIn('14:00', message.body)
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_worker_sends_pending_messages(self):
+        self.book(time(14, 0))
+        self.book(time(16, 0))
+
+        self.assertEqual(OutboxWorker(batch_size=1).drain(), (2, 0, 0))
+
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertEqual(mail.outbox[0].to, ['ivan@example.com'])
+        self.assertFalse(OutboxMessage.objects.exclude(status='sent').exists())
+
+    @override_settings(EMAIL_BACKEND='tests.test_outbox.FailingBackend', OUTBOX_RETRY_DELAY=30)
+    def test_failed_send_is_retried_with_backoff(self):
+        message = enqueue('ivan@example.com', 'Тема', 'Текст')
+
+        self.assertEqual(OutboxWorker(max_attempts=3).drain(), (0, 1, 0))
+        message.refresh_from_db()
+        self.assertEqual(message.status, 'pending')
+        self.assertEqual(message.attempts, 1)
+        self.assertIn('SMTP недоступен', message.last_error)
+        self.assertGreater(message.available_at, timezone.now() + timedelta(seconds=25))
+
+        # Пока пауза не истекла, письмо не берётся
+        self.assertEqual(OutboxWorker(max_attempts=3).drain(), (0, 0, 0))
+
+        OutboxMessage.objects.update(available_at=timezone.now(), attempts=2)
+        self.assertEqual(OutboxWorker(max_attempts=3).drain(), (0, 0, 1))
+        message.refresh_from_db()
+        self.assertEqual(message.status, 'failed')
+
+    def test_expired_lease_is_claimed_again(self):
+        message = enqueue('ivan@example.com', 'Тема', 'Текст')
+        # Воркер забрал письмо и упал, не отправив его
+        OutboxMessage.objects.update(attempts=1, available_at=timezone.now() - timedelta(seconds=1))
+
+        self.assertEqual(OutboxWorker().drain(), (1, 0, 0))
+        message.refresh_from_db()
+        self.assertEqual(message.attempts, 2)
+
+    def test_command_once(self):
+        self.book(time(14, 0))
+        out = StringIO()
+
+        call_command('run_outbox_worker', '--once', stdout=out)
+
+        self.assertIn('Отправлено: 1', out.getvalue())
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_batch_uses_one_smtp_connection(self):
+        server = FakeSMTPServer()
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+
+        for i in range(5):
+            enqueue(f'client{i}@example.com', 'Тема', 'Текст')
+
+        with override_settings(
+            EMAIL_BACKEND='django.core.mail.backends.smtp.EmailBackend',
+            EMAIL_HOST='127.0.0.1',
+            EMAIL_PORT=server.server_address[1],
+        ):
+            self.assertEqual(OutboxWorker(batch_size=2).drain(), (5, 0, 0))
+
+        self.assertEqual(server.messages, 5)
+        self.assertEqual(server.connections, 1)
@@ -0,0 +1,162 @@
+from datetime import date, time, timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+
+from salon.archive import archive_appointments
+from salon.booking import create_appointment
+from salon.models import Service, Master, Appointment, DailySummary
+from salon.reports import rebuild_summaries
+from salon.transitions import transition
+
+
+class SummaryDataMixin:
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_superuser('admin', password='pass')
+        self.haircut = Service.objects.create(name='Стрижка', price=Decimal('1500.00'), duration=60, category='hair')
+        self.manicure = Service.objects.create(name='Маникюр', price=Decimal('1000.00'), duration=90, category='nails')
+        self.master = Master.objects.create(name='Анна', specialization='Стилист')
+        self.master.services.add(self.haircut, self.manicure)
+        self.day = date.today() + timedelta(days=3)
+
+    def book(self, service, hour, day=None):
+        return create_appointment(
+            client_name='Клиент', client_phone='+79001234567', master=self.master,
+            service=service, date=day or self.day, time=time(hour, 0)
+        )
+
+    def summaries(self):
+        return {
+            summary.category: (summary.bookings, summary.booked_minutes, summary.booked_revenue,
+                               summary.completed, summary.revenue, summary.cancellations)
+            for summary in DailySummary.objects.filter(day=self.day, master=self.master)
+        }
+
+    def assertMatchesRebuild(self):
+        # После переноса вклада в другую категорию остаются нулевые строки, пересборка их не создаёт
+        incremental = {key: values for key, values in self.summaries().items() if any(values)}
+        rebuild_summaries()
+        self.assertEqual(incremental, self.summaries())
+
+
+class IncrementalSummaryTest(SummaryDataMixin, TestCase):
+    def test_booking_and_transitions(self):
+        first = self.book(self.haircut, 10)
+        self.book(self.haircut, 12)
+        self.book(self.manicure, 14)
+
+        self.assertEqual(self.summaries(), {
+            'hair': (2, 120, Decimal('3000.00'), 0, Decimal('0.00'), 0),
+            'nails': (1, 90, Decimal('1000.00'), 0, Decimal('0.00'), 0),
+        })
+
+        transition(Appointment.objects.filter(pk=first.pk), 'completed', user=self.user)
+        transition(Appointment.objects.filter(service=self.manicure), 'cancelled', user=self.user)
+
+        self.assertEqual(self.summaries(), {
+            'hair': (2, 120, Decimal('3000.00'), 1, Decimal('1500.00'), 0),
+            'nails': (0, 0, Decimal('0.00'), 0, Decimal('0.00'), 1),
+        })
+        self.assertMatchesRebuild()
+
+    def test_admin_edit_and_delete(self):
+        appointment = self.book(self.haircut, 10)
+        self.client.force_login(self.user)
+
+        response = self.client.post(f'/admin/salon/appointment/{appointment.pk}/change/', {
+            'client_name': 'Клиент',
+            'client_phone': '+79001234567',
+            'client_email': '',
+            'master': self.master.pk,
+            'service': self.manicure.pk,
+            'date': self.day.isoformat(),
+            'time': '10:00',
+            'status': 'confirmed',
+            'comment': '',
+            'status_history-TOTAL_FORMS': '0',
+            'status_history-INITIAL_FORMS': '0',
+        })
+        self.assertEqual(response.status_code, 302)
+        self.assertMatchesRebuild()
+        self.assertEqual(self.summaries()['nails'][:2], (1, 90))
+
+        self.client.post('/admin/salon/appointment/', {
+            'action': 'delete_selected',
+            '_selected_action': [appointment.pk],
+            'post': 'yes',
+        })
+        self.assertFalse(Appointment.objects.exists())
+        self.assertEqual(self.summaries()['nails'][:2], (0, 0))
+
+    def test_import_updates_summaries(self):
+        self.client.force_login(self.user)
+        content = (
+            'client_name,client_phone,master,service,date,time,status\n'
+            f'Клиент,+79001234567,{self.master.id},{self.haircut.id},{self.day.isoformat()},10:00,completed\n'
+        )
+
+        self.client.post('/api/appointments/import/', content, content_type='text/csv')
+
+        self.assertEqual(self.summaries()['hair'], (1, 60, Decimal('1500.00'), 1, Decimal('1500.00'), 0))
+
+    def test_archived_rows_kept_by_rebuild(self):
+        self.day = date.today() - timedelta(days=400)
+        Appointment.objects.create(
+            client_name='Клиент', client_phone='+79001234567', master=self.master,
+            service=self.haircut, date=self.day, time=time(10, 0), status='completed'
+        )
+        list(archive_appointments(date.today()))
+
+        out = StringIO()
+        call_command('rebuild_summaries', '--from', self.day.isoformat(), stdout=out)
+
+        self.assertIn('Строк сводок: 1', out.getvalue())
+        self.assertEqual(self.summaries()['hair'][3:5], (1, Decimal('1500.00')))
+
+
+class ReportsAPITest(SummaryDataMixin, TestCase):
+    url = '/api/reports/'
+
+    def setUp(self):
+        super().setUp()
+        self.book(self.haircut, 10)
+        self.book(self.manicure, 12)
+        self.book(self.haircut, 10, day=self.day + timedelta(days=1))
+        self.client.force_login(self.user)
+        self.period = {'date_from': self.day.isoformat(), 'date_to': (self.day + timedelta(days=1)).isoformat()}
+
+    def test_reads_only_summaries(self):
+        with self.assertNumQueries(3):  # сессия, пользователь, сводки
+            response = self.client.get(self.url, {**self.period, 'group_by': 'category'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['results'], [
+            {'category': 'hair', 'bookings': 2, 'booked_minutes': 120, 'booked_revenue': '3000.00',
+             'completed': 0, 'revenue': '0.00', 'cancellations': 0},
+            {'category': 'nails', 'bookings': 1, 'booked_minutes': 90, 'booked_revenue': '1000.00',
+             'completed': 0, 'revenue': '0.00', 'cancellations': 0},
+        ])
+        self.assertEqual(response.data['totals']['booked_revenue'], '4000.00')
+
+    def test_group_by_master_and_day(self):
+        response = self.client.get(self.url, {**self.period, 'group_by': 'master'})
+        row, = response.data['results']
+        self.assertEqual((row['master'], row['master_name'], row['booked_minutes']), (self.master.id, 'Анна', 210))
+        self.assertEqual(row['utilization'], round(210 / (2 * 12 * 60), 4))
+
+        response = self.client.get(self.url, self.period)
+        self.assertEqual([row['day'] for row in response.data['results']], [
+            self.day.isoformat(), (self.day + timedelta(days=1)).isoformat()
+        ])
+
+    def test_validation_and_access(self):
+        response = self.client.get(self.url, {'group_by': 'year', 'category': 'x', 'date_from': 'bad'})
+        self.assertEqual(set(response.data['errors']), {'group_by', 'category', 'date_from'})
+
+        self.client.logout()
+        self.assertEqual(self.client.get(self.url).status_code, 403)
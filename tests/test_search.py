@@ -0,0 +1,73 @@
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+
+from salon.models import Service, Master
+from salon.search import search, stem
+
+
+class StemTest(TestCase):
+    def test_russian_word_forms(self):
+        self.assertEqual({stem(word) for word in ['стрижка', 'стрижки', 'стрижку', 'Стрижкой']}, {'стрижк'})
+        self.assertEqual(stem('окрашивания'), stem('окрашивание'))
+        self.assertEqual(stem('мужская'), stem('мужской'))
+        self.assertEqual(stem('ёлка'), 'елк')
+
+
+class SearchTest(TestCase):
+    def setUp(self):
+        self.haircut = Service.objects.create(
+            name='Мужская стрижка', price=Decimal('1500.00'), duration=60, category='hair',
+            description='Стрижка машинкой и ножницами'
+        )
+        self.coloring = Service.objects.create(
+            name='Окрашивание волос', price=Decimal('4000.00'), duration=120, category='hair',
+            description='Сложное окрашивание, после которого нужна стрижка кончиков'
+        )
+        self.manicure = Service.objects.create(
+            name='Маникюр', price=Decimal('1000.00'), duration=60, category='nails', is_active=False
+        )
+        self.master = Master.objects.create(
+            name='Анна', specialization='Парикмахер-стилист', bio='Делает мужские стрижки и сложные окрашивания'
+        )
+
+    def test_index_follows_saves_and_deletes(self):
+        self.assertEqual(search('стрижки', 'service'), [self.haircut.pk, self.coloring.pk])
+        self.assertEqual(search('маникюра', 'service'), [self.manicure.pk])
+
+        self.haircut.name = 'Стрижка бороды'
+        self.haircut.save()
+        self.assertEqual(search('мужская', 'service'), [])
+        self.assertEqual(search('борода', 'service'), [self.haircut.pk])
+
+        self.haircut.delete()
+        self.assertEqual(search('борода', 'service'), [])
+
+    def test_api_ranked_active_results(self):
+        # версии таблиц; поиск и услуги; поиск, мастера, связи с услугами и услуги
+        with self.assertNumQueries(7):
+            response = self.client.get('/api/search/', {'q': 'окрашивание'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row['id'] for row in response.data['services']], [self.coloring.pk])
+        self.assertEqual([row['name'] for row in response.data['masters']], ['Анна'])
+
+        response = self.client.get('/api/search/', {'q': 'маникюр'})
+        self.assertEqual(response.data['services'], [])
+
+    def test_api_query_is_not_fts_syntax(self):
+        response = self.client.get('/api/search/', {'q': '"стрижка*" ('})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['services']), 2)
+        self.assertEqual(self.client.get('/api/search/', {'q': 'а'}).status_code, 400)
+
+    def test_admin_uses_index(self):
+        self.client.force_login(User.objects.create_superuser('admin', password='pass'))
+
+        response = self.client.get('/admin/salon/service/', {'q': 'стрижкой'})
+        self.assertEqual(list(response.context['cl'].result_list), [self.haircut, self.coloring])
+
+        response = self.client.get('/admin/salon/master/', {'q': 'парикмахеры'})
+        self.assertEqual(list(response.context['cl'].result_list), [self.master])
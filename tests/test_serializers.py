@@ -0,0 +1,78 @@
+from django.test import TestCase, RequestFactory
+from rest_framework.renderers import JSONRenderer
+from decimal import Decimal
+
+from salon.models import Service, Master
+from salon.serializers import (
+    ServiceSerializer,
+    MasterSerializer,
+    represent_services,
+    represent_masters
+)
+
+
+class FastRepresentationTest(TestCase):
+    def setUp(self):
+        self.request = RequestFactory().get('/api/masters/')
+        self.haircut = Service.objects.create(
+            name='Стрижка',
+            description='Описание "с кавычками"',
+            price=Decimal('1500.5'),
+            duration=60,
+            category='hair',
+            image='services/haircut.jpg'
+        )
+        self.manicure = Service.objects.create(
+            name='Маникюр',
+            price=Decimal('1000.00'),
+            duration=45,
+            category='nails'
+        )
+        self.hidden = Service.objects.create(
+            name='Скрытая услуга',
+            price=Decimal('500.00'),
+            category='other',
+            is_active=False
+        )
+
+        self.anna = Master.objects.create(
+            name='Анна',
+            specialization='Стилист',
+            experience=5,
+            bio='Биография',
+            photo='masters/anna.jpg'
+        )
+        self.anna.services.add(self.haircut, self.manicure, self.hidden)
+        self.boris = Master.objects.create(
+            name='Борис',
+            specialization='Мастер маникюра'
+        )
+
+    def assertSameJSON(self, reference, fast):
+        renderer = JSONRenderer()
+        self.assertEqual(renderer.render(reference), renderer.render(fast))
+
+    def test_services_match_model_serializer(self):
+        queryset = Service.objects.all()
+        reference = ServiceSerializer(queryset, many=True, context={'request': self.request}).data
+
+        self.assertSameJSON(reference, represent_services(queryset, self.request))
+
+    def test_services_without_request(self):
+        queryset = Service.objects.all()
+
+        self.assertSameJSON(ServiceSerializer(queryset, many=True).data, represent_services(queryset))
+
+    def test_masters_match_model_serializer(self):
+        queryset = Master.objects.prefetch_related('services')
+        reference = MasterSerializer(queryset, many=True, context={'request': self.request}).data
+
+        self.assertSameJSON(reference, represent_masters(queryset, self.request))
+
+    def test_masters_in_constant_queries(self):
+        for i in range(5):
+            master = Master.objects.create(name=f'Мастер {i}', specialization='Тест')
+            master.services.add(self.haircut)
+
+        with self.assertNumQueries(3):
+            represent_masters(Master.objects.all(), self.request)
@@ -0,0 +1,106 @@
+import gzip
+import json
+import shutil
+import tempfile
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management import call_command
+from django.templatetags.static import static
+from django.test import TestCase, override_settings
+
+from salon.staticfiles import minify_css
+
+
+class MinifyCSSTest(TestCase):
+    def test_minify_keeps_strings_and_significant_spaces(self):
+        source = '''
+            /* шапка */
+            .card  >  .title:hover ,
+            .card  .icon::before {
+                content: "a  ;  b";   /* комментарий */
+                width: calc(100% - 20px);
+            }
+        '''
+
+        minified = minify_css(source)
+
+        self.assertEqual(
+            minified,
+            '.card > .title:hover,.card .icon::before{content: "a  ;  b";width: calc(100% - 20px)}'
+        )
+        self.assertEqual(minify_css(minified), minified)
+
+
+class StaticBuildTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.static_root = tempfile.mkdtemp()
+        cls.settings_override = override_settings(
+            STATIC_ROOT=cls.static_root,
+            STATICFILES_FINDERS=['django.contrib.staticfiles.finders.FileSystemFinder'],
+        )
+        cls.settings_override.enable()
+        call_command('collectstatic', interactive=False, verbosity=0)
+        manifest = json.loads(Path(cls.static_root, 'staticfiles.json').read_text())
+        cls.css_name = manifest['paths']['css/style.css']
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.settings_override.disable()
+        shutil.rmtree(cls.static_root)
+        super().tearDownClass()
+
+    def setUp(self):
+        # Хранилище читает манифест один раз: перечитываем после сборки
+        staticfiles_storage.hashed_files, staticfiles_storage.manifest_hash = staticfiles_storage.load_manifest()
+
+    def test_build_writes_hashed_minified_and_compressed_files(self):
+        built = Path(self.static_root, self.css_name)
+        original = Path(settings.BASE_DIR, 'static/css/style.css').read_text()
+
+        self.assertRegex(self.css_name, r'^css/style\.[0-9a-f]{12}\.css$')
+        self.assertLess(built.stat().st_size, len(original.encode()))
+        self.assertEqual(gzip.decompress(Path(f'{built}.gz').read_bytes()), built.read_bytes())
+        self.assertEqual(static('css/style.css'), f'/static/{self.css_name}')
+
+    def test_hashed_file_served_precompressed_and_immutable(self):
+        response = self.client.get(f'/static/{self.css_name}', HTTP_ACCEPT_ENCODING='gzip, deflate, br')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['Content-Type'], 'text/css')
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertEqual(
+            gzip.decompress(b''.join(response.streaming_content)),
+            Path(self.static_root, self.css_name).read_bytes()
+        )
+
+    def test_plain_file_without_accept_encoding(self):
+        response = self.client.get(f'/static/{self.css_name}', HTTP_ACCEPT_ENCODING='gzip;q=0')
+
+        self.assertNotIn('Content-Encoding', response)
+        self.assertEqual(b''.join(response.streaming_content), Path(self.static_root, self.css_name).read_bytes())
+
+    def test_unhashed_file_must_revalidate(self):
+        response = self.client.get('/static/css/style.css')
+        not_modified = self.client.get('/static/css/style.css', HTTP_IF_NONE_MATCH=response['ETag'])
+
+        self.assertIn('must-revalidate', response['Cache-Control'])
+        self.assertEqual(not_modified.status_code, 304)
+
+    async def test_served_under_asgi(self):
+        response = await self.async_client.get('/static/css/style.css')
+        not_modified = await self.async_client.get('/static/css/style.css', headers={'If-None-Match': response['ETag']})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('must-revalidate', response['Cache-Control'])
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual((await self.async_client.get('/static/css/missing.css')).status_code, 404)
+
+    def test_missing_and_outside_files(self):
+        self.assertEqual(self.client.get('/static/css/missing.css').status_code, 404)
+        self.assertEqual(self.client.get('/static/../manage.py').status_code, 404)
@@ -0,0 +1,90 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from salon.models import Service, Master, Appointment
+
+
+@override_settings(BOOKING_THROTTLE_IP='3/min', BOOKING_THROTTLE_PHONE='2/hour')
+class BookingThrottleTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.service = Service.objects.create(name='Стрижка', price=Decimal('1500.00'), duration=30)
+        self.master = Master.objects.create(name='Анна', specialization='Стилист')
+        self.master.services.add(self.service)
+        self.future_date = date.today() + timedelta(days=7)
+        self.hour = 9
+
+    def book(self, phone, ip='10.0.0.1', url='/api/appointments/', **headers):
+        self.hour += 1
+        return self.client.post(url, {
+            'client_name': 'Иван',
+            'client_phone': phone,
+            'master': self.master.id,
+            'service': self.service.id,
+            'date': self.future_date.isoformat(),
+            'time': f'{self.hour}:00'
+        }, content_type='application/json', REMOTE_ADDR=ip, **headers)
+
+    def test_limit_per_ip(self):
+        for i in range(3):
+            self.assertEqual(self.book(f'+7900000000{i}').status_code, 201)
+
+        response = self.book('+79000000009')
+
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '20')
+        self.assertIn('Слишком много попыток записи', response.json()['detail'])
+        self.assertEqual(self.book('+79000000009', ip='10.0.0.2').status_code, 201)
+
+    def test_forwarded_for_does_not_reset_limit(self):
+        for url in ('/api/appointments/', '/api/async/appointments/'):
+            cache.clear()
+            for i in range(3):
+                self.book(f'+7900000000{i}', url=url, HTTP_X_FORWARDED_FOR=f'192.0.2.{i}')
+
+            response = self.book('+79000000009', url=url, HTTP_X_FORWARDED_FOR='192.0.2.99')
+
+            self.assertEqual(response.status_code, 429)
+
+    def test_limit_per_phone_across_ips(self):
+        self.assertEqual(self.book('+79001234567', ip='10.0.0.1').status_code, 201)
+        self.assertEqual(self.book('9001234567', ip='10.0.0.2').status_code, 201)
+
+        response = self.book('+79001234567', ip='10.0.0.3')
+
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '1800')
+        self.assertEqual(Appointment.objects.count(), 2)
+
+    def test_rejected_request_does_not_touch_database(self):
+        for i in range(3):
+            self.book(f'+7900000000{i}')
+
+        with self.assertNumQueries(0):
+            response = self.book('+79000000009')
+        self.assertEqual(response.status_code, 429)
+
+    def test_async_endpoint_shares_limits(self):
+        url = '/api/async/appointments/'
+        for i in range(3):
+            self.assertEqual(self.book(f'+7900000000{i}', url=url).status_code, 201)
+
+        response = self.book('+79000000009', url=url)
+
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '20')
+        self.assertEqual(self.book('+79000000009').status_code, 429)
+
+    @override_settings(BOOKING_THROTTLE_IP='none', BOOKING_THROTTLE_PHONE='')
+    def test_disabled(self):
+        for i in range(5):
+            self.assertEqual(self.book('+79001234567').status_code, 201)
+
+    def test_listing_is_not_throttled(self):
+        for i in range(3):
+            self.book(f'+7900000000{i}')
+
+        self.assertEqual(self.client.get('/api/appointments/', REMOTE_ADDR='10.0.0.1').status_code, 403)
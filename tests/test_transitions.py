@@ -0,0 +1,119 @@
+from datetime import date, time, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+
+from salon.models import Service, Master, Appointment, AppointmentStatusChange
+from salon.transitions import TransitionError, change_status, transition
+
+
+class TransitionDataMixin:
+    def setUp(self):
+        self.user = User.objects.create_superuser('admin', password='pass')
+        self.service = Service.objects.create(name='Стрижка', price=Decimal('1500.00'), duration=30)
+        self.master = Master.objects.create(name='Анна', specialization='Стилист')
+
+    def create_appointments(self, statuses):
+        return Appointment.objects.bulk_create([
+            Appointment(
+                client_name=f'Клиент {i}',
+                client_phone='+79001234567',
+                master=self.master,
+                service=self.service,
+                date=date.today() + timedelta(days=i),
+                time=time(10, 0),
+                status=status
+            )
+            for i, status in enumerate(statuses)
+        ])
+
+
+class TransitionTest(TransitionDataMixin, TestCase):
+    def test_bulk_transition_skips_invalid_and_records_history(self):
+        self.create_appointments(['new', 'new', 'confirmed', 'completed', 'cancelled'])
+
+        changed, skipped = transition(Appointment.objects.all(), 'confirmed', user=self.user)
+
+        self.assertEqual((changed, skipped), (2, 3))
+        self.assertEqual(
+            sorted(Appointment.objects.values_list('status', flat=True)),
+            ['cancelled', 'completed', 'confirmed', 'confirmed', 'confirmed']
+        )
+        history = AppointmentStatusChange.objects.all()
+        self.assertEqual(history.count(), 2)
+        self.assertTrue(all(
+            (change.old_status, change.new_status, change.changed_by) == ('new', 'confirmed', self.user)
+            for change in history
+        ))
+
+    def test_chunks_use_constant_statements(self):
+        self.create_appointments(['new'] * 40)
+
+        # COUNT, на каждую пачку: SAVEPOINT, выборка, UPDATE, INSERT истории, upsert сводок, RELEASE; пустая выборка в конце
+        with self.assertNumQueries(1 + 4 * 6 + 3):
+            changed, _ = transition(Appointment.objects.all(), 'cancelled', chunk_size=10)
+
+        self.assertEqual(changed, 40)
+        self.assertEqual(AppointmentStatusChange.objects.filter(new_status='cancelled').count(), 40)
+
+    def test_change_status_rejects_invalid_jump(self):
+        appointment, = self.create_appointments(['completed'])
+
+        with self.assertRaises(TransitionError):
+            change_status(appointment, 'new')
+        self.assertFalse(AppointmentStatusChange.objects.exists())
+
+        appointment, = self.create_appointments(['new'])
+        change_status(appointment, 'confirmed', source='api')
+        self.assertEqual(appointment.status_history.get().source, 'api')
+
+
+class AdminTransitionTest(TransitionDataMixin, TestCase):
+    url = '/admin/salon/appointment/'
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.user)
+
+    def test_action_uses_transition_engine(self):
+        appointments = self.create_appointments(['new', 'completed'])
+
+        response = self.client.post(self.url, {
+            'action': 'mark_cancelled',
+            '_selected_action': [a.pk for a in appointments],
+        }, follow=True)
+
+        self.assertContains(response, 'Отменено записей: 1, пропущено (недопустимый переход): 1')
+        self.assertEqual(
+            list(Appointment.objects.order_by('pk').values_list('status', flat=True)),
+            ['cancelled', 'completed']
+        )
+
+    def test_change_form_validates_and_records(self):
+        appointment, = self.create_appointments(['completed'])
+        data = {
+            'client_name': appointment.client_name,
+            'client_phone': appointment.client_phone,
+            'client_email': '',
+            'master': self.master.pk,
+            'service': self.service.pk,
+            'date': appointment.date.isoformat(),
+            'time': '10:00',
+            'status': 'new',
+            'comment': '',
+            'status_history-TOTAL_FORMS': '0',
+            'status_history-INITIAL_FORMS': '0',
+        }
+
+        response = self.client.post(f'{self.url}{appointment.pk}/change/', data)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Нельзя сменить статус')
+
+        # Новая запись на тот же день, что и выполненная: в 10:00 мастер уже занят
+        appointment, = self.create_appointments(['new'])
+        data.update(status='confirmed', date=appointment.date.isoformat(), time='12:00')
+        response = self.client.post(f'{self.url}{appointment.pk}/change/', data)
+        self.assertEqual(response.status_code, 302)
+        change = appointment.status_history.get()
+        self.assertEqual((change.old_status, change.new_status, change.changed_by), ('new', 'confirmed', self.user))
@@ -0,0 +1,76 @@
+from django.core.cache import cache
+from django.test import TestCase, Client
+from decimal import Decimal
+
+from salon.cache import CSRF_PLACEHOLDER
+from salon.models import Service, Master, Contact
+
+
+class IndexPageCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.service = Service.objects.create(
+            name='Стрижка',
+            price=Decimal('1500.00'),
+            duration=60,
+            category='hair'
+        )
+        self.master = Master.objects.create(
+            name='Анна',
+            specialization='Стилист',
+            experience=5
+        )
+
+    def test_second_hit_served_without_queries(self):
+        self.client.get('/')
+
+        with self.assertNumQueries(0):
+            response = self.client.get('/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Стрижка')
+
+    def test_csrf_token_is_per_client(self):
+        first = self.client.get('/')
+        second = Client().get('/')
+
+        self.assertNotContains(first, CSRF_PLACEHOLDER)
+        self.assertNotContains(second, CSRF_PLACEHOLDER)
+        self.assertIn('csrftoken', first.cookies)
+        self.assertContains(first, 'name="csrfmiddlewaretoken"')
+        self.assertNotEqual(first.cookies['csrftoken'].value, second.cookies['csrftoken'].value)
+
+    def test_save_invalidates_page(self):
+        self.client.get('/')
+        self.service.name = 'Модельная стрижка'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.service.save()
+
+        self.assertContains(self.client.get('/'), 'Модельная стрижка')
+
+    def test_delete_invalidates_page(self):
+        self.client.get('/')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.service.delete()
+
+        self.assertNotContains(self.client.get('/'), 'Стрижка')
+
+    def test_contacts_change_invalidates_page(self):
+        self.client.get('/')
+        with self.captureOnCommitCallbacks(execute=True):
+            Contact.objects.create(
+                address='г. Тест, ул. Кэша',
+                phone='+7 (123) 456-78-90',
+                email='test@test.ru',
+                working_hours='Пн-Пт: 9-18'
+            )
+
+        self.assertContains(self.client.get('/'), 'г. Тест, ул. Кэша')
+
+    def test_catalog_bootstrap_inlined(self):
+        self.master.services.add(self.service)
+
+        response = self.client.get('/')
+
+        self.assertContains(response, '<script id="catalogBootstrap" type="application/json">')
+        self.assertContains(response, f'"service_masters": {{"{self.service.id}": [{self.master.id}]}}')